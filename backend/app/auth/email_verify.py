@@ -5,6 +5,7 @@ Email verification helpers using itsdangerous signed tokens.
 Flow:
 1. On register / email change: generate_email_token(email) → signed URL-safe token
 2. Send verification email with link: /auth/verify?token=<token>
+   (routes queue it in the email outbox — queue_verification_email)
 3. On click: verify_email_token(token) → returns original email if valid
 4. Route marks user.is_verified = True
 
@@ -15,7 +16,10 @@ from fastapi import HTTPException, status
 from itsdangerous import URLSafeTimedSerializer, BadSignature, SignatureExpired
 from os import getenv
 
+from sqlalchemy.orm import Session
+
 from app.utils.email_service import send_email
+from app.services.email_outbox import queue_email
 from app.config import cfg_settings
 
 SECRET_KEY = getenv("SECRET_KEY", "dev-secret")
@@ -44,8 +48,8 @@ def verify_email_token(token: str, max_age: int = 3600) -> str:
         )
 
 
-def send_verification_email(email: str) -> bool:
-    """Build and send verification email with safe HTML/text. Returns True on success."""
+def verification_message(email: str) -> tuple[str, str, str]:
+    """(subject, text body, HTML body) of the verification email, with safe HTML/text."""
 
     token = generate_email_token(email)
 
@@ -95,9 +99,16 @@ https://cardstoard.com
 </html>
 """
 
-    return send_email(
-        to_address=email,
-        subject="Verify Your CardStoard Account",
-        body=body,
-        html=html,
-    )
+    return "Verify Your CardStoard Account", body, html
+
+
+def send_verification_email(email: str) -> bool:
+    """Build and send verification email now (blocking). Returns True on success."""
+    subject, body, html = verification_message(email)
+    return send_email(to_address=email, subject=subject, body=body, html=html)
+
+
+def queue_verification_email(db: Session, email: str) -> None:
+    """Queue the verification email in db's transaction (services/email_outbox.py)."""
+    subject, body, html = verification_message(email)
+    queue_email(db, email, subject, body, html)
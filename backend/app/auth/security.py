@@ -8,18 +8,41 @@ Token types:
 - access  — short-lived (ACCESS_MIN minutes), stored in HttpOnly cookie
 - refresh — long-lived (REFRESH_DAYS days), stored in HttpOnly cookie
 
+User context: get_current_user() returns the User with its GlobalSettings row
+loaded (one LEFT OUTER JOIN on a cache miss), so route handlers read
+`current.settings` instead of issuing a second query by user_id.
+
+Password work: bcrypt takes ~0.25 s of CPU per call by design. Async routes
+(register, login) use hash_password_async / verify_password_async, which run
+it on a dedicated pool of AUTH_HASH_WORKERS threads (bcrypt releases the GIL)
+and await the result, so the event loop and the shared request threadpool stay
+free during a burst of sign-ups or logins. Beyond AUTH_HASH_MAX_PENDING queued
+calls new requests get 503 rather than waiting minutes. Queue wait and hash
+time are tracked in PASSWORD_LATENCY (GET /admin/auth-metrics).
+
+User cache: get_current_user() reads users through load_user(), which serves
+them from a short-TTL per-worker cache invalidated across workers on every
+User / GlobalSettings write (app/auth/user_cache.py). Access tokens also carry
+profile claims (user_claims), so id-only read endpoints can use
+get_token_user() and skip both.
+
 Silent refresh: get_current_user() attempts to auto-refresh an expired access
 token using the refresh cookie, issuing a new token via request.state. The HTTP
 middleware in main.py picks this up and sets the new cookie on the response.
 """
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
 from datetime import datetime, timezone, timedelta
+import asyncio, os, threading, time
 import jwt, bcrypt
 from fastapi import HTTPException, Depends, Request
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, joinedload
 from ..database import get_db
 from ..models import User
 from ..config import cfg_settings   # single source of truth for token config
+from ..services.latency import LatencyStats
+from . import user_cache
 
 def hash_password(pw: str) -> str:
     """Hash a plaintext password using bcrypt. Returns the hashed string."""
@@ -29,13 +52,74 @@ def verify_password(pw: str, pw_hash: str) -> bool:
     """Compare a plaintext password against a stored bcrypt hash."""
     return bcrypt.checkpw(pw.encode(), pw_hash.encode())
 
-def create_token(sub: int, kind: str = "access"):
+AUTH_HASH_WORKERS     = int(os.getenv("AUTH_HASH_WORKERS", "2"))
+AUTH_HASH_MAX_PENDING = int(os.getenv("AUTH_HASH_MAX_PENDING", "64"))
+
+_hash_pool = ThreadPoolExecutor(max_workers=AUTH_HASH_WORKERS, thread_name_prefix="cardstoard-bcrypt")
+_hash_pending = 0
+_hash_pending_lock = threading.Lock()
+
+PASSWORD_LATENCY = {
+    "hash":  LatencyStats(),   # bcrypt time, hash_password_async
+    "verify": LatencyStats(),  # bcrypt time, verify_password_async
+    "wait":  LatencyStats(),   # time queued for a pool thread, both
+}
+
+def _in_hash_pool(kind: str, fn, *args):
+    """Run fn on the bcrypt pool, recording wait and run time; 503 when the queue is full."""
+    global _hash_pending
+    with _hash_pending_lock:
+        if _hash_pending >= AUTH_HASH_MAX_PENDING:
+            raise HTTPException(503, "Server busy, please try again shortly",
+                                headers={"Retry-After": "1"})
+        _hash_pending += 1
+    queued = time.perf_counter()
+
+    def run():
+        started = time.perf_counter()
+        PASSWORD_LATENCY["wait"].record(started - queued)
+        try:
+            return fn(*args)
+        finally:
+            PASSWORD_LATENCY[kind].record(time.perf_counter() - started)
+
+    def done(_future):
+        # Also fires when a cancelled request drops the call before run() starts
+        global _hash_pending
+        with _hash_pending_lock:
+            _hash_pending -= 1
+
+    try:
+        future = _hash_pool.submit(run)
+    except BaseException:
+        done(None)
+        raise
+    future.add_done_callback(done)
+    return asyncio.wrap_future(future)
+
+async def hash_password_async(pw: str) -> str:
+    """hash_password on the bcrypt pool, for async routes."""
+    return await _in_hash_pool("hash", hash_password, pw)
+
+async def verify_password_async(pw: str, pw_hash: str) -> bool:
+    """verify_password on the bcrypt pool, for async routes."""
+    return await _in_hash_pool("verify", verify_password, pw, pw_hash)
+
+def password_pool_stats() -> dict:
+    return {
+        "workers": AUTH_HASH_WORKERS,
+        "pending": _hash_pending,
+        **{f"{kind}_latency": stats.summary() for kind, stats in PASSWORD_LATENCY.items()},
+    }
+
+def create_token(sub: int, kind: str = "access", claims: dict | None = None):
     """
     Create a signed JWT with the user id as subject.
 
     Args:
-        sub:  User.id to embed as the 'sub' claim.
-        kind: "access" (short-lived) or "refresh" (long-lived).
+        sub:    User.id to embed as the 'sub' claim.
+        kind:   "access" (short-lived) or "refresh" (long-lived).
+        claims: extra claims, e.g. user_claims(user) for get_token_user's fast path.
 
     Returns a signed JWT string using HS256 and the configured JWT_SECRET.
     """
@@ -46,16 +130,53 @@ def create_token(sub: int, kind: str = "access"):
         else timedelta(days=cfg_settings.REFRESH_DAYS)
     )
     return jwt.encode(
-        {"sub": sub, "type": kind, "exp": exp},
+        {**(claims or {}), "sub": sub, "type": kind, "exp": exp},
         cfg_settings.JWT_SECRET,
         algorithm=cfg_settings.JWT_ALG,
     )
 
+def user_claims(user: User) -> dict:
+    """Profile claims for access tokens, read back by get_token_user()."""
+    return {
+        "iat": int(time.time()),
+        "usr": user.username,
+        "eml": user.email,
+        "vfd": bool(user.is_verified),
+        "act": bool(user.is_active),
+    }
+
+@dataclass(frozen=True)
+class TokenUser:
+    """The subset of User carried in access-token claims (see get_token_user)."""
+    id: int
+    email: str
+    username: str | None
+    is_verified: bool
+    is_active: bool
+
+def load_user(db: Session, user_id) -> User | None:
+    """User with .settings loaded — from the user cache (app/auth/user_cache.py) or one query."""
+    user = user_cache.lookup(db, user_id)
+    if user is not None:
+        return user
+    loaded_at = time.time()
+    # lookup user + settings in one round trip (routes use current.settings)
+    user = (
+        db.query(User)
+        .options(joinedload(User.settings))
+        .filter(User.id == user_id)
+        .first()
+    )
+    if user is not None:
+        user_cache.store(user, loaded_at)
+    return user
+
 bearer = HTTPBearer(auto_error=False)
 
 def get_current_user(request: Request, db: Session = Depends(get_db)):
     """
-    FastAPI dependency that validates the access token cookie and returns the User.
+    FastAPI dependency that validates the access token cookie and returns the User,
+    with User.settings (GlobalSettings) eagerly loaded.
 
     Flow:
     1. Read access_token cookie — 401 if missing.
@@ -87,18 +208,52 @@ def get_current_user(request: Request, db: Session = Depends(get_db)):
         except jwt.PyJWTError:
             raise HTTPException(401, "Invalid refresh token")
 
-        # issue new access token
-        new_access = create_token(refresh_payload["sub"], "access")
-        request.state.new_access_token = new_access
+        user = load_user(db, refresh_payload["sub"])
+        if not user:
+            raise HTTPException(401, "User not found")
 
-        payload = {"sub": refresh_payload["sub"], "type": "access"}
+        # issue new access token
+        request.state.new_access_token = create_token(user.id, "access", user_claims(user))
+        return user
 
     except jwt.PyJWTError:
         raise HTTPException(401, "Invalid token")
 
-    # lookup user
-    user = db.query(User).filter(User.id == payload["sub"]).first()
+    user = load_user(db, payload["sub"])
     if not user:
         raise HTTPException(401, "User not found")
 
     return user
+
+def get_admin_user(current: User = Depends(get_current_user)) -> User:
+    """Dependency for operator-only endpoints: 403 unless the user is in ADMIN_USER_IDS."""
+    if current.id not in cfg_settings.ADMIN_USER_IDS:
+        raise HTTPException(403, "Admin access required")
+    return current
+
+def get_token_user(request: Request, db: Session = Depends(get_db)) -> "TokenUser | User":
+    """
+    Fast-path dependency for read-only endpoints that need only the user's id
+    and profile fields: when the access token carries user_claims() and the
+    user has not changed since it was issued, answers from the token alone —
+    no database or cache lookup. Otherwise (no claims, expired token, changed
+    user, invalidation listener down) behaves exactly like get_current_user.
+    """
+    access_token = request.cookies.get("access_token")
+    if access_token:
+        try:
+            payload = jwt.decode(access_token, cfg_settings.JWT_SECRET, algorithms=[cfg_settings.JWT_ALG])
+        except jwt.PyJWTError:
+            payload = {}
+        if (payload.get("type") == "access" and "usr" in payload
+                and not user_cache.changed_since(payload["sub"], payload.get("iat", 0))):
+            user_cache.count_token(fast=True)
+            return TokenUser(
+                id=payload["sub"],
+                email=payload["eml"],
+                username=payload["usr"],
+                is_verified=payload["vfd"],
+                is_active=payload["act"],
+            )
+    user_cache.count_token(fast=False)
+    return get_current_user(request, db)
@@ -0,0 +1,89 @@
+# app/auth/throttle.py
+"""
+Brute-force throttling for the unauthenticated and credential-checking auth
+routes (services/rate_limit.py token buckets, 429 + Retry-After).
+
+Every check runs first thing in its route, before any database lookup or
+bcrypt work, so a credential-stuffing burst costs a dictionary lookup per
+request instead of ~0.25 s of CPU.
+
+  login          per client IP, and per (client IP, identifier); a successful
+                 login refills that pair's bucket. The identifier bucket is
+                 not shared across IPs: it is charged before the password is
+                 checked, so a global one would let anyone lock a known
+                 username out with junk attempts
+  register       per client IP
+  resend-verify  per client IP, and per email address
+  mfa/*          per user (TOTP codes are six digits)
+
+Rates are per process with the default in-memory backend (see rate_limit.py;
+RATE_LIMIT_BACKEND=redis shares them across workers). Behind the production
+nginx proxy every request comes from the proxy's address, so client_ip() uses
+X-Real-IP when TRUST_PROXY_HEADERS=true — set only where a proxy overwrites
+that header, or clients could pick their own key.
+"""
+
+import os
+
+from fastapi import Request
+
+from ..services.rate_limit import enforce, make_buckets
+
+TRUST_PROXY_HEADERS = os.getenv("TRUST_PROXY_HEADERS", "false").lower() == "true"
+
+LOGIN_IP_BURST          = int(os.getenv("LOGIN_IP_BURST", "20"))
+LOGIN_IP_PER_MINUTE     = int(os.getenv("LOGIN_IP_PER_MINUTE", "10"))
+LOGIN_ID_BURST          = int(os.getenv("LOGIN_ID_BURST", "5"))
+LOGIN_ID_PER_HOUR       = int(os.getenv("LOGIN_ID_PER_HOUR", "20"))
+REGISTER_IP_BURST       = int(os.getenv("REGISTER_IP_BURST", "5"))
+REGISTER_IP_PER_HOUR    = int(os.getenv("REGISTER_IP_PER_HOUR", "10"))
+VERIFY_IP_BURST         = int(os.getenv("VERIFY_IP_BURST", "5"))
+VERIFY_IP_PER_HOUR      = int(os.getenv("VERIFY_IP_PER_HOUR", "10"))
+VERIFY_EMAIL_BURST      = int(os.getenv("VERIFY_EMAIL_BURST", "3"))
+VERIFY_EMAIL_PER_HOUR   = int(os.getenv("VERIFY_EMAIL_PER_HOUR", "3"))
+MFA_USER_BURST          = int(os.getenv("MFA_USER_BURST", "5"))
+MFA_USER_PER_MINUTE     = int(os.getenv("MFA_USER_PER_MINUTE", "1"))
+
+_login_ip     = make_buckets("login-ip", LOGIN_IP_BURST, LOGIN_IP_PER_MINUTE / 60)
+_login_id     = make_buckets("login-id", LOGIN_ID_BURST, LOGIN_ID_PER_HOUR / 3600)
+_register_ip  = make_buckets("register-ip", REGISTER_IP_BURST, REGISTER_IP_PER_HOUR / 3600)
+_verify_ip    = make_buckets("verify-ip", VERIFY_IP_BURST, VERIFY_IP_PER_HOUR / 3600)
+_verify_email = make_buckets("verify-email", VERIFY_EMAIL_BURST, VERIFY_EMAIL_PER_HOUR / 3600)
+_mfa_user     = make_buckets("mfa-user", MFA_USER_BURST, MFA_USER_PER_MINUTE / 60)
+
+_TOO_MANY_LOGINS = "Too many login attempts — please wait and try again"
+
+
+def client_ip(request: Request) -> str:
+    if TRUST_PROXY_HEADERS:
+        real_ip = request.headers.get("x-real-ip")
+        if real_ip:
+            return real_ip.strip()
+    return request.client.host if request.client else "unknown"
+
+
+def _login_key(request: Request, identifier: str) -> str:
+    return f"{client_ip(request)}|{identifier.strip().lower()}"
+
+
+def throttle_login(request: Request, identifier: str) -> None:
+    enforce(_login_ip, client_ip(request), _TOO_MANY_LOGINS)
+    enforce(_login_id, _login_key(request, identifier), _TOO_MANY_LOGINS)
+
+
+def login_succeeded(request: Request, identifier: str) -> None:
+    _login_id.reset(_login_key(request, identifier))
+
+
+def throttle_register(request: Request) -> None:
+    enforce(_register_ip, client_ip(request), "Too many sign-ups from this address — please try again later")
+
+
+def throttle_resend_verify(request: Request, email: str) -> None:
+    detail = "Too many verification emails requested — please try again later"
+    enforce(_verify_ip, client_ip(request), detail)
+    enforce(_verify_email, email.strip().lower(), detail)
+
+
+def throttle_mfa(user_id: int) -> None:
+    enforce(_mfa_user, user_id, "Too many MFA attempts — please wait and try again")
@@ -0,0 +1,242 @@
+# app/auth/user_cache.py
+"""
+In-process cache of authenticated users for get_current_user().
+
+Every authenticated request used to SELECT the user (+ settings). Now each
+uvicorn worker keeps a snapshot of the User and GlobalSettings columns per
+user id for USER_CACHE_TTL seconds (LRU, USER_CACHE_SIZE ids). A hit rebuilds
+the objects and merges them into the request's session without a query
+(Session.merge(load=False)), so routes still get a session-bound User whose
+changes commit as before and whose .settings / .cards work as usual.
+
+Invalidation — any worker, any write path:
+  * An after_flush hook on SessionLocal sees every flushed User or
+    GlobalSettings change (account updates, password / MFA toggles, settings
+    saves, chat tools, restores, deletes) and sends pg_notify('cardstoard_users',
+    ids) in the same transaction, so it is delivered only on commit.
+  * A listener thread per worker (start_listener / stop_listener, from main.py)
+    holds a LISTEN connection and drops the notified ids from its cache,
+    remembering when each changed (changed_since — used to reject access
+    tokens whose embedded claims predate a change).
+  * While the LISTEN connection is down, notifications could be missed, so the
+    cache is bypassed entirely and emptied when it comes back. Changes made
+    before the current connection started listening are unknown too, so
+    changed_since() treats every token issued before then as changed.
+
+Counters for GET /admin/auth-metrics: cache_stats().
+"""
+
+import copy
+import logging
+import os
+import select
+import threading
+import time
+from collections import OrderedDict
+
+import psycopg2
+from sqlalchemy import event, inspect as sa_inspect, text
+from sqlalchemy.orm import Session, make_transient_to_detached
+from sqlalchemy.orm.attributes import set_committed_value
+
+from ..config import cfg_settings
+from ..database import SQLALCHEMY_DATABASE_URL, SessionLocal
+from ..models import GlobalSettings, User
+
+logger = logging.getLogger("cardstoard.user_cache")
+
+USER_CACHE_TTL  = int(os.getenv("USER_CACHE_TTL", "60"))
+USER_CACHE_SIZE = int(os.getenv("USER_CACHE_SIZE", "10000"))
+
+CHANNEL = "cardstoard_users"
+
+# Changes are remembered this long — the lifetime of an access token's claims
+_CHANGED_KEEP_SECONDS = cfg_settings.ACCESS_MIN * 60 + 60
+
+_USER_COLUMNS = [a.key for a in sa_inspect(User).mapper.column_attrs]
+_SETTINGS_COLUMNS = [a.key for a in sa_inspect(GlobalSettings).mapper.column_attrs]
+
+_entries: OrderedDict[int, tuple] = OrderedDict()   # id → (expires_at, user cols, settings cols | None)
+_changed_at: dict[int, float] = {}
+_listening_since = float("inf")   # time.time() the current LISTEN connection became active
+_lock = threading.Lock()
+_listening = threading.Event()
+_stop = threading.Event()
+_thread = None
+
+_stats = {"hits": 0, "misses": 0, "bypassed": 0, "invalidations": 0,
+          "token_fast_path": 0, "token_fallbacks": 0}
+
+
+def _count(key: str) -> None:
+    with _lock:
+        _stats[key] += 1
+
+
+def count_token(fast: bool) -> None:
+    """Record whether a get_token_user() call was served from token claims."""
+    _count("token_fast_path" if fast else "token_fallbacks")
+
+
+def enabled() -> bool:
+    return _listening.is_set()
+
+
+# ---------------------------------------------------------------------------
+# Cache entries
+# ---------------------------------------------------------------------------
+def _snapshot(obj, columns) -> dict:
+    return {c: copy.deepcopy(getattr(obj, c)) for c in columns}
+
+
+def _rebuild(cls, cols: dict):
+    obj = cls(**copy.deepcopy(cols))
+    make_transient_to_detached(obj)   # clean, as if just loaded
+    return obj
+
+
+def lookup(db: Session, user_id: int):
+    """Session-bound User (+ settings) from the cache, or None on a miss."""
+    if not enabled():
+        _count("bypassed")
+        return None
+    now = time.monotonic()
+    with _lock:
+        entry = _entries.get(user_id)
+        if entry is None or entry[0] < now:
+            _stats["misses"] += 1
+            return None
+        _entries.move_to_end(user_id)
+        _stats["hits"] += 1
+    _, user_cols, settings_cols = entry
+
+    user = _rebuild(User, user_cols)
+    settings = _rebuild(GlobalSettings, settings_cols) if settings_cols is not None else None
+    set_committed_value(user, "settings", settings)
+    if settings is not None:
+        set_committed_value(settings, "user", user)
+    return db.merge(user, load=False)
+
+
+def store(user: User, loaded_at: float) -> None:
+    """
+    Cache a user (with .settings loaded) read at time.time() == loaded_at,
+    unless it changed since — then the snapshot may already be stale.
+    """
+    if not enabled():
+        return
+    settings_cols = _snapshot(user.settings, _SETTINGS_COLUMNS) if user.settings is not None else None
+    entry = (time.monotonic() + USER_CACHE_TTL, _snapshot(user, _USER_COLUMNS), settings_cols)
+    with _lock:
+        if loaded_at < _listening_since or _changed_at.get(user.id, 0) >= loaded_at:
+            return
+        _entries[user.id] = entry
+        _entries.move_to_end(user.id)
+        while len(_entries) > USER_CACHE_SIZE:
+            _entries.popitem(last=False)
+
+
+def invalidate(user_ids) -> None:
+    now = time.time()
+    with _lock:
+        for user_id in user_ids:
+            _entries.pop(user_id, None)
+            _changed_at[user_id] = now
+            _stats["invalidations"] += 1
+        if len(_changed_at) > USER_CACHE_SIZE:
+            cutoff = now - _CHANGED_KEEP_SECONDS
+            for user_id in [u for u, t in _changed_at.items() if t < cutoff]:
+                del _changed_at[user_id]
+
+
+def changed_since(user_id: int, timestamp: float) -> bool:
+    """True if the user changed at or after timestamp (or changes may have been missed)."""
+    if not enabled():
+        return True
+    with _lock:
+        if timestamp < _listening_since:
+            return True
+        return _changed_at.get(user_id, 0) >= timestamp
+
+
+def _clear() -> None:
+    with _lock:
+        _entries.clear()
+
+
+def cache_stats() -> dict:
+    with _lock:
+        stats = dict(_stats)
+        size = len(_entries)
+    lookups = stats["hits"] + stats["misses"]
+    return {
+        "enabled": enabled(),
+        "size": size,
+        "ttl_seconds": USER_CACHE_TTL,
+        **stats,
+        "hit_rate": round(stats["hits"] / lookups, 3) if lookups else None,
+    }
+
+
+# ---------------------------------------------------------------------------
+# Invalidation
+# ---------------------------------------------------------------------------
+@event.listens_for(SessionLocal, "after_flush")
+def _notify_user_changes(session: Session, flush_context) -> None:
+    ids = set()
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        if isinstance(obj, User) and obj.id is not None:
+            ids.add(obj.id)
+        elif isinstance(obj, GlobalSettings) and obj.user_id is not None:
+            ids.add(obj.user_id)
+    if not ids:
+        return
+    invalidate(ids)   # this worker, right away; every worker again on commit
+    session.connection().execute(
+        text("SELECT pg_notify(:channel, :ids)"),
+        {"channel": CHANNEL, "ids": ",".join(str(i) for i in sorted(ids))},
+    )
+
+
+def _listen() -> None:
+    global _listening_since
+    while not _stop.is_set():
+        conn = None
+        try:
+            conn = psycopg2.connect(SQLALCHEMY_DATABASE_URL)
+            conn.autocommit = True
+            with conn.cursor() as cur:
+                cur.execute(f"LISTEN {CHANNEL}")
+            _clear()
+            with _lock:
+                _listening_since = time.time()
+            _listening.set()
+            while not _stop.is_set():
+                if select.select([conn], [], [], 5) == ([], [], []):
+                    continue
+                conn.poll()
+                while conn.notifies:
+                    payload = conn.notifies.pop(0).payload
+                    invalidate(int(i) for i in payload.split(",") if i)
+        except Exception as e:
+            logger.warning("User cache listener disconnected, cache bypassed: %s", e)
+        finally:
+            _listening.clear()
+            _clear()
+            if conn is not None:
+                conn.close()
+        _stop.wait(5)
+
+
+def start_listener() -> None:
+    global _thread
+    if _thread is None or not _thread.is_alive():
+        _stop.clear()
+        _thread = threading.Thread(target=_listen, name="cardstoard-user-cache", daemon=True)
+        _thread.start()
+
+
+def stop_listener() -> None:
+    _stop.set()
+    if _thread is not None:
+        _thread.join(timeout=6)
@@ -7,3 +7,7 @@ REFRESH_DAYS = int(os.getenv("REFRESH_DAYS", 14))  # default 14 days
 # JWT
 JWT_SECRET = os.getenv("JWT_SECRET", "dev-secret-change-me")
 JWT_ALG = os.getenv("JWT_ALG", "HS256")
+
+# Operator endpoints (e.g. GET /admin/auth-metrics): comma-separated user ids.
+# Empty means nobody.
+ADMIN_USER_IDS = {int(i) for i in os.getenv("ADMIN_USER_IDS", "").split(",") if i.strip()}
@@ -1,77 +1,96 @@
 """
-Seed the dictionary_entries table from the two static source files.
-Additive/idempotent: skips individual rows that already exist so new entries
-in player_dictionary.py are picked up on subsequent deploys without wiping
-existing data.
+Seed the dictionary_entries table from the static source files
+(player_dictionary.py, players.json, *_dict.csv).
+
+Content-hashed and versioned: a SHA-256 digest of the source files (plus
+SEED_FORMAT_VERSION) is stored in app_metadata under 'dictionary_seed_digest'.
+When it matches, startup skips seeding without parsing anything. When a source
+file changes, every source row is bulk-inserted with
+INSERT ... ON CONFLICT DO NOTHING against ux_dictionary_entries_key
+(migration 033), so existing rows — and any book values on them — are left
+untouched and new entries are picked up on the next deploy.
+
+A transaction-scoped advisory lock keeps concurrent uvicorn workers from
+seeding at the same time; the loser re-reads the digest and skips.
 """
+import csv
+import hashlib
+import json
+from pathlib import Path
+
+from sqlalchemy import text
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.orm import Session
+
 from app.models import DictionaryEntry
 
+# Bump when the parsing/filtering below changes, to force a re-seed
+SEED_FORMAT_VERSION = "1"
+
+DATA_DIR = Path(__file__).resolve().parent
+
+_DIGEST_KEY = "dictionary_seed_digest"
+_LOCK_ID = 0x5EED_D1C7   # pg_advisory_xact_lock key for dictionary seeding
+_BATCH_ROWS = 1000
+
+_KEY_COLUMNS = ["first_name", "last_name", "brand", "year", "card_number"]
+
+
+def _source_files() -> list[Path]:
+    return [
+        DATA_DIR / "player_dictionary.py",
+        DATA_DIR / "players.json",
+        *sorted(DATA_DIR.glob("*_dict.csv")),
+    ]
+
+
+def source_digest() -> str:
+    """SHA-256 over the seed source files' names and bytes."""
+    h = hashlib.sha256(f"seed-format:{SEED_FORMAT_VERSION}\n".encode())
+    for path in _source_files():
+        h.update(path.name.encode() + b"\0")
+        h.update(path.read_bytes())
+        h.update(b"\0")
+    return h.hexdigest()
 
-def seed_dictionary(db: Session) -> None:
-    # Build a lookup set of (first_name, last_name, brand, year, card_number)
-    # for all rows already in the table.
-    existing = set(
-        db.query(
-            DictionaryEntry.first_name,
-            DictionaryEntry.last_name,
-            DictionaryEntry.brand,
-            DictionaryEntry.year,
-            DictionaryEntry.card_number,
-        ).all()
-    )
-
-    rows = []
+
+def _source_rows() -> list[dict]:
+    """All seed rows, de-duplicated on the natural key (first source wins)."""
+    rows = {}
+
+    def _add(first_name, last_name, rookie_year, brand, year, card_number):
+        key = (first_name, last_name, brand, year, card_number)
+        if key not in rows:
+            rows[key] = {
+                "first_name": first_name,
+                "last_name": last_name,
+                "rookie_year": rookie_year,
+                "brand": brand,
+                "year": year,
+                "card_number": card_number,
+            }
 
     # -- Source 1: Historical dict (year-keyed card numbers) --
     from app.data.player_dictionary import PLAYER_DICTIONARY as HISTORICAL_DICT
     for _key, player in HISTORICAL_DICT.items():
-        first_name = player["first_name"]
-        last_name  = player["last_name"]
-        rookie_year = player["rookie_year"]
         for brand, year_map in player["cards"].items():
             for year, card_number in year_map.items():
-                key = (first_name, last_name, brand, int(year), str(card_number))
-                if key not in existing:
-                    rows.append(DictionaryEntry(
-                        first_name=first_name,
-                        last_name=last_name,
-                        rookie_year=rookie_year,
-                        brand=brand,
-                        year=int(year),
-                        card_number=str(card_number),
-                    ))
-                    existing.add(key)  # prevent intra-batch dupes
+                _add(player["first_name"], player["last_name"], player["rookie_year"],
+                     brand, int(year), str(card_number))
 
     # -- Source 2: Modern players.json (single card_number per brand) --
-    import json
-    from pathlib import Path
-    players_path = Path(__file__).resolve().parent / "players.json"
-    with open(players_path, "r") as f:
+    with open(DATA_DIR / "players.json", "r") as f:
         modern = json.load(f)
-
     for full_name, data in modern.items():
         parts = full_name.strip().split(" ", 1)
         first_name = parts[0].title()
         last_name  = parts[1].title() if len(parts) > 1 else ""
         rookie_year = data["rookie_year"]
         for brand, card_number in data["cards"].items():
-            key = (first_name, last_name, brand, rookie_year, str(card_number))
-            if key not in existing:
-                rows.append(DictionaryEntry(
-                    first_name=first_name,
-                    last_name=last_name,
-                    rookie_year=rookie_year,
-                    brand=brand,
-                    year=rookie_year,
-                    card_number=str(card_number),
-                ))
-                existing.add(key)  # prevent intra-batch dupes
+            _add(first_name, last_name, rookie_year, brand, rookie_year, str(card_number))
 
     # -- Source 3: Dict CSV files (topps, bowman, fleer, etc.) --
-    import csv
-    data_dir = Path(__file__).resolve().parent
-    for csv_path in sorted(data_dir.glob("*_dict.csv")):
+    for csv_path in sorted(DATA_DIR.glob("*_dict.csv")):
         with open(csv_path, newline="", encoding="utf-8") as f:
             for row in csv.DictReader(f):
                 first_s = row["First"].strip()
@@ -90,21 +109,56 @@ def seed_dictionary(db: Session) -> None:
                     continue
                 ry = row.get("RookieYear", "").strip()
                 rookie_year = int(ry) if ry else None
-                key = (row["First"], row["Last"], row["Brand"], int(row["Year"]), str(row["CardNumber"]))
-                if key not in existing:
-                    rows.append(DictionaryEntry(
-                        first_name=row["First"],
-                        last_name=row["Last"],
-                        rookie_year=rookie_year,
-                        brand=row["Brand"],
-                        year=int(row["Year"]),
-                        card_number=str(row["CardNumber"]),
-                    ))
-                    existing.add(key)  # prevent intra-batch dupes
-
-    if rows:
-        db.add_all(rows)
+                _add(row["First"], row["Last"], rookie_year,
+                     row["Brand"], int(row["Year"]), str(row["CardNumber"]))
+
+    return list(rows.values())
+
+
+def _stored_digest(db: Session):
+    return db.execute(
+        text("SELECT value FROM app_metadata WHERE key = :key"), {"key": _DIGEST_KEY}
+    ).scalar()
+
+
+def seed_dictionary(db: Session) -> None:
+    digest = source_digest()
+    try:
+        if _stored_digest(db) == digest:
+            db.rollback()
+            print("[seed] dictionary_entries up to date (source digest unchanged).", flush=True)
+            return
+
+        db.execute(text("SELECT pg_advisory_xact_lock(:id)"), {"id": _LOCK_ID})
+        if _stored_digest(db) == digest:   # another worker seeded while we waited
+            db.rollback()
+            return
+
+        rows = _source_rows()
+        table = DictionaryEntry.__table__
+        inserted = 0
+        for i in range(0, len(rows), _BATCH_ROWS):
+            stmt = (
+                pg_insert(table)
+                .values(rows[i:i + _BATCH_ROWS])
+                .on_conflict_do_nothing(index_elements=_KEY_COLUMNS)
+            )
+            inserted += db.execute(stmt).rowcount
+
+        db.execute(
+            text("""
+                INSERT INTO app_metadata (key, value, updated_at) VALUES (:key, :value, NOW())
+                ON CONFLICT (key) DO UPDATE SET value = EXCLUDED.value, updated_at = NOW()
+            """),
+            {"key": _DIGEST_KEY, "value": digest},
+        )
         db.commit()
-        print(f"[seed] Seeded {len(rows)} new dictionary_entries rows ({len(existing) - len(rows)} already existed).", flush=True)
-    else:
-        print(f"[seed] dictionary_entries up to date ({len(existing)} rows, nothing to add).", flush=True)
+        print(
+            f"[seed] Seeded {inserted} new dictionary_entries rows "
+            f"({len(rows) - inserted} already existed).",
+            flush=True,
+        )
+    except Exception as e:
+        # Missing migrations (app_metadata / ux_dictionary_entries_key) must not block startup
+        db.rollback()
+        print(f"[seed] Dictionary seeding skipped: {e!r} — run `python migrate.py`.", flush=True)
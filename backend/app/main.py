@@ -12,14 +12,18 @@ Responsibilities:
 
 Startup sequence:
 1. Base.metadata.create_all() — creates any missing tables (idempotent)
-2. seed_dictionary(db)         — inserts new dictionary entries (per-row dedup)
+2. seed_dictionary(db)         — no-op when the source-file digest is unchanged; otherwise
+                                  bulk INSERT ... ON CONFLICT DO NOTHING
+   fail_interrupted_jobs(db)    — marks jobs orphaned by the previous process as failed
+   start_outbox()               — starts the email outbox sender thread
+   start_listener()             — starts the user cache invalidation listener (LISTEN)
 3. Schema drift check          — logs WARNING if model columns are absent from live DB
 """
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 from .database import engine, Base
-from .routes import cards, rtr_settings, auth, analytics, email_test, account, chat, dictionary, sets, boxes, balls, wax, packs, admin
+from .routes import cards, rtr_settings, auth, analytics, email_test, account, chat, dictionary, sets, boxes, balls, wax, packs, admin, jobs
 from .config import cfg_settings
 from .auth.cookies import set_access_cookie
 
@@ -75,11 +79,17 @@ def on_startup():
 
     from .database import SessionLocal
     from .data.seed_dictionary import seed_dictionary
+    from .services.jobs import fail_interrupted_jobs
+    from .services.email_outbox import start_outbox
+    from .auth.user_cache import start_listener
     db = SessionLocal()
     try:
         seed_dictionary(db)
+        fail_interrupted_jobs(db)
     finally:
         db.close()
+    start_outbox()
+    start_listener()
 
     # --- Schema drift check ---
     # Compares SQLAlchemy model columns against the live DB.
@@ -104,6 +114,21 @@ def on_startup():
     else:
         logger.info("Schema check passed — DB matches model.")
 
+@app.on_event("shutdown")
+async def on_shutdown():
+    """Close the pooled Anthropic API connections, the image-prep / QR label process pools,
+    the email outbox sender thread and the user cache listener."""
+    from .services.ai_client import close_client
+    from .services.card_identify import shutdown_prep_pool
+    from .services.labels import shutdown_label_pool
+    from .services.email_outbox import stop_outbox
+    from .auth.user_cache import stop_listener
+    await close_client()
+    shutdown_prep_pool()
+    shutdown_label_pool()
+    stop_outbox()
+    stop_listener()
+
 # ---------------------------
 # Include routers
 # ---------------------------
@@ -121,6 +146,7 @@ app.include_router(balls.router)
 app.include_router(wax.router)
 app.include_router(packs.router)
 app.include_router(admin.router)
+app.include_router(jobs.router)
 
 # ---------------------------
 # Health check endpoint
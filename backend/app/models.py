@@ -16,6 +16,9 @@ Models and tables:
   WaxPack          → wax_packs          Individual wax/cello/rack/blister packs owned by a user
   ValuationHistory → valuation_history  Time-series collection value snapshots
   DictionaryEntry  → dictionary_entries Global player/card reference for Smart Fill
+  Job              → jobs               Background bulk operations (import, revalue, restore…)
+  ImageIdentification → image_identifications  Cached identify-image results (global, by image hash)
+  EmailOutbox      → email_outbox       Queued outgoing mail (verification links), sent with retries
 
 Key constraints:
 - User.cards and User.settings are cascade-deleted when User is deleted.
@@ -23,9 +26,9 @@ Key constraints:
 - BoxBinder.quantity column is nullable in DB (SQLAlchemy create_all doesn't enforce NOT NULL
   for default-only columns); Pydantic coerces NULL → 1 in BoxBinderOut.
 
-See migrations/ for schema change history (001–020).
+See migrations/ for schema change history (001–044).
 """
-from sqlalchemy import Column, Integer, String, Boolean, Float, JSON, DateTime, ForeignKey, Text
+from sqlalchemy import Column, Computed, Integer, BigInteger, String, Boolean, Float, JSON, DateTime, ForeignKey, Text
 from sqlalchemy.orm import relationship
 from datetime import datetime, timezone
 from .database import Base
@@ -89,6 +92,10 @@ class Card(Base):
     front_image = Column(String, nullable=True)
     back_image = Column(String, nullable=True)
 
+    # SHA-256 of each image — names its thumbnails (services/thumbnails.py)
+    front_thumb_key = Column(String(64), nullable=True)
+    back_thumb_key = Column(String(64), nullable=True)
+
     # Action timestamps
     created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
     updated_at = Column(DateTime, default=lambda: datetime.now(timezone.utc), onupdate=lambda: datetime.now(timezone.utc))
@@ -164,6 +171,11 @@ class SetEntry(Base):
     first_name  = Column(String, nullable=True)
     last_name   = Column(String, nullable=True)
     rookie      = Column(Boolean, default=False)
+    # Checklist order: card_number's digits as an integer (generated by Postgres)
+    sort_key    = Column(Integer, Computed(
+        r"NULLIF(LEFT(regexp_replace(card_number, '[^0-9]', '', 'g'), 9), '')::INTEGER",
+        persisted=True,
+    ))
     set_list    = relationship("SetList", back_populates="entries")
 
 class UserSetCard(Base):
@@ -280,4 +292,57 @@ class DictionaryEntry(Base):
     book_mid                = Column(Float, nullable=True)
     book_low_mid            = Column(Float, nullable=True)
     book_low                = Column(Float, nullable=True)
-    book_values_imported_at = Column(DateTime, nullable=True)
\ No newline at end of file
+    book_values_imported_at = Column(DateTime, nullable=True)
+
+class Job(Base):
+    """Background bulk operation (CSV import, revalue-all, restore, image ZIP, value import).
+    Created by services/jobs.submit_job and polled via GET /jobs/{id}. progress is 0–100;
+    cancel_requested is checked cooperatively by the worker between progress updates."""
+    __tablename__ = "jobs"
+    id               = Column(Integer, primary_key=True, index=True)
+    user_id          = Column(Integer, ForeignKey(USER_ID_REF, ondelete="CASCADE"), nullable=False)
+    kind             = Column(String, nullable=False)
+    status           = Column(String, nullable=False, default="queued")  # queued, running, succeeded, failed, cancelled
+    progress         = Column(Integer, nullable=False, default=0)
+    message          = Column(String, nullable=True)
+    result           = Column(JSON, nullable=True)
+    error            = Column(Text, nullable=True)
+    cancel_requested = Column(Boolean, nullable=False, default=False)
+    worker           = Column(String, nullable=True)   # "{hostname}:{pid}" of the owning process
+    created_at       = Column(DateTime, default=lambda: datetime.now(timezone.utc))
+    started_at       = Column(DateTime, nullable=True)
+    finished_at      = Column(DateTime, nullable=True)
+
+class ImageIdentification(Base):
+    """Cached Claude Vision result for POST /cards/identify-image, keyed by the SHA-256 of the
+    uploaded bytes, with a 64-bit difference hash (phash) for near-duplicate photos. Exact SHA-256
+    hits are shared by all users — the row holds only what is printed on the card; phash matches
+    are limited to the uploader (user_id). Managed by services/identify_cache.py."""
+    __tablename__ = "image_identifications"
+    id             = Column(Integer, primary_key=True)
+    sha256         = Column(String(64), nullable=False, unique=True)
+    phash          = Column(BigInteger, nullable=False)
+    user_id        = Column(Integer, ForeignKey(USER_ID_REF, ondelete="SET NULL"), nullable=True)
+    fields         = Column(JSON, nullable=False)
+    confidence     = Column(Float, nullable=False, default=0.0)
+    grade_estimate = Column(JSON, nullable=True)   # present when identified with include_grade
+    hits           = Column(Integer, nullable=False, default=0)
+    created_at     = Column(DateTime, default=lambda: datetime.now(timezone.utc))
+    last_used_at   = Column(DateTime, default=lambda: datetime.now(timezone.utc))
+
+class EmailOutbox(Base):
+    """Outgoing email waiting for (or done with) delivery. Queued by services/email_outbox.queue_email
+    in the caller's transaction and sent by the outbox thread; failures are retried with backoff
+    (next_attempt_at) until OUTBOX_MAX_ATTEMPTS, then status becomes "failed"."""
+    __tablename__ = "email_outbox"
+    id              = Column(Integer, primary_key=True)
+    to_address      = Column(String, nullable=False)
+    subject         = Column(String, nullable=False)
+    body            = Column(Text, nullable=False)
+    html            = Column(Text, nullable=True)
+    status          = Column(String, nullable=False, default="pending")   # pending, sent, failed
+    attempts        = Column(Integer, nullable=False, default=0)
+    last_error      = Column(Text, nullable=True)
+    next_attempt_at = Column(DateTime, nullable=False, default=lambda: datetime.now(timezone.utc))
+    created_at      = Column(DateTime, default=lambda: datetime.now(timezone.utc))
+    sent_at         = Column(DateTime, nullable=True)
@@ -1,14 +1,14 @@
 import os
 import re
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Response
 from pydantic import BaseModel, EmailStr, field_validator
 from sqlalchemy.orm import Session
 from ..database import get_db
 from ..models import User
-from ..auth.security import verify_password, hash_password
-from ..auth.cookies import clear_auth_cookie
+from ..auth.security import verify_password, hash_password, create_token, user_claims
+from ..auth.cookies import clear_auth_cookie, set_access_cookie
 from ..auth.email_verify import generate_email_token
-from ..utils.email_service import send_email
+from ..services.email_outbox import notify_outbox, queue_email
 from ..auth.security import get_current_user
 
 router = APIRouter(prefix="/account", tags=["account"])
@@ -54,25 +54,29 @@ def get_account(current: User = Depends(get_current_user)):
     }
 
 @router.post("/update-username")
-def update_username(payload: UpdateUsernameIn, db: Session = Depends(get_db), current: User = Depends(get_current_user)):
+def update_username(payload: UpdateUsernameIn, response: Response, db: Session = Depends(get_db), current: User = Depends(get_current_user)):
     if db.query(User).filter(User.username == payload.username).first():
         raise HTTPException(400, "Username already taken.")
     current.username = payload.username
     db.commit()
+    # Fresh access-token claims for this browser; other sessions fall back via the user cache
+    set_access_cookie(response, create_token(current.id, "access", user_claims(current)))
     return {"ok": True, "message": "Username updated successfully."}
 
 @router.post("/update-email")
-def update_email(payload: UpdateEmailIn, db: Session = Depends(get_db), current: User = Depends(get_current_user)):
+def update_email(payload: UpdateEmailIn, response: Response, db: Session = Depends(get_db), current: User = Depends(get_current_user)):
     if db.query(User).filter(User.email == payload.email).first():
         raise HTTPException(400, "Email already in use.")
 
     current.email = payload.email
     current.is_verified = False
-    db.commit()
 
     token = generate_email_token(payload.email)
     verify_link = f"{os.getenv('FRONTEND_BASE_URL', 'https://cardstoard.com')}/verify?token={token}"
-    send_email(payload.email, "Verify your new email", f"Click to verify your new email: {verify_link}")
+    queue_email(db, payload.email, "Verify your new email", f"Click to verify your new email: {verify_link}")
+    db.commit()
+    notify_outbox()
+    set_access_cookie(response, create_token(current.id, "access", user_claims(current)))
 
     return {"ok": True, "message": "Email updated. Please verify your new address."}
 
@@ -6,23 +6,35 @@ Admin-only operations, all mounted under /admin.
 Key endpoints:
   POST /admin/bulk-image-import   Accept ZIP of card photos, link each to the correct card.
                                   Filenames must match: {card_id}_{front|back}_{anything}.{ext}
+                                  Thumbnails are generated as each image is linked.
                                   Returns: { imported: N, errors: ["...", ...] }
+                                  ?async=true runs it as a background job (202 + job id);
+                                  GET /jobs/{id} reports "N of M images imported" while
+                                  it runs and the same summary as its result
+  GET  /admin/auth-metrics        bcrypt pool / email outbox latency, user cache hit rate
+                                  (users listed in ADMIN_USER_IDS only)
 """
-import io
 import os
 import re
 import shutil
+import tempfile
 import zipfile
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path as FSPath
 
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File
+from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Query
+from sqlalchemy import update
 from sqlalchemy.orm import Session
 from werkzeug.utils import secure_filename
 
 from app import models
 from app.database import get_db
-from app.auth.security import get_current_user
+from app.auth.security import get_admin_user, get_current_user, password_pool_stats
+from app.auth.user_cache import cache_stats
 from app.models import User
+from app.services.email_outbox import outbox_stats
+from app.services.jobs import NO_PROGRESS, submit_job, accepted
+from app.services.thumbnails import make_thumbnails
 
 router = APIRouter(prefix="/admin", tags=["admin"])
 
@@ -31,6 +43,12 @@ BASE_DIR   = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 UPLOAD_DIR = os.path.join(BASE_DIR, "static", "cards")
 os.makedirs(UPLOAD_DIR, exist_ok=True)
 
+# Bulk image import tuning
+IMAGE_IMPORT_WORKERS    = int(os.getenv("IMAGE_IMPORT_WORKERS", "4"))
+IMAGE_IMPORT_BATCH      = int(os.getenv("IMAGE_IMPORT_BATCH", "200"))
+IMAGE_IMPORT_MAX_BYTES  = int(os.getenv("IMAGE_IMPORT_MAX_MB", "50")) * 1024 * 1024
+IMAGE_IMPORT_COPY_BYTES = 1024 * 1024
+
 # Allowed image extensions
 _IMAGE_EXTS = {".jpg", ".jpeg", ".png", ".webp", ".gif"}
 
@@ -57,9 +75,132 @@ def _parse_zip_filename(name: str):
     return int(m.group("card_id")), m.group("side").lower(), bare
 
 
+def _extract_image(zf: zipfile.ZipFile, info: zipfile.ZipInfo, filepath: FSPath):
+    """Write one ZIP member to disk and make its thumbnails (runs on the import pool)."""
+    with zf.open(info) as src, open(filepath, "wb") as dst:
+        shutil.copyfileobj(src, dst, IMAGE_IMPORT_COPY_BYTES)
+    try:
+        return make_thumbnails(str(filepath)), None
+    except Exception as exc:
+        return None, f"imported, but thumbnails failed — {exc}."
+
+
+def _plan_zip_images(db: Session, user: User, zf: zipfile.ZipFile, upload_dir: FSPath, errors: list):
+    """
+    Map each usable ZIP member to its target: {(card_id, side): (info, bare_name, filepath)}.
+    Ownership of every referenced card is checked in one query; when the
+    archive holds several images for the same card side, the last one wins.
+    """
+    parsed = []
+    for info in zf.infolist():
+        if info.is_dir():
+            continue
+        p = _parse_zip_filename(info.filename)
+        if not p:
+            errors.append(
+                f"{os.path.basename(info.filename)}: skipped — "
+                "filename must match {card_id}_{front|back}_{anything}.{ext}"
+            )
+            continue
+        parsed.append((info, *p))
+
+    card_ids = {card_id for _, card_id, _, _ in parsed}
+    owned = {
+        row.id for row in db.query(models.Card.id).filter(
+            models.Card.user_id == user.id,
+            models.Card.id.in_(card_ids),
+        )
+    } if card_ids else set()
+
+    plan = {}
+    for info, card_id, side, bare_name in parsed:
+        if card_id not in owned:
+            errors.append(f"{bare_name}: card ID {card_id} not found or not owned by you.")
+            continue
+        if info.file_size > IMAGE_IMPORT_MAX_BYTES:
+            errors.append(f"{bare_name}: larger than {IMAGE_IMPORT_MAX_BYTES // (1024 * 1024)} MB — skipped.")
+            continue
+        filepath = (upload_dir / f"card_{card_id}_{side}_{secure_filename(bare_name)}").resolve()
+        if not str(filepath).startswith(str(upload_dir)):
+            errors.append(f"{bare_name}: invalid path — skipped.")
+            continue
+        if (card_id, side) in plan:
+            errors.append(f"{plan[(card_id, side)][1]}: skipped — a later image in the ZIP replaces it.")
+        plan[(card_id, side)] = (info, bare_name, filepath)
+    return plan
+
+
+def _import_zip_images(db: Session, ctx, user: User, archive) -> dict:
+    """
+    Link every image in the ZIP to its card (job worker — see services/jobs.py).
+
+    archive is a seekable file (the spooled upload); members are streamed from
+    it one at a time, so memory stays flat however large the ZIP is. Files and
+    thumbnails are written by IMAGE_IMPORT_WORKERS threads; card rows are
+    updated and committed every IMAGE_IMPORT_BATCH images, so a cancelled job
+    keeps the batches it already committed.
+    """
+    imported = 0
+    errors   = []
+
+    upload_dir = FSPath(UPLOAD_DIR).resolve()
+    upload_dir.mkdir(parents=True, exist_ok=True)
+
+    with zipfile.ZipFile(archive, "r") as zf:
+        plan = _plan_zip_images(db, user, zf, upload_dir, errors)
+        total = len(plan)
+        pending = []
+
+        def flush():
+            nonlocal imported
+            if pending:
+                db.execute(update(models.Card), pending)
+                db.commit()
+                imported += len(pending)
+                pending.clear()
+            ctx.progress(imported, total, f"{imported} of {total} images imported")
+
+        pool = ThreadPoolExecutor(max_workers=IMAGE_IMPORT_WORKERS, thread_name_prefix="cardstoard-zip")
+        try:
+            futures = {
+                pool.submit(_extract_image, zf, info, filepath): (card_id, side, bare_name, filepath)
+                for (card_id, side), (info, bare_name, filepath) in plan.items()
+            }
+            for future in as_completed(futures):
+                card_id, side, bare_name, filepath = futures[future]
+                try:
+                    thumb_key, warning = future.result()
+                except Exception as exc:
+                    errors.append(f"{bare_name}: write error — {exc}.")
+                    continue
+                if warning:
+                    errors.append(f"{bare_name}: {warning}")
+                pending.append({
+                    "id": card_id,
+                    f"{side}_image": f"/static/cards/{filepath.name}",
+                    f"{side}_thumb_key": thumb_key,
+                })
+                if len(pending) >= IMAGE_IMPORT_BATCH:
+                    flush()
+                else:
+                    ctx.progress(imported + len(pending), total)
+            flush()
+        finally:
+            pool.shutdown(wait=True, cancel_futures=True)
+
+    return {"imported": imported, "errors": errors}
+
+
+def _import_zip_job(db: Session, ctx, user: User, spool) -> dict:
+    """Job wrapper: the request's upload is closed by then, so it runs off a temp copy."""
+    with spool:
+        return _import_zip_images(db, ctx, user, spool)
+
+
 @router.post("/bulk-image-import")
 def bulk_image_import(
     file: UploadFile = File(...),
+    run_async: bool = Query(False, alias="async"),
     db: Session = Depends(get_db),
     current: User = Depends(get_current_user),
 ):
@@ -69,71 +210,37 @@ def bulk_image_import(
 
     Only images belonging to the current user are updated.
     Returns a summary of imported files and any per-file errors.
+    With ?async=true the import runs as a job and 202 is returned.
     """
     if not file.filename or not file.filename.lower().endswith(".zip"):
         raise HTTPException(status_code=400, detail="Only .zip files are accepted.")
 
-    raw = file.file.read()
-    if not zipfile.is_zipfile(io.BytesIO(raw)):
+    if not zipfile.is_zipfile(file.file):
         raise HTTPException(status_code=400, detail="Uploaded file is not a valid ZIP archive.")
+    file.file.seek(0)
 
-    imported = 0
-    errors   = []
+    if run_async:
+        spool = tempfile.TemporaryFile()
+        shutil.copyfileobj(file.file, spool, IMAGE_IMPORT_COPY_BYTES)
+        spool.seek(0)
+        return accepted(submit_job(db, current, "bulk-image-import", _import_zip_job, spool))
 
-    upload_dir = FSPath(UPLOAD_DIR).resolve()
-    upload_dir.mkdir(parents=True, exist_ok=True)
+    return _import_zip_images(db, NO_PROGRESS, current, file.file)
 
-    with zipfile.ZipFile(io.BytesIO(raw), "r") as zf:
-        for entry_name in zf.namelist():
-            # Skip directories
-            if entry_name.endswith("/"):
-                continue
-
-            parsed = _parse_zip_filename(entry_name)
-            if not parsed:
-                errors.append(
-                    f"{os.path.basename(entry_name)}: skipped — "
-                    "filename must match {card_id}_{front|back}_{anything}.{ext}"
-                )
-                continue
-
-            card_id, side, bare_name = parsed
-
-            # Ownership check
-            card = db.query(models.Card).filter(
-                models.Card.id == card_id,
-                models.Card.user_id == current.id,
-            ).first()
-            if not card:
-                errors.append(f"{bare_name}: card ID {card_id} not found or not owned by you.")
-                continue
-
-            # Safely build output filename
-            safe_name = secure_filename(bare_name)
-            filename  = f"card_{card_id}_{side}_{safe_name}"
-            filepath  = (upload_dir / filename).resolve()
-
-            # Path traversal guard
-            if not str(filepath).startswith(str(upload_dir)):
-                errors.append(f"{bare_name}: invalid path — skipped.")
-                continue
-
-            # Write file
-            try:
-                with zf.open(entry_name) as src, open(filepath, "wb") as dst:
-                    shutil.copyfileobj(src, dst)
-            except Exception as exc:
-                errors.append(f"{bare_name}: write error — {exc}.")
-                continue
-
-            # Update DB
-            rel_path = f"/static/cards/{filename}"
-            if side == "front":
-                card.front_image = rel_path
-            else:
-                card.back_image = rel_path
-
-            db.commit()
-            imported += 1
 
-    return {"imported": imported, "errors": errors}
+@router.get("/auth-metrics")
+def auth_metrics(
+    db: Session = Depends(get_db),
+    current: User = Depends(get_admin_user),
+):
+    """
+    Latency of this worker's bcrypt pool (queue wait, hash, verify), the email
+    outbox (queue depth by status, SMTP send time) and the user cache (hit
+    rate, invalidations, token fast-path use). Per uvicorn worker; counters
+    reset on restart.
+    """
+    return {
+        "passwords": password_pool_stats(),
+        "email_outbox": outbox_stats(db),
+        "user_cache": cache_stats(),
+    }
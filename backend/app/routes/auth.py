@@ -4,20 +4,27 @@ backend/app/routes/auth.py
 Authentication routes — all mounted under /auth.
 
 Endpoints:
-  POST /auth/register          Create account + GlobalSettings, send verification email
+  POST /auth/register          Create account + GlobalSettings, queue verification email (outbox)
   POST /auth/login             Validate credentials + optional TOTP, set JWT cookies, record last_login
+                               (both hash/verify passwords on the bcrypt pool — auth/security.py)
   GET  /auth/verify            Confirm email token and redirect to frontend success/error page
-  POST /auth/resend-verify     Re-send verification email (idempotent, doesn't leak email existence)
+  POST /auth/resend-verify     Re-queue verification email (idempotent, doesn't leak email existence)
   POST /auth/refresh           Exchange refresh_token cookie for a new access_token cookie
   POST /auth/logout            Clear both auth cookies
   POST /auth/mfa/setup         Generate TOTP secret and QR code PNG (base64)
   POST /auth/mfa/enable        Verify TOTP code and activate MFA
   POST /auth/mfa/disable       Verify TOTP code and deactivate MFA
-  GET  /auth/me                Return current user info (requires valid auth)
+  GET  /auth/me                Return current user info (requires valid auth; answered from
+                               access-token claims when current — get_token_user)
+
+register, login, resend-verify and mfa/* are throttled per IP / identifier / user
+(auth/throttle.py) and answer 429 + Retry-After before any lookup or bcrypt work.
 """
 from fastapi import APIRouter, Depends, HTTPException, Response, Request
+from fastapi.concurrency import run_in_threadpool
 from pydantic import BaseModel, EmailStr
 from sqlalchemy import or_
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 from datetime import datetime, timezone
 import pyotp, qrcode, os, jwt
@@ -26,9 +33,16 @@ from base64 import b64encode
 from ..database import get_db
 from ..models import User, GlobalSettings
 from ..schemas import UserCreate
-from ..auth.security import hash_password, verify_password, create_token, get_current_user
+from ..auth.security import (
+    TokenUser, create_token, get_current_user, get_token_user, hash_password_async, load_user,
+    user_claims, verify_password_async,
+)
+from ..auth.throttle import (
+    login_succeeded, throttle_login, throttle_mfa, throttle_register, throttle_resend_verify,
+)
 from ..auth.cookies import set_auth_cookie, set_access_cookie, set_refresh_cookie, clear_auth_cookie
-from ..auth.email_verify import verify_email_token, send_verification_email
+from ..auth.email_verify import verify_email_token, queue_verification_email
+from ..services.email_outbox import notify_outbox
 
 router = APIRouter(prefix="/auth", tags=["auth"])
 
@@ -43,20 +57,14 @@ class LoginIn(BaseModel):
 
 #--Registration--#
 
-@router.post("/register")
-async def register_user(user: UserCreate, db: Session = Depends(get_db)):
+def _register(db: Session, user: UserCreate, hashed_pw: str) -> str:
     """
-    Create a new user account.
-    - Rejects if email or username already exists.
-    - Hashes password with bcrypt.
-    - Creates a default GlobalSettings row for the user.
-    - Sends a verification email via SES. Returns 500 if email delivery fails.
+    Create the user + default settings and queue the verification email, in one
+    commit. Returns the new user's email, read before the commit expires it.
     """
-    # Prevent duplicates
     if db.query(User).filter((User.email == user.email) | (User.username == user.username)).first():
         raise HTTPException(status_code=400, detail="Email or username already taken")
 
-    hashed_pw = hash_password(user.password)
     new_user = User(
         email=user.email,
         username=user.username,
@@ -65,35 +73,85 @@ async def register_user(user: UserCreate, db: Session = Depends(get_db)):
         is_active=True,
     )
     db.add(new_user)
-    db.commit()
-    db.refresh(new_user)
+    db.flush()
 
     # create default settings row for the new user
-    if not db.query(GlobalSettings).filter(GlobalSettings.user_id == new_user.id).first():
-        s = GlobalSettings(user_id=new_user.id, app_name="CardStoard")
-        db.add(s); db.commit()
+    db.add(GlobalSettings(user_id=new_user.id, app_name="CardStoard"))
+    email = new_user.email
+    queue_verification_email(db, email)
+    db.commit()
+    return email
+
+@router.post("/register")
+async def register_user(user: UserCreate, request: Request, db: Session = Depends(get_db)):
+    """
+    Create a new user account.
+    - Rejects if email or username already exists.
+    - Hashes password with bcrypt on the password pool (auth/security.py).
+    - Creates a default GlobalSettings row for the user.
+    - Queues the verification email in the outbox (services/email_outbox.py),
+      which sends it in the background and retries failed deliveries.
+    Database work runs in the threadpool, so the event loop never blocks.
+    """
+    throttle_register(request)
 
-    sent = send_verification_email(new_user.email)
-    if not sent:
-        raise HTTPException(status_code=500, detail="Failed to send verification email. Please try again.")
+    # Cheap duplicate check first, so taken names don't cost a bcrypt hash
+    taken = await run_in_threadpool(
+        lambda: db.query(User.id).filter((User.email == user.email) | (User.username == user.username)).first()
+    )
+    if taken:
+        raise HTTPException(status_code=400, detail="Email or username already taken")
 
-    return {"ok": True, "message": f"Verification email sent to {new_user.email}"}
+    hashed_pw = await hash_password_async(user.password)
+    try:
+        email = await run_in_threadpool(_register, db, user, hashed_pw)
+    except IntegrityError:
+        # Same email/username registered concurrently
+        await run_in_threadpool(db.rollback)
+        raise HTTPException(status_code=400, detail="Email or username already taken")
+    notify_outbox()
+
+    return {"ok": True, "message": f"Verification email sent to {email}"}
 
 #--Login--#
 
+def _login_user(db: Session, identifier: str):
+    return db.query(User).filter(
+        or_(User.email == identifier, User.username == identifier)
+    ).first()
+
+def _record_login(db: Session, user: User) -> tuple[dict, dict]:
+    """
+    Stamp last_login and commit. Returns (token claims, response profile), read
+    after reloading the user here, so the route touches no expired attributes
+    (which would lazy-load on the event loop).
+    """
+    user.last_login = datetime.now(timezone.utc)
+    db.commit()
+    db.refresh(user)
+    profile = {
+        "id": user.id,
+        "email": user.email,
+        "username": user.username,
+        "is_verified": user.is_verified,
+        "is_active": user.is_active,
+    }
+    return user_claims(user), profile
+
 @router.post("/login")
-def login(payload: LoginIn, response: Response, db: Session = Depends(get_db)):
+async def login(payload: LoginIn, request: Request, response: Response, db: Session = Depends(get_db)):
     """
     Authenticate a user and issue JWT cookies.
     - If MFA is enabled, TOTP code is required.
     - Blocks unverified accounts with 403.
     - Sets access_token (15 min) and refresh_token (14 day) HttpOnly cookies.
     - Updates user.last_login timestamp on success.
+    bcrypt runs on the password pool and database work in the threadpool.
     """
-    user = db.query(User).filter(
-        or_(User.email == payload.identifier, User.username == payload.identifier)
-    ).first()
-    if not user or not verify_password(payload.password, user.password_hash):
+    throttle_login(request, payload.identifier)
+
+    user = await run_in_threadpool(_login_user, db, payload.identifier)
+    if not user or not await verify_password_async(payload.password, user.password_hash):
         raise HTTPException(401, "Invalid credentials")
 
     if user.mfa_enabled:
@@ -107,25 +165,16 @@ def login(payload: LoginIn, response: Response, db: Session = Depends(get_db)):
     if not user.is_verified:
         raise HTTPException(403, "Email not verified. Please check your inbox.")
 
-    user.last_login = datetime.now(timezone.utc)
-    db.commit()
+    claims, profile = await run_in_threadpool(_record_login, db, user)
+    login_succeeded(request, payload.identifier)
 
-    access = create_token(user.id, "access")
-    refresh = create_token(user.id, "refresh")
+    access = create_token(profile["id"], "access", claims)
+    refresh = create_token(profile["id"], "refresh")
 
     set_auth_cookie(response, "access_token", access)
     set_refresh_cookie(response, refresh)
 
-    return {
-        "ok": True,
-        "user": {
-            "id": user.id,
-            "email": user.email,
-            "username": user.username,
-            "is_verified": user.is_verified,
-            "is_active": user.is_active,
-        },
-    }
+    return {"ok": True, "user": profile}
 
 #--Verification--#
 
@@ -158,22 +207,23 @@ class ResendVerifyIn(BaseModel):
     email: EmailStr
 
 @router.post("/resend-verify")
-def resend_verify(payload: ResendVerifyIn, db: Session = Depends(get_db)):
+def resend_verify(payload: ResendVerifyIn, request: Request, db: Session = Depends(get_db)):
+    throttle_resend_verify(request, payload.email)
     user = db.query(User).filter(User.email == payload.email).first()
     if not user:
         # Don't reveal whether the email exists
         return {"ok": True, "message": "If that email is registered and unverified, a new link has been sent."}
     if user.is_verified:
         return {"ok": True, "message": "This email is already verified. You can log in."}
-    sent = send_verification_email(user.email)
-    if not sent:
-        raise HTTPException(status_code=500, detail="Failed to send verification email. Please try again.")
+    queue_verification_email(db, user.email)
+    db.commit()
+    notify_outbox()
     return {"ok": True, "message": "Verification email resent. Please check your inbox."}
 
 #--Refresh--#
 
 @router.post("/refresh")
-def refresh(request: Request, response: Response):
+def refresh(request: Request, response: Response, db: Session = Depends(get_db)):
     """
     Exchange a valid refresh_token cookie for a new access_token cookie.
     Called automatically by the frontend api.js interceptor on 401 responses.
@@ -191,7 +241,10 @@ def refresh(request: Request, response: Response):
     except jwt.PyJWTError:
         raise HTTPException(401, "Invalid token")
     
-    new_access = create_token(payload["sub"], "access")
+    user = load_user(db, payload["sub"])
+    if not user:
+        raise HTTPException(401, "User not found")
+    new_access = create_token(user.id, "access", user_claims(user))
     set_access_cookie(response, new_access)
 
     return {"ok": True}
@@ -207,6 +260,7 @@ def logout(response: Response):
 
 @router.post("/mfa/setup")
 def mfa_setup(current: User = Depends(get_current_user), db: Session = Depends(get_db)):
+    throttle_mfa(current.id)
     if current.mfa_enabled and current.mfa_secret:
         return {"already_enabled": True}
 
@@ -226,6 +280,7 @@ class VerifyMFAIn(BaseModel):
 
 @router.post("/mfa/enable")
 def mfa_enable(payload: VerifyMFAIn, current: User = Depends(get_current_user), db: Session = Depends(get_db)):
+    throttle_mfa(current.id)
     if not current.mfa_secret:
         raise HTTPException(400, "Run setup first")
     totp = pyotp.TOTP(current.mfa_secret)
@@ -237,6 +292,7 @@ def mfa_enable(payload: VerifyMFAIn, current: User = Depends(get_current_user),
 
 @router.post("/mfa/disable")
 def mfa_disable(payload: VerifyMFAIn, current: User = Depends(get_current_user), db: Session = Depends(get_db)):
+    throttle_mfa(current.id)
     if not current.mfa_enabled:
         return {"ok": True}
     totp = pyotp.TOTP(current.mfa_secret) if current.mfa_secret else None
@@ -248,7 +304,7 @@ def mfa_disable(payload: VerifyMFAIn, current: User = Depends(get_current_user),
     return {"ok": True}
 
 @router.get("/me")
-def me(current: User = Depends(get_current_user)):
+def me(current: TokenUser = Depends(get_token_user)):
     return {
         "id": current.id,
         "email": current.email,
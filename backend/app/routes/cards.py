@@ -6,55 +6,84 @@ Card inventory CRUD and related operations — all mounted under /cards.
 Key endpoints:
   POST /cards/                     Create card, auto-calculate value, auto-seed DictionaryEntry
   GET  /cards/                     List all cards for current user (paginated)
+  GET  /cards/page                 Keyset-paginated listing with server-side sort + filters
   GET  /cards/count                Total card count
-  GET  /cards/players              Distinct player names (dictionary + user's cards)
-  GET  /cards/smart-fill           Lookup card_number + rookie flag from DictionaryEntry
+  GET  /cards/players              Distinct player names (dictionary + user's cards) — full dump
+  GET  /cards/players/typeahead    Ranked player-name completions for a prefix (ETag / 304)
+  GET  /cards/smart-fill           Lookup card_number + rookie flag from the in-memory dictionary index
   GET  /cards/{id}                 Single card with computed market_factor
   PUT  /cards/{id}                 Partial update + recalculate value, track value change
   DELETE /cards/{id}               Delete card and associated disk images
-  POST /cards/{id}/upload-front    Upload front image to /static/cards/
-  POST /cards/{id}/upload-back     Upload back image to /static/cards/
+  POST /cards/{id}/upload-front    Upload front image to /static/cards/ (thumbnails made in background)
+  POST /cards/{id}/upload-back     Upload back image to /static/cards/ (thumbnails made in background)
   POST /cards/{id}/value           Compute and persist value for a single card
   POST /cards/{id}/refresh-book-values  Touch book freshness timestamp
   GET  /cards/{id}/public          Public label data + QR code (no auth required)
   GET  /cards/{id}/duplicate-count Count similar cards for the same player/brand/year
   POST /cards/labels/batch         Batch label data for selected card IDs
   GET  /cards/labels/all           Label data for all user's cards
-  POST /cards/import-csv           Bulk import from CSV file
+  GET  /cards/labels/sheet         Printable label sheet: streamed PDF, or one page as PNG (?ids=&format=&page=)
+  POST /cards/labels/sheet         Same, with {ids, format, page} in the body for large selections
+  POST /cards/import-csv           Bulk import from CSV file, streamed via COPY (?async=true → background job)
   POST /cards/validate-csv         Validate CSV structure without importing
-  GET  /cards/export               Export cards as CSV / TSV / JSON
-  GET  /cards/backup               Full user backup (cards + settings) as JSON
-  POST /cards/restore              Restore from backup JSON (replaces all cards)
-  POST /cards/revalue-all          Recompute all values, snapshot ValuationHistory
+  POST /cards/identify-image       Identify one card photo with Claude Vision (cached by image hash)
+  POST /cards/identify-images      Identify a stack of photos / ZIP; streams NDJSON per image
+  GET  /cards/export               Export cards as CSV / TSV / JSON (streamed, ?gzip=true)
+  GET  /cards/backup               Full user backup (cards + settings) as JSON (streamed, ?gzip=true)
+  POST /cards/restore              Restore from backup JSON (replaces all cards; ?async=true)
+  POST /cards/revalue-all          Recompute all values (set-based SQL), snapshot ValuationHistory (?async=true)
   POST /cards/refresh-all-book-values  Touch book freshness for all cards with values
   POST /cards/clear-book-freshness     Nullify book freshness timestamp for all cards
   PATCH /cards/propagate-book-values   Spread book values to all duplicate cards
   PATCH /cards/propagate-attributes    Spread card_attributes to all duplicate cards
 """
 # Standard library
-import io, os, csv, re, shutil, json, base64, qrcode
-from pydantic import BaseModel
+import io, os, csv, shutil, json, base64, tempfile
+from pydantic import BaseModel, Field
 from pathlib import Path as FSPath
-from typing import Optional
+from typing import Literal, Optional
 from datetime import datetime, timezone
 
 # Third-party
-import anthropic as _anthropic
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Path, Query
-from fastapi.responses import JSONResponse, StreamingResponse
-from PIL import Image as PILImage
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, UploadFile, File, Path, Query, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse, Response, StreamingResponse
 from sqlalchemy.orm import Session
 from sqlalchemy import func
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from werkzeug.utils import secure_filename
 
 # Local
 from app import models, schemas
 from app.schemas import VALID_GRADES
 from app.constants import CARD_NOT_FOUND_MSG
-from app.database import get_db
+from app.database import SessionLocal, get_db
 from app.auth.security import get_current_user
-from app.models import Card, User, ValuationHistory, DictionaryEntry
+from app.models import Card, User, DictionaryEntry
 from app.services.card_value import calculate_card_value, calculate_market_factor, pick_avg_book
+from app.services.revaluation import revalue_user_cards
+from app.services.card_import import check_import_headers, stream_import_cards
+from app.services.card_export import stream_backup, stream_cards_delimited, stream_cards_json
+from app.services.jobs import NO_PROGRESS, submit_job, accepted
+from app.services.dictionary_index import dictionary_index
+from app.services.typeahead import TYPEAHEAD_MAX_AGE, player_typeahead
+from app.services.http_cache import etag_json
+from app.services.ai_client import check_ai_rate_limit, get_client as get_ai_client
+from app.services.identify_cache import lookup_identification, store_identification
+from app.services.image_prep import encode_image, image_fingerprint
+from app.services.thumbnails import image_file_path, make_thumbnails
+from app.services.labels import (
+    label_sheet_pdf, label_sheet_png, page_count as label_page_count,
+    qr_png as label_qr_png, qr_pngs as label_qr_pngs,
+)
+from app.services.card_identify import (
+    MAX_IMAGE_BYTES, media_type_for, vision_identify, dictionary_match, collection_matches,
+    identification_response, expand_uploads, identify_batch,
+)
+from app.services.card_query import (
+    InvalidCursor, normalize_sort, parse_sort_param, encode_cursor,
+    apply_card_filters, apply_keyset_page,
+)
 
 # OCR / Card Identification
 #from app.services.image_pipeline import run_crop_pipeline, CardCropError, run_ocr, structured_ocr
@@ -83,10 +112,39 @@ BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 UPLOAD_DIR = os.path.join(BASE_DIR, "static", "cards")
 os.makedirs(UPLOAD_DIR, exist_ok=True)   # ensure dir exists
 
+
+def _generate_thumbnails(card_id: int, side: str, rel_path: str) -> None:
+    """
+    Background task: write the thumbnails for a card photo and record their key.
+    The key is only stored if the card still shows that photo, so a slower task
+    for an earlier upload never overwrites a newer one.
+    """
+    try:
+        key = make_thumbnails(image_file_path(rel_path))
+    except Exception as e:
+        print(f"Warning: could not make thumbnails for {rel_path}: {e}")
+        return
+    image_col = getattr(models.Card, f"{side}_image")
+    with SessionLocal() as db:
+        db.query(models.Card).filter(
+            models.Card.id == card_id,
+            image_col == rel_path,
+        ).update({f"{side}_thumb_key": key}, synchronize_session=False)
+        db.commit()
+
+
+def _queue_thumbnails(background: BackgroundTasks, card, side: str) -> None:
+    """Drop the card's old thumbnail key for `side` and schedule new thumbnails."""
+    setattr(card, f"{side}_thumb_key", None)
+    rel_path = getattr(card, f"{side}_image")
+    if rel_path:
+        background.add_task(_generate_thumbnails, card.id, side, rel_path)
+
 # Card Photos
 @router.post("/{card_id}/upload-front")
 def upload_front(
     card_id: int,
+    background: BackgroundTasks,
     file: UploadFile = File(...),
     db: Session = Depends(get_db),
     current: User = Depends(get_current_user),
@@ -116,6 +174,7 @@ def upload_front(
 
     # Store relative path in DB
     card.front_image = f"/static/cards/{filename}"
+    _queue_thumbnails(background, card, "front")
     db.commit()
     db.refresh(card)
 
@@ -125,6 +184,7 @@ def upload_front(
 @router.post("/{card_id}/upload-back")
 def upload_back(
     card_id: int,
+    background: BackgroundTasks,
     file: UploadFile = File(...),
     db: Session = Depends(get_db),
     current: User = Depends(get_current_user),
@@ -151,121 +211,43 @@ def upload_back(
         shutil.copyfileobj(file.file, buffer)
 
     card.back_image = f"/static/cards/{filename}"
+    _queue_thumbnails(background, card, "back")
     db.commit()
     db.refresh(card)
 
     return {"message": "Back image uploaded", "back_image": card.back_image}
 
-# --- CSV import helpers (module-level to reduce cognitive complexity) ---
-def _to_int(v):
-    v = (v or "").strip()
-    return int(v) if v != "" else None
-
-def _to_float(v):
-    v = (v or "").strip()
-    return float(v) if v != "" else None
-
-def _to_rookie(v):
-    v = (v or "").strip().lower()
-    return 1 if v in {"1", "yes", "true", "y", "t", "*"} else 0
-
-_IMPORT_GRADE_MAP = {0.6: 0.8, 1.0: 1.0}  # normalize legacy grade values
-
-def _build_card_from_row(row, rownum, user_id):
-    """Parse one CSV row into a Card model. Raises ValueError on invalid data."""
-    grade = _to_float(row["Grade"]) or 1.0
-    grade = _IMPORT_GRADE_MAP.get(grade, grade)
-    if grade not in VALID_GRADES:
-        raise ValueError(
-            f"Row {rownum} ({row['First']} {row['Last']}): invalid grade '{row['Grade']}'"
-            f" — must be one of {sorted(VALID_GRADES)}"
-        )
-    bh  = _to_float(row["BookHi"])
-    bhm = _to_float(row["BookHiMid"])
-    bm  = _to_float(row["BookMid"])
-    blm = _to_float(row["BookLowMid"])
-    bl  = _to_float(row["BookLow"])
-    book_ts = datetime.now(timezone.utc) if any([bh, bhm, bm, blm, bl]) else None
-    return models.Card(
-        first_name=(row["First"] or "").strip(),
-        last_name=(row["Last"] or "").strip(),
-        year=_to_int(row["Year"]) or 0,
-        brand=(row["Brand"] or "").strip(),
-        rookie=_to_rookie(row["Rookie"]),
-        card_number=(row["Card Number"] or "").strip(),
-        book_high=bh,
-        book_high_mid=bhm,
-        book_mid=bm,
-        book_low_mid=blm,
-        book_low=bl,
-        grade=grade,
-        user_id=user_id,
-        book_values_updated_at=book_ts,
-    )
+def _import_cards_job(db: Session, ctx, user: User, spool) -> dict:
+    """Job wrapper: the request's upload is closed by then, so it runs off a temp copy."""
+    with spool:
+        return stream_import_cards(db, ctx, user, spool)
 
 # Import cards
 @router.post("/import-csv")
-async def import_cards(
+def import_cards(
     file: UploadFile = File(...),
+    run_async: bool = Query(False, alias="async"),
     db: Session = Depends(get_db),
     current: User = Depends(get_current_user),
 ):
+    """
+    Bulk import from CSV, streamed and COPY-loaded (see services/card_import.py).
+    With ?async=true the import runs as a job and 202 is returned.
+    """
     if not file.filename.lower().endswith(".csv"):
         raise HTTPException(status_code=400, detail="Please upload a .csv file")
 
-    content = (await file.read()).decode("utf-8", errors="ignore")
-    reader = csv.DictReader(io.StringIO(content))
-
-    expected = {
-        "First", "Last", "Year", "Brand", "Rookie", "Card Number",
-        "BookHi", "BookHiMid", "BookMid", "BookLowMid", "BookLow", "Grade",
-    }
-    if not reader.fieldnames or not expected.issubset(set(reader.fieldnames)):
-        missing = expected.difference(set(reader.fieldnames or []))
-        raise HTTPException(
-            status_code=400,
-            detail=f"CSV is missing required headers: {', '.join(sorted(missing))}"
-        )
-
-    new_cards = []
-    for rownum, row in enumerate(reader, start=1):
-        try:
-            new_cards.append(_build_card_from_row(row, rownum, current.id))
-        except ValueError as e:
-            raise HTTPException(status_code=400, detail=str(e))
-        except Exception as e:
-            raise HTTPException(status_code=400, detail=f"Row {rownum} invalid: {e}")
+    check_import_headers(file.file)
 
-    if not new_cards:
-        return {"imported": 0}
+    if run_async:
+        spool = tempfile.TemporaryFile()
+        shutil.copyfileobj(file.file, spool)
+        spool.seek(0)
+        return accepted(submit_job(db, current, "import-csv", _import_cards_job, spool))
 
-    db.add_all(new_cards)
+    result = stream_import_cards(db, NO_PROGRESS, current, file.file)
     db.commit()
-
-    settings = db.query(models.GlobalSettings).filter(
-        models.GlobalSettings.user_id == current.id
-    ).first()
-
-    if settings:
-        for card in new_cards:
-            avg_book = pick_avg_book(card)
-            g = float(card.grade) if card.grade else None
-            factor = calculate_market_factor(card, settings)
-            card.value = calculate_card_value(avg_book, g, factor)
-            card.market_factor = factor
-
-        db.commit()
-
-        imported_brands = {c.brand for c in new_cards if c.brand}
-        existing_brands = set(settings.card_makes or [])
-        if imported_brands - existing_brands:
-            settings.card_makes = sorted(existing_brands | imported_brands)
-            db.commit()
-
-    return {
-        "imported": len(new_cards),
-        "message": f"Successfully imported {len(new_cards)} cards."
-    }
+    return result
 
 # Validate CSV without importing
 @router.post("/validate-csv")
@@ -340,6 +322,7 @@ def create_card(
     - Calculates value using GlobalSettings factors after insert.
     - Auto-seeds DictionaryEntry if the card has all required fields and no entry exists.
     """
+    settings = current.settings
     try:
         data = card.dict(exclude_unset=True)
         data.pop("market_factor", None)
@@ -351,9 +334,6 @@ def create_card(
         db.refresh(db_card)
 
         # Compute market_factor and value from settings, same as update/import paths
-        settings = db.query(models.GlobalSettings).filter(
-            models.GlobalSettings.user_id == current.id
-        ).first()
         if settings:
             avg_book = pick_avg_book(db_card)
             g = float(db_card.grade) if db_card.grade is not None else None
@@ -368,22 +348,29 @@ def create_card(
         if (db_card.card_number and db_card.first_name and db_card.last_name
                 and db_card.brand and db_card.year
                 and _brand_year_valid(db_card.brand, db_card.year)):
-            existing = db.query(DictionaryEntry).filter(
-                func.lower(DictionaryEntry.first_name) == db_card.first_name.lower(),
-                func.lower(DictionaryEntry.last_name) == db_card.last_name.lower(),
-                func.lower(DictionaryEntry.brand) == db_card.brand.lower(),
-                DictionaryEntry.year == db_card.year,
-            ).first()
+            existing = dictionary_index.find(
+                db, db_card.first_name, db_card.last_name, db_card.brand, db_card.year,
+            )
             if not existing:
-                db.add(DictionaryEntry(
-                    first_name=db_card.first_name,
-                    last_name=db_card.last_name,
-                    rookie_year=db_card.year if db_card.rookie else None,
-                    brand=db_card.brand,
-                    year=db_card.year,
-                    card_number=db_card.card_number,
-                ))
+                # The index check is case-insensitive and may lag other workers;
+                # an exact duplicate (ux_dictionary_entries_key) is skipped here
+                # rather than failing a card that is already saved.
+                entry = db.execute(
+                    pg_insert(DictionaryEntry.__table__)
+                    .values(
+                        first_name=db_card.first_name,
+                        last_name=db_card.last_name,
+                        rookie_year=db_card.year if db_card.rookie else None,
+                        brand=db_card.brand,
+                        year=db_card.year,
+                        card_number=db_card.card_number,
+                    )
+                    .on_conflict_do_nothing(index_elements=["first_name", "last_name", "brand", "year", "card_number"])
+                    .returning(*DictionaryEntry.__table__.c)
+                ).first()
+                version = dictionary_index.written_version(db)
                 db.commit()
+                dictionary_index.apply(version, upserts=(entry,) if entry is not None else ())
 
         return db_card
 
@@ -410,15 +397,65 @@ def read_cards(
     )
 
     # attach market_factor (backend calc) to each card instance
-    settings = db.query(models.GlobalSettings).filter(
-        models.GlobalSettings.user_id == current.id
-    ).first()
+    settings = current.settings
 
     for c in cards:
         c.market_factor = calculate_market_factor(c, settings) if settings else None
 
     return cards
 
+# Keyset-paginated listing (server-side sort + filters)
+@router.get("/page", response_model=schemas.CardPage)
+def read_cards_page(
+    cursor: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=500),
+    sort: Optional[str] = Query(None, description="Comma-separated keys, '-' prefix for desc; defaults to settings.default_sort"),
+    brand: Optional[str] = None,
+    year: Optional[int] = None,
+    player: Optional[str] = None,
+    grade: Optional[float] = None,
+    rookie: Optional[bool] = None,
+    min_value: Optional[float] = None,
+    max_value: Optional[float] = None,
+    db: Session = Depends(get_db),
+    current: User = Depends(get_current_user),
+):
+    """
+    Return one page of the current user's cards, sorted and filtered in SQL.
+    - Sort comes from ?sort= when given, otherwise GlobalSettings.default_sort.
+    - Paging is keyset-based: pass the returned next_cursor to get the following page.
+      A cursor is only valid for the sort it was issued with.
+    - total is the filtered count (independent of the cursor).
+    """
+    settings = current.settings
+
+    requested = parse_sort_param(sort)
+    if requested is None and settings:
+        requested = settings.default_sort
+    levels = normalize_sort(requested)
+
+    base = apply_card_filters(
+        db.query(models.Card).filter(Card.user_id == current.id),
+        brand=brand, year=year, player=player, grade=grade, rookie=rookie,
+        min_value=min_value, max_value=max_value,
+    )
+    total = base.order_by(None).count()
+
+    try:
+        rows = apply_keyset_page(base, levels, cursor, limit).all()
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1], levels)
+
+    for c in rows:
+        c.market_factor = calculate_market_factor(c, settings) if settings else None
+
+    return {"items": rows, "next_cursor": next_cursor, "total": total, "sort": levels}
+
 # Count cards
 @router.get("/count")
 def count_cards(db: Session = Depends(get_db), current: User = Depends(get_current_user),):
@@ -446,6 +483,23 @@ async def get_players(db: Session = Depends(get_db), current: models.User = Depe
         players.append({"first_name": row.first_name, "last_name": row.last_name})
     return {"players": players}
 
+# Player-name typeahead (ranked prefix completions, ETag / 304 aware)
+@router.get("/players/typeahead")
+def players_typeahead(
+    request: Request,
+    q: str = Query(..., min_length=1, max_length=100),
+    field: str = Query("full", pattern="^(first_name|last_name|full)$"),
+    limit: int = Query(10, ge=1, le=50),
+    db: Session = Depends(get_db),
+    current: User = Depends(get_current_user),
+):
+    """
+    Up to `limit` completions for prefix q from the dictionary plus the user's
+    own cards (owned names rank first) — see services/typeahead.py.
+    """
+    results = player_typeahead(db, q, field, limit, user_id=current.id)
+    return etag_json(request, {"q": q, "field": field, "results": results}, max_age=TYPEAHEAD_MAX_AGE)
+
 # Smart Fill
 @router.get("/smart-fill")
 async def smart_fill(
@@ -458,25 +512,12 @@ async def smart_fill(
     current: models.User = Depends(get_current_user),
 ):
     try:
-        settings = db.query(models.GlobalSettings).filter(
-            models.GlobalSettings.user_id == current.id
-        ).first()
+        settings = current.settings
 
         if not settings or not settings.enable_smart_fill:
             return {"status": "disabled", "fields": {}}
 
-        q = db.query(DictionaryEntry).filter(
-            func.lower(DictionaryEntry.first_name) == first_name.strip().lower(),
-            func.lower(DictionaryEntry.last_name) == last_name.strip().lower(),
-        )
-        if brand:
-            q = q.filter(func.lower(DictionaryEntry.brand) == brand.strip().lower())
-        if year is not None:
-            q = q.filter(DictionaryEntry.year == year)
-        if card_number:
-            q = q.filter(func.lower(DictionaryEntry.card_number) == card_number.strip().lower())
-
-        entry = q.first()
+        entry = dictionary_index.find(db, first_name, last_name, brand, year, card_number)
         if not entry:
             return {"status": "not_found", "fields": {}}
 
@@ -500,52 +541,6 @@ async def smart_fill(
     except Exception as e:
         return {"detail": f"Unexpected error in smart-fill: {repr(e)}"}
 
-# ---- AI prompts (module-level constants to keep endpoint code concise) ----
-_IDENTIFY_PROMPT = """\
-You are reading a sports trading card. Extract exactly what is printed on the card.
-
-Return ONLY this JSON (no other text):
-{
-  "first_name": "<player first name as printed, or null>",
-  "last_name": "<player last name as printed, or null>",
-  "year": <4-digit year from copyright line or set name, or null>,
-  "brand": "<manufacturer: Topps/Bowman/Fleer/Donruss/Upper Deck/Score/Panini/Leaf/Goudey, or null>",
-  "card_number": "<number as printed (digits only, no #), or null>",
-  "confidence": <0.0-1.0, your confidence in the extraction>
-}"""
-
-_GRADE_EXTENSION = """\
-
-
-Also assess the card's physical condition. Add these fields to your JSON response:
-  "grade": <one of: 3.0=Mint, 1.5=Excellent, 1.0=VeryGood, 0.8=Good, 0.4=Fair, 0.2=Poor>,
-  "grade_label": "<MT|EX|VG|GD|FR|PR>",
-  "condition_notes": "<1-2 sentence description of visible condition issues>"
-
-Return ONLY the complete JSON object with all fields including the ones above."""
-
-_VALID_MEDIA_TYPES = {"image/jpeg", "image/png", "image/jpg"}
-_MAX_IMAGE_BYTES = 5 * 1024 * 1024  # 5MB
-_MAX_IMAGE_DIM = 2100
-
-
-def _resize_image(content: bytes, media_type: str) -> tuple[bytes, str]:
-    """Resize image to max 2100px on longest side. Returns (bytes, media_type)."""
-    img = PILImage.open(io.BytesIO(content))
-    # Convert RGBA or palette to RGB for JPEG compatibility
-    if img.mode not in ("RGB", "L"):
-        img = img.convert("RGB")
-        media_type = "image/jpeg"
-    if max(img.width, img.height) > _MAX_IMAGE_DIM:
-        ratio = _MAX_IMAGE_DIM / max(img.width, img.height)
-        new_size = (int(img.width * ratio), int(img.height * ratio))
-        img = img.resize(new_size, PILImage.LANCZOS)
-    fmt = "PNG" if media_type == "image/png" else "JPEG"
-    buf = io.BytesIO()
-    img.save(buf, format=fmt)
-    return buf.getvalue(), media_type
-
-
 # AI card identification
 @router.post("/identify-image")
 async def identify_image(
@@ -557,287 +552,176 @@ async def identify_image(
     """
     Identify a card from a photo using Claude Vision.
     Returns extracted fields, confidence, optional grade estimate,
-    dictionary match, and collection match.
+    dictionary match, and collection match. A photo identified before
+    (same bytes, or a near-identical re-shot when no grade is asked for)
+    is answered from the cache without a vision call ("cached": true).
     Requires enable_image_ai = True in GlobalSettings.
     """
-    settings = db.query(models.GlobalSettings).filter(
-        models.GlobalSettings.user_id == current.id
-    ).first()
+    settings = current.settings
     if not settings or not settings.enable_image_ai:
         raise HTTPException(status_code=403, detail="Image AI is not enabled")
 
-    api_key = os.getenv("ANTHROPIC_API_KEY")
-    if not api_key:
-        raise HTTPException(status_code=500, detail="Anthropic API key not configured")
-
     # Validate file type
-    ct = (file.content_type or "").lower()
-    fname = (file.filename or "").lower()
-    if ct not in _VALID_MEDIA_TYPES and not (fname.endswith((".jpg", ".jpeg", ".png"))):
+    media_type = media_type_for(file.content_type, file.filename)
+    if media_type is None:
         raise HTTPException(status_code=400, detail="Only JPEG and PNG images are supported")
-    media_type = "image/png" if (ct == "image/png" or fname.endswith(".png")) else "image/jpeg"
 
     content = await file.read()
-    if len(content) > _MAX_IMAGE_BYTES:
+    if len(content) > MAX_IMAGE_BYTES:
         raise HTTPException(status_code=400, detail="Image exceeds 5MB limit")
 
-    # Resize and base64-encode
+    # Repeat scans are answered from the identification cache (services/identify_cache.py)
     try:
-        img_bytes, media_type = _resize_image(content, media_type)
+        sha256, phash = await run_in_threadpool(image_fingerprint, content)
     except Exception as exc:
         raise HTTPException(status_code=400, detail=f"Could not process image: {exc}")
-    img_b64 = base64.b64encode(img_bytes).decode()
+    ai = lookup_identification(db, current.id, sha256, phash, include_grade)
+    cached = ai is not None
+    if not cached:
+        get_ai_client()
+        check_ai_rate_limit(current.id)
+        # Resize and base64-encode
+        try:
+            img_b64, media_type = await run_in_threadpool(encode_image, content, media_type)
+        except Exception as exc:
+            raise HTTPException(status_code=400, detail=f"Could not process image: {exc}")
+        ai = await vision_identify(img_b64, media_type, include_grade)
+        store_identification(db, current.id, sha256, phash, ai)
 
-    # Call Claude Vision
-    prompt_text = _IDENTIFY_PROMPT + (_GRADE_EXTENSION if include_grade else "")
-    client = _anthropic.Anthropic(api_key=api_key)
-    try:
-        response = client.messages.create(
-            model="claude-sonnet-4-6",
-            max_tokens=512,
-            messages=[{
-                "role": "user",
-                "content": [
-                    {"type": "image", "source": {"type": "base64", "media_type": media_type, "data": img_b64}},
-                    {"type": "text", "text": prompt_text},
-                ],
-            }],
-        )
-    except Exception as exc:
-        raise HTTPException(status_code=502, detail=f"AI request failed: {exc}")
-
-    # Parse JSON from response — try several extraction strategies
-    raw = response.content[0].text.strip()
-    # 1. Strip markdown code fences
-    if "```" in raw:
-        fence_match = re.search(r"```(?:json)?\s*(\{.*?\})\s*```", raw, re.DOTALL)
-        if fence_match:
-            raw = fence_match.group(1)
-    # 2. If still not a JSON object, grab the first {...} block
-    if not raw.startswith("{"):
-        obj_match = re.search(r"\{.*\}", raw, re.DOTALL)
-        raw = obj_match.group(0) if obj_match else raw
-    raw = raw.strip()
-    try:
-        parsed = json.loads(raw)
-    except json.JSONDecodeError:
-        raise HTTPException(status_code=500, detail="AI returned unexpected format")
-
-    fields = {
-        "first_name": parsed.get("first_name"),
-        "last_name": parsed.get("last_name"),
-        "year": parsed.get("year"),
-        "brand": parsed.get("brand"),
-        "card_number": parsed.get("card_number"),
-    }
-    confidence = float(parsed.get("confidence") or 0.0)
-
-    grade_estimate = None
-    if include_grade and "grade" in parsed:
-        grade_estimate = {
-            "grade": parsed.get("grade"),
-            "grade_label": parsed.get("grade_label"),
-            "condition_notes": parsed.get("condition_notes"),
-        }
+    dictionary = dictionary_match(db, ai["fields"])
+    collection = collection_matches(db, current.id, [ai["fields"]])[0]
+    return identification_response(ai, dictionary, collection, cached)
 
-    # Dictionary lookup for book values
-    dictionary_match = None
-    fn = (fields["first_name"] or "").strip().lower()
-    ln = (fields["last_name"] or "").strip().lower()
-    if fn and ln:
-        q = db.query(DictionaryEntry).filter(
-            func.lower(DictionaryEntry.first_name) == fn,
-            func.lower(DictionaryEntry.last_name) == ln,
-        )
-        if fields["brand"]:
-            q = q.filter(func.lower(DictionaryEntry.brand) == fields["brand"].lower())
-        if fields["year"]:
-            q = q.filter(DictionaryEntry.year == fields["year"])
-        if fields["card_number"]:
-            q = q.filter(func.lower(DictionaryEntry.card_number) == fields["card_number"].lower())
-        entry = q.first()
-        # If matched entry has no book values, fall back to card_number+year+brand
-        # to find a valued entry (handles duplicate entries with different name spellings)
-        if entry and not any([entry.book_high, entry.book_mid, entry.book_low]):
-            cn = fields.get("card_number") or entry.card_number
-            if cn and fields.get("year") and fields.get("brand"):
-                valued = db.query(DictionaryEntry).filter(
-                    func.lower(DictionaryEntry.card_number) == str(cn).lower(),
-                    DictionaryEntry.year == fields["year"],
-                    func.lower(DictionaryEntry.brand) == fields["brand"].lower(),
-                    DictionaryEntry.book_high.isnot(None),
-                ).first()
-                if valued:
-                    entry = valued
-        if entry:
-            dictionary_match = {
-                "found": True,
-                "book_high": entry.book_high,
-                "book_high_mid": entry.book_high_mid,
-                "book_mid": entry.book_mid,
-                "book_low_mid": entry.book_low_mid,
-                "book_low": entry.book_low,
-                "rookie": (entry.rookie_year is not None and fields.get("year") == entry.rookie_year),
-            }
-            # Back-fill card_number if Claude didn't extract it
-            if not fields["card_number"] and entry.card_number:
-                fields["card_number"] = entry.card_number
-
-    # Collection match
-    collection_match = {"found": False, "cards": [], "duplicate_count": 0}
-    if fn and ln:
-        q = db.query(models.Card).filter(
-            models.Card.user_id == current.id,
-            func.lower(models.Card.first_name) == fn,
-            func.lower(models.Card.last_name) == ln,
-        )
-        if fields["brand"]:
-            q = q.filter(func.lower(models.Card.brand) == fields["brand"].lower())
-        if fields["year"]:
-            q = q.filter(models.Card.year == fields["year"])
-        matches = q.limit(10).all()
-        if matches:
-            collection_match = {
-                "found": True,
-                "cards": [
-                    {"id": c.id, "year": c.year, "brand": c.brand, "card_number": c.card_number, "grade": c.grade, "value": c.value}
-                    for c in matches
-                ],
-                "duplicate_count": len(matches),
-            }
 
-    return {
-        "fields": fields,
-        "confidence": confidence,
-        "grade_estimate": grade_estimate,
-        "dictionary_match": dictionary_match,
-        "collection_match": collection_match,
-    }
+# Batch AI card identification
+@router.post("/identify-images")
+async def identify_images(
+    files: list[UploadFile] = File(...),
+    include_grade: bool = Query(False),
+    current: User = Depends(get_current_user),
+):
+    """
+    Identify a stack of card photos: any mix of JPEG/PNG files and ZIP archives
+    of them, up to IDENTIFY_BATCH_MAX_IMAGES images. Streams NDJSON, one line
+    per image as it resolves (completion order, with its upload "index"):
+      {"index", "filename", "status": "ok", <same fields as /identify-image>}
+      {"index", "filename", "status": "error", "detail"}
+    then a final {"status": "done", "total", "identified", "cached", "failed"}.
+    Each image not answered from the cache counts against the per-user AI
+    rate limit; images over the limit come back as error lines.
+    """
+    settings = current.settings
+    if not settings or not settings.enable_image_ai:
+        raise HTTPException(status_code=403, detail="Image AI is not enabled")
+
+    uploads = [(f.filename, (f.content_type or "").lower(), await f.read()) for f in files]
+    images = expand_uploads(uploads)
+    get_ai_client()
+    user_id = current.id
+
+    async def ndjson():
+        async for line in identify_batch(user_id, images, include_grade):
+            yield json.dumps(line, default=str) + "\n"
+
+    return StreamingResponse(ndjson(), media_type="application/x-ndjson")
 
 
 # Export card data (CSV / TSV / JSON)
 @router.get("/export")
 def export_cards(
     format: str = "csv",
-    db: Session = Depends(get_db),
+    gzip: bool = False,
     current: User = Depends(get_current_user),
 ):
-    cards = db.query(models.Card).filter(Card.user_id == current.id).all()
-
-    def _val(v):
-        return "" if v is None else v
+    """Stream the user's cards as CSV / TSV / JSON (see services/card_export.py). ?gzip=true compresses on the fly."""
+    headers = {"Content-Encoding": "gzip"} if gzip else {}
 
     if format == "json":
-        data = [
-            {
-                "first_name": c.first_name,
-                "last_name": c.last_name,
-                "year": c.year,
-                "brand": c.brand,
-                "rookie": 1 if c.rookie else 0,
-                "card_number": _val(c.card_number),
-                "book_high": c.book_high,
-                "book_high_mid": c.book_high_mid,
-                "book_mid": c.book_mid,
-                "book_low_mid": c.book_low_mid,
-                "book_low": c.book_low,
-                "grade": c.grade,
-                "value": c.value,
-            }
-            for c in cards
-        ]
-        content = json.dumps(data, indent=2)
         return StreamingResponse(
-            io.BytesIO(content.encode()),
+            stream_cards_json(current.id, gzip),
             media_type="application/json",
-            headers={"Content-Disposition": "attachment; filename=cards.json"},
+            headers={"Content-Disposition": "attachment; filename=cards.json", **headers},
         )
 
     delimiter = "\t" if format == "tsv" else ","
     ext = "tsv" if format == "tsv" else "csv"
-    output = io.StringIO()
-    writer = csv.writer(output, delimiter=delimiter)
-    writer.writerow([
-        "First", "Last", "Year", "Brand", "Rookie", "Card Number",
-        "BookHi", "BookHiMid", "BookMid", "BookLowMid", "BookLow", "Grade", "Value",
-    ])
-    for c in cards:
-        writer.writerow([
-            c.first_name, c.last_name, _val(c.year), _val(c.brand),
-            1 if c.rookie else 0, _val(c.card_number),
-            _val(c.book_high), _val(c.book_high_mid), _val(c.book_mid),
-            _val(c.book_low_mid), _val(c.book_low), _val(c.grade), _val(c.value),
-        ])
-    output.seek(0)
     media = "text/tab-separated-values" if format == "tsv" else "text/csv"
     return StreamingResponse(
-        io.BytesIO(output.read().encode()),
+        stream_cards_delimited(current.id, delimiter, gzip),
         media_type=media,
-        headers={"Content-Disposition": f"attachment; filename=cards.{ext}"},
+        headers={"Content-Disposition": f"attachment; filename=cards.{ext}", **headers},
     )
 
 
 # Full backup (cards + settings) as JSON
 @router.get("/backup")
 def backup_data(
-    db: Session = Depends(get_db),
+    gzip: bool = False,
     current: User = Depends(get_current_user),
 ):
-    cards = db.query(models.Card).filter(Card.user_id == current.id).all()
-    settings = db.query(models.GlobalSettings).filter(
-        models.GlobalSettings.user_id == current.id
-    ).first()
-
-    card_list = [
-        {
-            "first_name": c.first_name,
-            "last_name": c.last_name,
-            "year": c.year,
-            "brand": c.brand,
-            "card_number": c.card_number,
-            "rookie": bool(c.rookie),
-            "grade": c.grade,
-            "book_high": c.book_high,
-            "book_high_mid": c.book_high_mid,
-            "book_mid": c.book_mid,
-            "book_low_mid": c.book_low_mid,
-            "book_low": c.book_low,
-            "value": c.value,
-        }
-        for c in cards
-    ]
+    """Stream a full backup (cards + settings) as JSON. ?gzip=true compresses on the fly."""
+    settings = current.settings
 
     settings_dict = {}
     if settings:
         skip_fields = {"id", "user_id"}
+        # Columns only — __dict__ would also carry the joined-loaded User relationship
         settings_dict = {
-            k: v for k, v in settings.__dict__.items()
-            if not k.startswith("_") and k not in skip_fields
+            c.key: getattr(settings, c.key) for c in settings.__table__.columns
+            if c.key not in skip_fields
         }
 
-    backup = {
-        "version": 1,
-        "user": current.username,
-        "cards": card_list,
-        "settings": settings_dict,
-    }
-    content = json.dumps(backup, indent=2, default=str)
+    headers = {"Content-Encoding": "gzip"} if gzip else {}
     return StreamingResponse(
-        io.BytesIO(content.encode()),
+        stream_backup(current.id, current.username, settings_dict, gzip),
         media_type="application/json",
         headers={
-            "Content-Disposition": f"attachment; filename=cardstoard_backup_{current.username}.json"
+            "Content-Disposition": f"attachment; filename=cardstoard_backup_{current.username}.json",
+            **headers,
         },
     )
 
 
+def _restore_backup(db: Session, ctx, user: User, backup: dict) -> dict:
+    """Replace the user's cards (and settings) with a backup (job worker — see services/jobs.py)."""
+    # Delete all existing cards for this user
+    db.query(models.Card).filter(Card.user_id == user.id).delete(synchronize_session=False)
+
+    # Re-create cards
+    skip_card_fields = {"id", "user_id", "front_image", "back_image", "front_thumb_key", "back_thumb_key"}
+    total = len(backup["cards"])
+    new_cards = []
+    for i, card_data in enumerate(backup["cards"], start=1):
+        fields = {k: v for k, v in card_data.items() if k not in skip_card_fields}
+        new_cards.append(models.Card(user_id=user.id, **fields))
+        ctx.progress(i, total)
+    db.add_all(new_cards)
+
+    # Restore settings if present
+    if backup.get("settings"):
+        settings = user.settings
+        if settings:
+            skip_settings_fields = {"id", "user_id"}
+            for k, v in backup["settings"].items():
+                if k not in skip_settings_fields and hasattr(settings, k):
+                    setattr(settings, k, v)
+
+    db.flush()
+    return {
+        "restored": len(new_cards),
+        "message": f"Successfully restored {len(new_cards)} cards.",
+    }
+
+
 # Restore from backup JSON
 @router.post("/restore")
 async def restore_data(
     file: UploadFile = File(...),
+    run_async: bool = Query(False, alias="async"),
     db: Session = Depends(get_db),
     current: User = Depends(get_current_user),
 ):
+    """Restore from a backup file. With ?async=true the restore runs as a job and 202 is returned."""
     if not file.filename.lower().endswith(".json"):
         raise HTTPException(status_code=400, detail="Please upload a .json backup file")
 
@@ -850,33 +734,12 @@ async def restore_data(
     if "cards" not in backup or not isinstance(backup["cards"], list):
         raise HTTPException(status_code=400, detail="Invalid backup file: missing 'cards' array")
 
-    # Delete all existing cards for this user
-    db.query(models.Card).filter(Card.user_id == current.id).delete(synchronize_session=False)
-
-    # Re-create cards
-    skip_card_fields = {"id", "user_id", "front_image", "back_image"}
-    new_cards = []
-    for card_data in backup["cards"]:
-        fields = {k: v for k, v in card_data.items() if k not in skip_card_fields}
-        new_cards.append(models.Card(user_id=current.id, **fields))
-    db.add_all(new_cards)
-
-    # Restore settings if present
-    if backup.get("settings"):
-        settings = db.query(models.GlobalSettings).filter(
-            models.GlobalSettings.user_id == current.id
-        ).first()
-        if settings:
-            skip_settings_fields = {"id", "user_id"}
-            for k, v in backup["settings"].items():
-                if k not in skip_settings_fields and hasattr(settings, k):
-                    setattr(settings, k, v)
+    if run_async:
+        return accepted(submit_job(db, current, "restore", _restore_backup, backup))
 
+    result = _restore_backup(db, NO_PROGRESS, current, backup)
     db.commit()
-    return {
-        "restored": len(new_cards),
-        "message": f"Successfully restored {len(new_cards)} cards.",
-    }
+    return result
 
 
 # Public card info + QR code (no auth required)
@@ -889,25 +752,28 @@ def get_card_public(card_id: int, db: Session = Depends(get_db)):
     return _card_label_data(card, frontend_url)
 
 
-def _card_label_data(card, frontend_url: str) -> dict:
-    """Build label dict with QR code for a single card."""
-    card_url = f"{frontend_url}/card-view/{card.id}"
-    qr = qrcode.QRCode(version=1, box_size=10, border=2)
-    qr.add_data(card_url)
-    qr.make(fit=True)
-    img = qr.make_image(fill_color="black", back_color="white")
-    buf = io.BytesIO()
-    img.save(buf, format="PNG")
-    qr_b64 = base64.b64encode(buf.getvalue()).decode()
+def _card_view_url(card_id: int, frontend_url: str) -> str:
+    return f"{frontend_url}/card-view/{card_id}"
 
+
+def _card_descriptor(card) -> str:
     first = card.first_name or ""
     last = card.last_name or ""
     initials = ((first[0] if first else "?") + (last[0] if last else "?")).upper()
+    return f"{initials}.{card.year}.{card.card_number}"
+
+
+def _card_label_data(card, frontend_url: str, qr_png: Optional[bytes] = None) -> dict:
+    """Build label dict with QR code for a single card (QR PNGs come from the label cache)."""
+    if qr_png is None:
+        qr_png = label_qr_png(_card_view_url(card.id, frontend_url))
+    first = card.first_name or ""
+    last = card.last_name or ""
 
     return {
         "id": card.id,
         "label_id": f"CS-CD-{card.id:06d}",
-        "descriptor": f"{initials}.{card.year}.{card.card_number}",
+        "descriptor": _card_descriptor(card),
         "grade": card.grade,
         "first_name": first,
         "last_name": last,
@@ -915,10 +781,16 @@ def _card_label_data(card, frontend_url: str) -> dict:
         "brand": card.brand,
         "card_number": card.card_number,
         "front_image": card.front_image,
-        "qr_b64": qr_b64,
+        "qr_b64": base64.b64encode(qr_png).decode(),
     }
 
 
+def _card_labels(cards, frontend_url: str) -> list[dict]:
+    """Label dicts for many cards; uncached QR codes are rendered in one parallel batch."""
+    pngs = label_qr_pngs([_card_view_url(c.id, frontend_url) for c in cards])
+    return [_card_label_data(c, frontend_url, png) for c, png in zip(cards, pngs)]
+
+
 class BatchLabelRequest(BaseModel):
     ids: list[int]
 
@@ -939,7 +811,7 @@ def get_labels_batch(
     )
     # Return in requested order
     card_map = {c.id: c for c in cards}
-    return [_card_label_data(card_map[i], frontend_url) for i in payload.ids if i in card_map]
+    return _card_labels([card_map[i] for i in payload.ids if i in card_map], frontend_url)
 
 
 # All label data for current user (auth required)
@@ -950,7 +822,88 @@ def get_labels_all(
 ):
     frontend_url = os.getenv("FRONTEND_BASE_URL", "http://localhost:3000")
     cards = db.query(models.Card).filter(Card.user_id == current.id).all()
-    return [_card_label_data(c, frontend_url) for c in cards]
+    return _card_labels(cards, frontend_url)
+
+
+def _label_sheet_response(db: Session, user_id: int, wanted: Optional[list[int]], format: str, page: int):
+    """
+    Rasterized label sheets laid out like the BatchLabels print view
+    (services/labels.py), so large batches need no browser print pass.
+    Label text is read up front; the PDF then streams page by page.
+    wanted=None means every card; an empty selection is a 400.
+    """
+    if wanted is not None and not wanted:
+        raise HTTPException(status_code=400, detail="No cards selected")
+    query = (
+        db.query(Card.id, Card.first_name, Card.last_name, Card.year, Card.card_number, Card.grade)
+        .filter(Card.user_id == user_id)
+    )
+    if wanted is not None:
+        row_map = {r.id: r for r in query.filter(Card.id.in_(wanted)).all()}
+        rows = [row_map[i] for i in dict.fromkeys(wanted) if i in row_map]
+    else:
+        rows = query.order_by(Card.id).all()
+    if not rows:
+        raise HTTPException(status_code=404, detail="No cards to label")
+
+    frontend_url = os.getenv("FRONTEND_BASE_URL", "http://localhost:3000")
+    labels = [
+        (_card_view_url(r.id, frontend_url),
+         [f"CS-CD-{r.id:06d}", _card_descriptor(r), str(r.grade) if r.grade is not None else ""])
+        for r in rows
+    ]
+    pages = label_page_count(len(labels))
+
+    if format == "png":
+        if page > pages:
+            raise HTTPException(status_code=404, detail=f"Sheet has {pages} page(s)")
+        return Response(
+            content=label_sheet_png(labels, page),
+            media_type="image/png",
+            headers={"X-Total-Pages": str(pages)},
+        )
+    return StreamingResponse(
+        label_sheet_pdf(labels),
+        media_type="application/pdf",
+        headers={
+            "Content-Disposition": "attachment; filename=card_labels.pdf",
+            "X-Total-Pages": str(pages),
+        },
+    )
+
+
+# Printable label sheet (PDF of every page, or one page as PNG)
+@router.get("/labels/sheet")
+def get_label_sheet(
+    format: str = Query("pdf", pattern="^(pdf|png)$"),
+    ids: Optional[str] = Query(None, description="Comma-separated card IDs, in print order; all cards if omitted"),
+    page: int = Query(1, ge=1, description="Sheet page for format=png"),
+    db: Session = Depends(get_db),
+    current: User = Depends(get_current_user),
+):
+    wanted = None
+    if ids is not None:
+        try:
+            wanted = [int(i) for i in ids.split(",") if i.strip()]
+        except ValueError:
+            raise HTTPException(status_code=400, detail="ids must be comma-separated integers")
+    return _label_sheet_response(db, current.id, wanted, format, page)
+
+
+class LabelSheetRequest(BaseModel):
+    ids: Optional[list[int]] = None      # print order; all cards if omitted
+    format: Literal["pdf", "png"] = "pdf"
+    page: int = Field(1, ge=1)           # sheet page for format=png
+
+
+# Same sheet for selections too large for a query string
+@router.post("/labels/sheet")
+def post_label_sheet(
+    payload: LabelSheetRequest,
+    db: Session = Depends(get_db),
+    current: User = Depends(get_current_user),
+):
+    return _label_sheet_response(db, current.id, payload.ids, payload.format, payload.page)
 
 
 # Read one card
@@ -970,22 +923,21 @@ def read_card(
         raise HTTPException(status_code=404, detail=CARD_NOT_FOUND_MSG)
 
     # attach market_factor to single card
-    settings = db.query(models.GlobalSettings).filter(
-        models.GlobalSettings.user_id == current.id
-    ).first()
+    settings = current.settings
     card.market_factor = calculate_market_factor(card, settings) if settings else None
 
     return card
 
 # Update a card
 @router.put("/{card_id}", response_model=schemas.Card)
-def update_card(card_id: int, updated: schemas.CardUpdate, db: Session = Depends(get_db), current: User = Depends(get_current_user),):
+def update_card(card_id: int, updated: schemas.CardUpdate, background: BackgroundTasks, db: Session = Depends(get_db), current: User = Depends(get_current_user),):
     """
     Partial update for a card. Applies only fields present in the request body.
     - Resets book_values_updated_at if any book_* field changed.
     - Recalculates value and market_factor from current settings.
     - Tracks value change: if rounded value differs from previous, saves previous_value
       and sets value_changed_at (used by the value change indicator in CardDetail).
+    - Regenerates thumbnails for a changed front_image / back_image path.
     """
     card = db.query(models.Card).filter(Card.user_id == current.id).filter(models.Card.id == card_id).first()
     if not card:
@@ -995,21 +947,22 @@ def update_card(card_id: int, updated: schemas.CardUpdate, db: Session = Depends
     old_value = card.value
     BOOK_FIELDS = {"book_high", "book_high_mid", "book_mid", "book_low_mid", "book_low"}
     old_books = {f: getattr(card, f) for f in BOOK_FIELDS}
+    old_images = {"front": card.front_image, "back": card.back_image}
 
     for field, value in updated.dict(exclude_unset=True).items():
         setattr(card, field, value)
 
+    for side, old_path in old_images.items():
+        if getattr(card, f"{side}_image") != old_path:
+            _queue_thumbnails(background, card, side)
+
     # Reset book freshness timer if any book value changed
     new_books = {f: getattr(card, f) for f in BOOK_FIELDS}
     if new_books != old_books:
         card.book_values_updated_at = datetime.now(timezone.utc)
 
     # Recalculate market factor and value after update
-    settings = (
-        db.query(models.GlobalSettings)
-        .filter(models.GlobalSettings.user_id == current.id)
-        .first()
-    )
+    settings = current.settings
     if settings:
         from ..services.card_value import (
             calculate_market_factor,
@@ -1116,9 +1069,7 @@ def propagate_book_values(
     # parallel/refractor/autograph-specific pricing with base card values.
     cards = [c for c in all_cards if (c.card_attributes or {}) == attrs]
 
-    settings = db.query(models.GlobalSettings).filter(
-        models.GlobalSettings.user_id == current.id
-    ).first()
+    settings = current.settings
 
     now = datetime.now(timezone.utc)
     for card in cards:
@@ -1222,12 +1173,10 @@ def refresh_book_values(
     card = db.query(Card).filter(Card.id == card_id, Card.user_id == current.id).first()
     if not card:
         raise HTTPException(status_code=404, detail=CARD_NOT_FOUND_MSG)
+    settings = current.settings
     card.book_values_updated_at = datetime.now(timezone.utc)
     db.commit()
     db.refresh(card)
-    settings = db.query(models.GlobalSettings).filter(
-        models.GlobalSettings.user_id == current.id
-    ).first()
     card.market_factor = calculate_market_factor(card, settings) if settings else None
     return card
 
@@ -1294,9 +1243,7 @@ def compute_and_save_card_value(
         raise HTTPException(status_code=404, detail=CARD_NOT_FOUND_MSG)
 
     # 2) Load settings for this user
-    settings = db.query(models.GlobalSettings).filter(
-        models.GlobalSettings.user_id == current.id
-    ).first()
+    settings = current.settings
     if not settings:
         # You can choose to treat missing settings as default values.
         # Here we error to make it explicit.
@@ -1358,46 +1305,38 @@ def clear_book_freshness(
     return {"updated": updated, "message": f"Cleared freshness timer for {updated} cards."}
 
 
+def _revalue_all(db: Session, ctx, user: User) -> dict:
+    """Set-based revaluation of the user's collection (job worker — see services/jobs.py)."""
+    result = revalue_user_cards(db, user.id, user.settings.id)
+    updated = result["card_count"]
+    if not updated:
+        return {"updated": 0, "message": "No cards found for user."}
+    return {
+        "updated": updated,
+        "changed": result["changed_count"],
+        "message": f"✅ Revalued {updated} cards.",
+    }
+
+
 # Recalculate All Card Values
 @router.post("/revalue-all")
 def revalue_all_cards(
+    run_async: bool = Query(False, alias="async"),
     db: Session = Depends(get_db),
     current: User = Depends(get_current_user),
 ):
-    """Recompute and persist values for all cards belonging to the current user."""
-    cards = db.query(models.Card).filter(models.Card.user_id == current.id).all()
-    if not cards:
-        return {"updated": 0, "message": "No cards found for user."}
-
-    settings = db.query(models.GlobalSettings).filter(
-        models.GlobalSettings.user_id == current.id
-    ).first()
-    if not settings:
+    """
+    Recompute and persist values for all cards belonging to the current user,
+    then snapshot ValuationHistory. Runs as one set-based statement — see
+    services/revaluation.py for how it stays in parity with card_value.py.
+    With ?async=true it runs as a job and 202 is returned.
+    """
+    if not current.settings:
         raise HTTPException(status_code=400, detail="Global settings not found for user")
 
-    updated = 0
-    for card in cards:
-        avg_book = pick_avg_book(card)
-        g = float(card.grade) if card.grade else None
-        factor = calculate_market_factor(card, settings)
-        value = calculate_card_value(avg_book, g, factor)
-
-        card.value = value
-        card.market_factor = factor
-        updated += 1
+    if run_async:
+        return accepted(submit_job(db, current, "revalue-all", _revalue_all))
 
+    result = _revalue_all(db, NO_PROGRESS, current)
     db.commit()
-    
-    total_value = db.query(func.coalesce(func.sum(models.Card.value), 0)).filter(models.Card.user_id == current.id).scalar()
-    card_count = db.query(func.count(models.Card.id)).filter(models.Card.user_id == current.id).scalar()
-
-    snapshot = ValuationHistory(
-        user_id=current.id,
-        timestamp=datetime.now(timezone.utc),
-        total_value=float(total_value or 0),
-        card_count=card_count,
-    )
-    
-    db.add(snapshot)
-    db.commit()
-    return {"updated": updated, "message": f"✅ Revalued {updated} cards."}
+    return result
@@ -1,16 +1,23 @@
-import os
-import anthropic
+import json
+import logging
+import time
 from fastapi import APIRouter, Depends, HTTPException
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
-from sqlalchemy.orm import Session
-from ..database import get_db
-from ..models import Card, GlobalSettings, AutoBall, WaxBox, WaxPack, BoxBinder
+from sqlalchemy.orm import Session, joinedload
+from ..database import get_db, SessionLocal
+from ..models import Card, GlobalSettings, AutoBall, WaxBox, WaxPack
 from ..auth.security import get_current_user
 from ..models import User
 from ..services.card_value import pick_avg_book, calculate_market_factor, calculate_card_value
+from ..services.chat_context import build_collection_context
+from ..services.ai_client import check_ai_rate_limit, create_message, get_client, stream_message
 
 router = APIRouter(prefix="/chat", tags=["chat"])
 
+logger = logging.getLogger("cardstoard.chat")
+
 VALID_GRADES = {3.0, 1.5, 1.0, 0.8, 0.4, 0.2}
 
 class ChatMessage(BaseModel):
@@ -281,179 +288,32 @@ TOOLS = [
 ]
 
 
-def build_collection_context(
-    cards: list,
-    balls: list,
-    wax_boxes: list,
-    wax_packs: list,
-    box_binders: list,
-    settings: GlobalSettings | None,
-) -> str:
-    from collections import defaultdict
-
-    lines = []
-
-    # ------------------------------------------------------------------
-    # Cards
-    # ------------------------------------------------------------------
-    if not cards:
-        lines.append("The user has no cards in their collection.\n")
-    else:
-        lines.append(f"The user has {len(cards)} cards in their collection.\n")
-        total_value = sum(float(c.value or 0) for c in cards)
-        lines.append(f"Total card collection value: ${round(total_value):,}\n")
-
-        if settings:
-            market_factor = getattr(settings, 'market_factor', None)
-            if market_factor:
-                lines.append(f"Current market factor: {market_factor}\n")
-
-        player_stats = defaultdict(lambda: {"total": 0, "rookie": 0, "value": 0.0})
-        grade_stats = defaultdict(lambda: {"total": 0, "value": 0.0})
-        brand_stats = defaultdict(lambda: {"total": 0, "value": 0.0})
-
-        for c in cards:
-            key = f"{c.first_name} {c.last_name}"
-            player_stats[key]["total"] += 1
-            if int(c.rookie or 0) == 1:
-                player_stats[key]["rookie"] += 1
-            player_stats[key]["value"] += float(c.value or 0)
-            grade_stats[c.grade]["total"] += 1
-            grade_stats[c.grade]["value"] += float(c.value or 0)
-            brand = c.brand or "Unknown"
-            brand_stats[brand]["total"] += 1
-            brand_stats[brand]["value"] += float(c.value or 0)
-
-        lines.append("\nPLAYER SUMMARY (use for counting/totalling by player):")
-        for player, stats in sorted(player_stats.items()):
-            lines.append(
-                f"  - {player}: {stats['total']} cards ({stats['rookie']} rookie), "
-                f"total value ${round(stats['value']):,}"
-            )
-
-        lines.append("\nGRADE SUMMARY (use for counting/totalling by grade):")
-        for grade, stats in sorted(grade_stats.items(), key=lambda x: x[0], reverse=True):
-            lines.append(
-                f"  - Grade {grade}: {stats['total']} cards, total value ${round(stats['value']):,}"
-            )
-
-        lines.append("\nBRAND SUMMARY (use for counting/totalling by brand):")
-        for brand, stats in sorted(brand_stats.items()):
-            lines.append(
-                f"  - {brand}: {stats['total']} cards, total value ${round(stats['value']):,}"
-            )
-
-        lines.append("\nTo look up specific cards (e.g. for update or delete), use the find_cards tool.")
-
-    # ------------------------------------------------------------------
-    # Auto Balls
-    # ------------------------------------------------------------------
-    lines.append("\n\nAUTO BALLS SUMMARY:")
-    if not balls:
-        lines.append("  No autographed balls in collection.")
-    else:
-        total_val = sum(float(b.value or 0) for b in balls)
-        total_qty = len(balls)
-        lines.append(f"  Total: {total_qty} balls | Total value: ${round(total_val):,}")
-
-        signer_stats = defaultdict(lambda: {"count": 0, "value": 0.0})
-        for b in balls:
-            key = f"{b.first_name} {b.last_name}"
-            signer_stats[key]["count"] += 1
-            signer_stats[key]["value"] += float(b.value or 0)
-
-        top_signers = sorted(signer_stats.items(), key=lambda x: x[1]["count"], reverse=True)[:5]
-        signer_parts = [
-            f"{signer}: {s['count']} ball(s), value ${round(s['value']):,}"
-            for signer, s in top_signers
-        ]
-        lines.append(f"  Top signers: {' | '.join(signer_parts)}")
-
-        auth_count = sum(1 for b in balls if b.auth)
-        unauth_count = total_qty - auth_count
-        lines.append(f"  Auth breakdown: {auth_count} authenticated, {unauth_count} unauthenticated")
-        lines.append("  To look up specific balls, use the find_balls tool.")
-
-    # ------------------------------------------------------------------
-    # Wax Boxes
-    # ------------------------------------------------------------------
-    lines.append("\n\nWAX BOXES SUMMARY:")
-    if not wax_boxes:
-        lines.append("  No wax boxes in collection.")
-    else:
-        total_qty = sum(int(w.quantity or 1) for w in wax_boxes)
-        total_val = sum(int(w.quantity or 1) * float(w.value or 0) for w in wax_boxes)
-        lines.append(f"  Total: {len(wax_boxes)} boxes ({total_qty} qty) | Total value: ${round(total_val):,}")
-
-        brand_counts = defaultdict(int)
-        for w in wax_boxes:
-            brand_counts[w.brand or "Unknown"] += 1
-        brand_parts = [f"{brand}: {count} box(es)" for brand, count in sorted(brand_counts.items())]
-        lines.append(f"  By brand: {', '.join(brand_parts)}")
-        lines.append("  To look up specific wax boxes, use the find_wax tool.")
-
-    # ------------------------------------------------------------------
-    # Wax Packs
-    # ------------------------------------------------------------------
-    lines.append("\n\nWAX PACKS SUMMARY:")
-    if not wax_packs:
-        lines.append("  No wax packs in collection.")
-    else:
-        total_qty = sum(int(p.quantity or 1) for p in wax_packs)
-        total_val = sum(int(p.quantity or 1) * float(p.value or 0) for p in wax_packs)
-        lines.append(f"  Total: {len(wax_packs)} packs ({total_qty} qty) | Total value: ${round(total_val):,}")
-
-        type_counts = defaultdict(int)
-        for p in wax_packs:
-            type_counts[p.pack_type or "(none)"] += 1
-        type_parts = [f"{t}: {n}" for t, n in sorted(type_counts.items())]
-        lines.append(f"  By type: {', '.join(type_parts)}")
-
-        brand_counts = defaultdict(int)
-        for p in wax_packs:
-            brand_counts[p.brand or "Unknown"] += 1
-        brand_parts = [f"{brand}: {count} pack(s)" for brand, count in sorted(brand_counts.items())]
-        lines.append(f"  By brand: {', '.join(brand_parts)}")
-        lines.append("  To look up specific wax packs, use the find_packs tool.")
-
-    # ------------------------------------------------------------------
-    # Sets / Binders
-    # ------------------------------------------------------------------
-    lines.append("\n\nSETS/BINDERS SUMMARY:")
-    if not box_binders:
-        lines.append("  No sets/binders in collection.")
-    else:
-        total_qty = sum(int(s.quantity or 1) for s in box_binders)
-        total_val = sum(int(s.quantity or 1) * float(s.value or 0) for s in box_binders)
-        lines.append(f"  Total: {len(box_binders)} sets ({total_qty} qty) | Total value: ${round(total_val):,}")
+def _contains(column, value):
+    """Case-insensitive substring match, served by the trigram indexes (migration 040)."""
+    escaped = str(value).replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return column.ilike(f"%{escaped}%", escape="\\")
 
-        type_counts = defaultdict(int)
-        for s in box_binders:
-            type_counts[s.set_type or "Unknown"] += 1
-        type_parts = [f"{t.capitalize()}: {n}" for t, n in sorted(type_counts.items())]
-        lines.append(f"  By type: {', '.join(type_parts)}")
-        lines.append("  Sets/Binders are read-only — Cy cannot add, update, or delete them via chat.")
 
-    return "\n".join(lines)
+def _find(db: Session, model, user_id: int, inputs: dict, contains=(), equals=(), limit: int = 20):
+    """Shared query behind the find_* tools: substring match on `contains`, equality on `equals`."""
+    query = db.query(model).filter(model.user_id == user_id)
+    for field in contains:
+        if inputs.get(field):
+            query = query.filter(_contains(getattr(model, field), inputs[field]))
+    for field in equals:
+        if inputs.get(field) not in (None, ""):
+            query = query.filter(getattr(model, field) == inputs[field])
+    return query.order_by(model.id).limit(limit).all()
 
 
 def execute_tool(name: str, inputs: dict, db: Session, current: User, settings: GlobalSettings | None) -> str:
+    """Run one tool call. Writes are flushed, not committed — see run_tool_batch()."""
     # ------------------------------------------------------------------
     # Cards
     # ------------------------------------------------------------------
     if name == "find_cards":
-        query = db.query(Card).filter(Card.user_id == current.id)
-        if inputs.get("first_name"):
-            query = query.filter(Card.first_name.ilike(f"%{inputs['first_name']}%"))
-        if inputs.get("last_name"):
-            query = query.filter(Card.last_name.ilike(f"%{inputs['last_name']}%"))
-        if inputs.get("year"):
-            query = query.filter(Card.year == inputs["year"])
-        if inputs.get("brand"):
-            query = query.filter(Card.brand.ilike(f"%{inputs['brand']}%"))
-        if inputs.get("card_number"):
-            query = query.filter(Card.card_number == inputs["card_number"])
-        results = query.limit(20).all()
+        results = _find(db, Card, current.id, inputs,
+                        contains=("first_name", "last_name", "brand"), equals=("year", "card_number"))
         if not results:
             return "No cards found matching those criteria."
         lines = []
@@ -496,7 +356,7 @@ def execute_tool(name: str, inputs: dict, db: Session, current: User, settings:
             card.value = calculate_card_value(avg_book, g, factor)
             card.market_factor = factor
 
-        db.commit()
+        db.flush()
         return (
             f"Added card [ID:{card.id}]: {card.first_name} {card.last_name}, "
             f"{card.year}, {card.brand}, Grade:{card.grade}"
@@ -508,14 +368,15 @@ def execute_tool(name: str, inputs: dict, db: Session, current: User, settings:
         if not card:
             return f"Error: Card ID {card_id} not found."
 
+        if inputs.get("grade") is not None and inputs["grade"] not in VALID_GRADES:
+            return f"Error: Invalid grade {inputs['grade']}. Must be one of: {sorted(VALID_GRADES)}"
+
         updatable = [
             "first_name", "last_name", "year", "brand", "card_number", "rookie",
             "grade", "book_high", "book_high_mid", "book_mid", "book_low_mid", "book_low",
         ]
         for field in updatable:
             if field in inputs and inputs[field] is not None:
-                if field == "grade" and inputs[field] not in VALID_GRADES:
-                    return f"Error: Invalid grade {inputs[field]}. Must be one of: {sorted(VALID_GRADES)}"
                 setattr(card, field, inputs[field])
 
         if settings:
@@ -525,7 +386,7 @@ def execute_tool(name: str, inputs: dict, db: Session, current: User, settings:
             card.value = calculate_card_value(avg_book, g, factor)
             card.market_factor = factor
 
-        db.commit()
+        db.flush()
         return (
             f"Updated card [ID:{card.id}]: {card.first_name} {card.last_name}, "
             f"Grade:{card.grade}, Value:${round(float(card.value or 0)):,}"
@@ -539,23 +400,15 @@ def execute_tool(name: str, inputs: dict, db: Session, current: User, settings:
 
         label = f"{card.first_name} {card.last_name}, {card.year}, {card.brand}, Grade:{card.grade}"
         db.delete(card)
-        db.commit()
+        db.flush()
         return f"Deleted card: {label}"
 
     # ------------------------------------------------------------------
     # Auto Balls
     # ------------------------------------------------------------------
     elif name == "find_balls":
-        query = db.query(AutoBall).filter(AutoBall.user_id == current.id)
-        if inputs.get("first_name"):
-            query = query.filter(AutoBall.first_name.ilike(f"%{inputs['first_name']}%"))
-        if inputs.get("last_name"):
-            query = query.filter(AutoBall.last_name.ilike(f"%{inputs['last_name']}%"))
-        if inputs.get("brand"):
-            query = query.filter(AutoBall.brand.ilike(f"%{inputs['brand']}%"))
-        if inputs.get("auth") is not None:
-            query = query.filter(AutoBall.auth == inputs["auth"])
-        results = query.limit(20).all()
+        results = _find(db, AutoBall, current.id, inputs,
+                        contains=("first_name", "last_name", "brand"), equals=("auth",))
         if not results:
             return "No autographed balls found matching those criteria."
         lines = []
@@ -581,7 +434,7 @@ def execute_tool(name: str, inputs: dict, db: Session, current: User, settings:
             notes=inputs.get("notes"),
         )
         db.add(ball)
-        db.commit()
+        db.flush()
         return (
             f"Added autographed ball [ID:{ball.id}]: {ball.first_name} {ball.last_name}, "
             f"Brand:{ball.brand or 'N/A'}"
@@ -597,7 +450,7 @@ def execute_tool(name: str, inputs: dict, db: Session, current: User, settings:
             if field in inputs and inputs[field] is not None:
                 setattr(ball, field, inputs[field])
 
-        db.commit()
+        db.flush()
         return (
             f"Updated autographed ball [ID:{ball.id}]: {ball.first_name} {ball.last_name}, "
             f"Value:${round(float(ball.value or 0)):,}"
@@ -611,19 +464,14 @@ def execute_tool(name: str, inputs: dict, db: Session, current: User, settings:
 
         label = f"{ball.first_name} {ball.last_name}, Brand:{ball.brand or 'N/A'}"
         db.delete(ball)
-        db.commit()
+        db.flush()
         return f"Deleted autographed ball: {label}"
 
     # ------------------------------------------------------------------
     # Wax Boxes
     # ------------------------------------------------------------------
     elif name == "find_wax":
-        query = db.query(WaxBox).filter(WaxBox.user_id == current.id)
-        if inputs.get("year"):
-            query = query.filter(WaxBox.year == inputs["year"])
-        if inputs.get("brand"):
-            query = query.filter(WaxBox.brand.ilike(f"%{inputs['brand']}%"))
-        results = query.limit(20).all()
+        results = _find(db, WaxBox, current.id, inputs, contains=("brand",), equals=("year",))
         if not results:
             return "No wax boxes found matching those criteria."
         lines = []
@@ -645,7 +493,7 @@ def execute_tool(name: str, inputs: dict, db: Session, current: User, settings:
             notes=inputs.get("notes"),
         )
         db.add(box)
-        db.commit()
+        db.flush()
         return (
             f"Added wax box [ID:{box.id}]: {box.year} {box.brand}, "
             f"Qty:{box.quantity or 1}"
@@ -661,7 +509,7 @@ def execute_tool(name: str, inputs: dict, db: Session, current: User, settings:
             if field in inputs and inputs[field] is not None:
                 setattr(box, field, inputs[field])
 
-        db.commit()
+        db.flush()
         return (
             f"Updated wax box [ID:{box.id}]: {box.year} {box.brand}, "
             f"Qty:{box.quantity or 1}, Value:${round(float(box.value or 0)):,}"
@@ -675,21 +523,14 @@ def execute_tool(name: str, inputs: dict, db: Session, current: User, settings:
 
         label = f"{box.year} {box.brand}, Set:{box.set_name or 'N/A'}"
         db.delete(box)
-        db.commit()
+        db.flush()
         return f"Deleted wax box: {label}"
 
     # ------------------------------------------------------------------
     # Wax Packs
     # ------------------------------------------------------------------
     elif name == "find_packs":
-        query = db.query(WaxPack).filter(WaxPack.user_id == current.id)
-        if inputs.get("year"):
-            query = query.filter(WaxPack.year == inputs["year"])
-        if inputs.get("brand"):
-            query = query.filter(WaxPack.brand.ilike(f"%{inputs['brand']}%"))
-        if inputs.get("pack_type"):
-            query = query.filter(WaxPack.pack_type == inputs["pack_type"])
-        results = query.limit(20).all()
+        results = _find(db, WaxPack, current.id, inputs, contains=("brand",), equals=("year", "pack_type"))
         if not results:
             return "No wax packs found matching those criteria."
         lines = []
@@ -713,7 +554,7 @@ def execute_tool(name: str, inputs: dict, db: Session, current: User, settings:
             notes=inputs.get("notes"),
         )
         db.add(pack)
-        db.commit()
+        db.flush()
         return (
             f"Added wax pack [ID:{pack.id}]: {pack.year} {pack.brand}, "
             f"Type:{pack.pack_type or 'N/A'}, Qty:{pack.quantity or 1}"
@@ -729,7 +570,7 @@ def execute_tool(name: str, inputs: dict, db: Session, current: User, settings:
             if field in inputs and inputs[field] is not None:
                 setattr(pack, field, inputs[field])
 
-        db.commit()
+        db.flush()
         return (
             f"Updated wax pack [ID:{pack.id}]: {pack.year} {pack.brand}, "
             f"Type:{pack.pack_type or 'N/A'}, Qty:{pack.quantity or 1}, Value:${round(float(pack.value or 0)):,}"
@@ -743,33 +584,19 @@ def execute_tool(name: str, inputs: dict, db: Session, current: User, settings:
 
         label = f"{pack.year} {pack.brand}, Type:{pack.pack_type or 'N/A'}"
         db.delete(pack)
-        db.commit()
+        db.flush()
         return f"Deleted wax pack: {label}"
 
     return f"Error: Unknown tool {name}"
 
 
-@router.post("/")
-def chat(
-    req: ChatRequest,
-    db: Session = Depends(get_db),
-    current: User = Depends(get_current_user),
-):
-    api_key = os.getenv("ANTHROPIC_API_KEY")
-    if not api_key:
-        raise HTTPException(status_code=500, detail="Anthropic API key not configured")
-
-    cards = db.query(Card).filter(Card.user_id == current.id).all()
-    balls = db.query(AutoBall).filter(AutoBall.user_id == current.id).all()
-    wax_boxes = db.query(WaxBox).filter(WaxBox.user_id == current.id).all()
-    wax_packs = db.query(WaxPack).filter(WaxPack.user_id == current.id).all()
-    box_binders = db.query(BoxBinder).filter(BoxBinder.user_id == current.id).all()
-    settings = db.query(GlobalSettings).filter(GlobalSettings.user_id == current.id).first()
-    context = build_collection_context(cards, balls, wax_boxes, wax_packs, box_binders, settings)
+CHAT_MODEL = "claude-haiku-4-5-20251001"
+MAX_TOOL_ROUNDS = 10  # max tool calls per turn
+GIVE_UP_MESSAGE = "I wasn't able to complete this request. Please try again."
 
-    client = anthropic.Anthropic(api_key=api_key)
 
-    system_prompt = f"""You are Cy, a helpful AI assistant for managing a sports memorabilia collection.
+def _system_prompt(context: str) -> str:
+    return f"""You are Cy, a helpful AI assistant for managing a sports memorabilia collection.
 
 Your collection includes 5 inventory types:
 1. **Cards** — trading cards with player, year, brand, grade, and book/market values
@@ -802,6 +629,8 @@ explain that must be done through the Sets page.
 
 {context}"""
 
+
+def _turn_messages(req: ChatRequest) -> list[dict]:
     recent_history = req.history[-10:] if len(req.history) > 10 else req.history
     messages = [
         {"role": m.role, "content": m.text}
@@ -809,11 +638,67 @@ explain that must be done through the Sets page.
         if m.role in ("user", "assistant")
     ]
     messages.append({"role": "user", "content": req.message})
+    return messages
 
+
+def _final_text(message) -> str:
+    return next((b.text for b in message.content if hasattr(b, "text")), "")
+
+
+def _tool_result(block, result: str) -> dict:
+    return {"type": "tool_result", "tool_use_id": block.id, "content": result}
+
+
+def run_tool_batch(blocks, db: Session, current: User, settings: GlobalSettings | None) -> list[tuple[str, float]]:
+    """
+    Run every tool call of one model response, in order, as one transaction:
+    a single commit at the end, or — if any call raises — a rollback and an
+    error result for each call, so the model never reports a change that was
+    not saved. Returns (result, elapsed ms) per block; timings are logged.
+    """
+    outcomes = []
     try:
-        for _ in range(10):  # max 10 tool calls per turn
-            response = client.messages.create(
-                model="claude-haiku-4-5-20251001",
+        for block in blocks:
+            started = time.perf_counter()
+            result = execute_tool(block.name, block.input, db, current, settings)
+            elapsed = (time.perf_counter() - started) * 1000
+            logger.info("chat tool %s user=%s %.1f ms", block.name, current.id, elapsed)
+            outcomes.append((result, elapsed))
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        logger.exception("chat tool batch failed: %s", [b.name for b in blocks])
+        return [(f"Error: {e}. None of the changes from this step were saved.", 0.0) for _ in blocks]
+    return outcomes
+
+
+async def _run_tools(blocks, db: Session, current: User, settings: GlobalSettings | None) -> list[tuple[str, float]]:
+    # Tools hit the database synchronously — keep them off the event loop (one hop per batch)
+    return await run_in_threadpool(run_tool_batch, blocks, db, current, settings)
+
+
+def _tool_uses(message) -> list:
+    return [b for b in message.content if b.type == "tool_use"]
+
+
+@router.post("/")
+async def chat(
+    req: ChatRequest,
+    db: Session = Depends(get_db),
+    current: User = Depends(get_current_user),
+):
+    get_client()
+    check_ai_rate_limit(current.id)
+
+    settings = current.settings
+    context = await run_in_threadpool(build_collection_context, db, current.id, settings)
+    system_prompt = _system_prompt(context)
+    messages = _turn_messages(req)
+
+    try:
+        for _ in range(MAX_TOOL_ROUNDS):
+            response = await create_message(
+                model=CHAT_MODEL,
                 max_tokens=1024,
                 system=system_prompt,
                 tools=TOOLS,
@@ -822,24 +707,94 @@ explain that must be done through the Sets page.
             messages.append({"role": "assistant", "content": response.content})
 
             if response.stop_reason != "tool_use":
-                text = next(
-                    (b.text for b in response.content if hasattr(b, "text")),
-                    ""
-                )
-                return {"response": text}
-
-            # Execute tool calls and feed results back
-            tool_results = []
-            for block in response.content:
-                if block.type == "tool_use":
-                    result = execute_tool(block.name, block.input, db, current, settings)
-                    tool_results.append({
-                        "type": "tool_result",
-                        "tool_use_id": block.id,
-                        "content": result,
-                    })
-            messages.append({"role": "user", "content": tool_results})
-
-        return {"response": "I wasn't able to complete this request. Please try again."}
+                return {"response": _final_text(response)}
+
+            # Execute the response's tool calls as one batch and feed results back
+            blocks = _tool_uses(response)
+            outcomes = await _run_tools(blocks, db, current, settings)
+            messages.append({"role": "user", "content": [
+                _tool_result(block, result) for block, (result, _) in zip(blocks, outcomes)
+            ]})
+
+        return {"response": GIVE_UP_MESSAGE}
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+
+
+def _sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+@router.post("/stream")
+async def chat_stream(
+    req: ChatRequest,
+    current: User = Depends(get_current_user),
+):
+    """
+    Streaming variant of POST /chat/ (Server-Sent Events). Events:
+      text  {"text": "..."}                               — model output as it arrives
+      tool  {"name": "find_cards", "status": "started"|"done", "ms": 1.2}  — one per call; a
+                                                          response's calls run as one batch
+      done  {"response": "..."}                           — final answer, as POST /chat/ returns it
+      error {"detail": "..."}
+    """
+    get_client()
+    check_ai_rate_limit(current.id)
+    user_id = current.id
+
+    async def events():
+        # The request's own session is closed once the response starts; use one
+        # that lives as long as the stream.
+        db = SessionLocal()
+        try:
+            user = await run_in_threadpool(
+                lambda: db.query(User).options(joinedload(User.settings)).filter(User.id == user_id).first()
+            )
+            settings = user.settings
+            context = await run_in_threadpool(build_collection_context, db, user_id, settings)
+            system_prompt = _system_prompt(context)
+            messages = _turn_messages(req)
+
+            for _ in range(MAX_TOOL_ROUNDS):
+                async with stream_message(
+                    model=CHAT_MODEL,
+                    max_tokens=1024,
+                    system=system_prompt,
+                    tools=TOOLS,
+                    messages=messages,
+                ) as stream:
+                    async for event in stream:
+                        if event.type == "text":
+                            yield _sse("text", {"text": event.text})
+                    message = await stream.get_final_message()
+                messages.append({"role": "assistant", "content": message.content})
+
+                if message.stop_reason != "tool_use":
+                    yield _sse("done", {"response": _final_text(message)})
+                    return
+
+                blocks = _tool_uses(message)
+                for block in blocks:
+                    yield _sse("tool", {"name": block.name, "status": "started"})
+                outcomes = await _run_tools(blocks, db, user, settings)
+                for block, (_, elapsed) in zip(blocks, outcomes):
+                    yield _sse("tool", {"name": block.name, "status": "done", "ms": round(elapsed, 1)})
+                messages.append({"role": "user", "content": [
+                    _tool_result(block, result) for block, (result, _) in zip(blocks, outcomes)
+                ]})
+
+            yield _sse("done", {"response": GIVE_UP_MESSAGE})
+        except HTTPException as e:
+            yield _sse("error", {"detail": e.detail})
+        except Exception as e:
+            yield _sse("error", {"detail": str(e)})
+        finally:
+            db.close()
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
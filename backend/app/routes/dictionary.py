@@ -1,18 +1,29 @@
 import io, csv
-from datetime import datetime, timezone
 from typing import Optional
 
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File
+from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Query, Request
 from sqlalchemy.orm import Session
 from sqlalchemy import func, text
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.exc import IntegrityError
 
 from app import models, schemas
 from app.database import get_db
 from app.auth.security import get_current_user
 from app.models import Card, DictionaryEntry, User
+from app.services.jobs import NO_PROGRESS, submit_job, accepted
+from app.services.dictionary_index import dictionary_index
+from app.services.dictionary_values import (
+    import_values_rows, missing_values_headers, parse_values_rows,
+    seed_values_from_cards as seed_card_values,
+)
+from app.services.typeahead import TYPEAHEAD_MAX_AGE, player_typeahead
+from app.services.http_cache import etag_json
 
 router = APIRouter(prefix="/dictionary", tags=["dictionary"])
 
+DUPLICATE_ENTRY_MSG = "An entry with this name, brand, year and card number already exists"
+
 # ---------------------------------------------------------------------------
 # GET /dictionary/entries  — paginated list with optional filters
 # ---------------------------------------------------------------------------
@@ -85,6 +96,22 @@ def get_dictionary_players(
     return {"players": [{"first_name": r.first_name, "last_name": r.last_name} for r in rows]}
 
 
+# ---------------------------------------------------------------------------
+# GET /dictionary/players/typeahead  — ranked prefix completions (ETag / 304)
+# ---------------------------------------------------------------------------
+@router.get("/players/typeahead")
+def dictionary_players_typeahead(
+    request: Request,
+    q: str = Query(..., min_length=1, max_length=100),
+    field: str = Query("full", pattern="^(first_name|last_name|full)$"),
+    limit: int = Query(10, ge=1, le=50),
+    db: Session = Depends(get_db),
+    current: User = Depends(get_current_user),
+):
+    results = player_typeahead(db, q, field, limit)
+    return etag_json(request, {"q": q, "field": field, "results": results}, max_age=TYPEAHEAD_MAX_AGE)
+
+
 # ---------------------------------------------------------------------------
 # GET /dictionary/search  — smart-fill lookup
 # ---------------------------------------------------------------------------
@@ -97,16 +124,7 @@ def search_entry(
     db: Session = Depends(get_db),
     current: User = Depends(get_current_user),
 ):
-    q = db.query(DictionaryEntry).filter(
-        func.lower(DictionaryEntry.first_name) == first_name.strip().lower(),
-        func.lower(DictionaryEntry.last_name) == last_name.strip().lower(),
-    )
-    if brand:
-        q = q.filter(func.lower(DictionaryEntry.brand) == brand.strip().lower())
-    if year is not None:
-        q = q.filter(DictionaryEntry.year == year)
-
-    entry = q.first()
+    entry = dictionary_index.find(db, first_name, last_name, brand, year)
     if not entry:
         return {"status": "not_found", "fields": {}}
 
@@ -143,8 +161,15 @@ def create_entry(
 ):
     entry = DictionaryEntry(**data.dict())
     db.add(entry)
-    db.commit()
+    try:
+        db.flush()
+        version = dictionary_index.written_version(db)
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        raise HTTPException(status_code=409, detail=DUPLICATE_ENTRY_MSG)
     db.refresh(entry)
+    dictionary_index.upsert(entry, version)
     return entry
 
 
@@ -163,8 +188,15 @@ def update_entry(
         raise HTTPException(status_code=404, detail="Dictionary entry not found")
     for field, value in data.dict().items():
         setattr(entry, field, value)
-    db.commit()
+    try:
+        db.flush()
+        version = dictionary_index.written_version(db)
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        raise HTTPException(status_code=409, detail=DUPLICATE_ENTRY_MSG)
     db.refresh(entry)
+    dictionary_index.upsert(entry, version)
     return entry
 
 
@@ -181,7 +213,10 @@ def delete_entry(
     if not entry:
         raise HTTPException(status_code=404, detail="Dictionary entry not found")
     db.delete(entry)
+    db.flush()
+    version = dictionary_index.written_version(db)
     db.commit()
+    dictionary_index.remove([entry_id], version)
     return {"ok": True}
 
 
@@ -322,7 +357,7 @@ async def import_dictionary_csv(
                 skipped += 1
                 continue
 
-            new_entries.append(DictionaryEntry(
+            new_entries.append(dict(
                 first_name=first, last_name=last, rookie_year=rookie_year,
                 brand=brand, year=year, card_number=card_number,
             ))
@@ -332,12 +367,21 @@ async def import_dictionary_csv(
     if not new_entries and skipped == 0:
         return {"imported": 0, "skipped": 0, "message": "No entries found in file."}
 
-    db.add_all(new_entries)
+    # Exact duplicates of existing rows (ux_dictionary_entries_key) are skipped too
+    imported = 0
+    if new_entries:
+        imported = db.execute(
+            pg_insert(DictionaryEntry.__table__)
+            .values(new_entries)
+            .on_conflict_do_nothing(index_elements=["first_name", "last_name", "brand", "year", "card_number"])
+        ).rowcount
+    skipped += len(new_entries) - imported
     db.commit()
-    msg = f"Imported {len(new_entries)} entries."
+    dictionary_index.invalidate()
+    msg = f"Imported {imported} entries."
     if skipped:
         msg += f" Skipped {skipped} duplicates."
-    return {"imported": len(new_entries), "skipped": skipped, "message": msg}
+    return {"imported": imported, "skipped": skipped, "message": msg}
 
 
 # ---------------------------------------------------------------------------
@@ -361,6 +405,7 @@ def set_player_rookie_year(
         .update({"rookie_year": rookie_year}, synchronize_session=False)
     )
     db.commit()
+    dictionary_index.invalidate()
     return {"updated": updated}
 
 
@@ -381,6 +426,7 @@ def get_values_stats(
 # ---------------------------------------------------------------------------
 # POST /dictionary/validate-values-csv  — validate a book-value CSV before import
 # CSV format: Brand,Year,CardNumber,BookHigh,BookHighMid,BookMid,BookLowMid,BookLow
+# ?async=true runs the import as a background job (202 + job id, poll /jobs/{id})
 # ---------------------------------------------------------------------------
 @router.post("/validate-values-csv")
 async def validate_values_csv(
@@ -459,10 +505,37 @@ async def validate_values_csv(
 # ---------------------------------------------------------------------------
 # POST /dictionary/import-values-csv  — bulk update book values from CSV
 # CSV format: Brand,Year,CardNumber,BookHigh,BookHighMid,BookMid,BookLowMid,BookLow
+# ?async=true runs the import as a background job (202 + job id, poll /jobs/{id})
 # ---------------------------------------------------------------------------
+def _import_values_rows(db: Session, ctx, user: User, content: str) -> dict:
+    """
+    Apply book values from a values CSV to matching entries (job worker — see
+    services/jobs.py). The caller invalidates dictionary_index after committing.
+    """
+    reader = csv.DictReader(io.StringIO(content))
+    try:
+        rows = list(parse_values_rows(reader))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    ctx.progress(0, 1, f"Applying {len(rows)} rows")
+    cursor = db.connection().connection.cursor()
+    try:
+        counts = import_values_rows(cursor, rows)
+    finally:
+        cursor.close()
+
+    updated, not_found = counts["updated"], counts["not_found"]
+    msg = f"Updated {updated} entries."
+    if not_found:
+        msg += f" {not_found} rows had no matching dictionary entry (skipped)."
+    return {**counts, "message": msg}
+
+
 @router.post("/import-values-csv")
 async def import_values_csv(
     file: UploadFile = File(...),
+    run_async: bool = Query(False, alias="async"),
     db: Session = Depends(get_db),
     current: User = Depends(get_current_user),
 ):
@@ -472,132 +545,62 @@ async def import_values_csv(
     content = (await file.read()).decode("utf-8", errors="ignore")
     reader = csv.DictReader(io.StringIO(content))
 
-    expected = {"Brand", "Year", "CardNumber", "BookHigh", "BookHighMid", "BookMid", "BookLowMid", "BookLow"}
-    if not reader.fieldnames or not expected.issubset(set(reader.fieldnames)):
-        missing = expected.difference(set(reader.fieldnames or []))
+    missing = missing_values_headers(reader.fieldnames)
+    if missing:
         raise HTTPException(
             status_code=400,
             detail=f"CSV is missing required headers: {', '.join(sorted(missing))}"
         )
 
-    now = datetime.now(timezone.utc)
-    updated = 0
-    not_found = 0
-    rownum = 0
-
-    for row in reader:
-        rownum += 1
-        try:
-            brand       = (row["Brand"] or "").strip()
-            year        = int((row["Year"] or "").strip())
-            card_number = (row["CardNumber"] or "").strip()
-
-            def _f(col):
-                v = (row.get(col) or "").strip()
-                return float(v) if v else None
-
-            book_high     = _f("BookHigh")
-            book_high_mid = _f("BookHighMid")
-            book_mid      = _f("BookMid")
-            book_low_mid  = _f("BookLowMid")
-            book_low      = _f("BookLow")
-
-        except Exception as e:
-            raise HTTPException(status_code=400, detail=f"Row {rownum} invalid: {e}")
-
-        # Skip rows missing any of the 5 value tiers
-        if not all([book_high, book_high_mid, book_mid, book_low_mid, book_low]):
-            not_found += 1
-            continue
-
-        entry = db.query(DictionaryEntry).filter(
-            func.lower(DictionaryEntry.brand) == brand.lower(),
-            DictionaryEntry.year == year,
-            func.lower(DictionaryEntry.card_number) == card_number.lower(),
-        ).first()
-
-        if entry:
-            entry.book_high     = book_high
-            entry.book_high_mid = book_high_mid
-            entry.book_mid      = book_mid
-            entry.book_low_mid  = book_low_mid
-            entry.book_low      = book_low
-            entry.book_values_imported_at = now
-            updated += 1
-        else:
-            not_found += 1
+    if run_async:
+        return accepted(submit_job(db, current, "import-values-csv", _import_values_rows, content,
+                                   after_commit=dictionary_index.invalidate))
 
+    result = _import_values_rows(db, NO_PROGRESS, current, content)
     db.commit()
-    msg = f"Updated {updated} entries."
-    if not_found:
-        msg += f" {not_found} rows had no matching dictionary entry (skipped)."
-    return {"updated": updated, "not_found": not_found, "message": msg}
+    dictionary_index.invalidate()
+    return result
 
 
 # ---------------------------------------------------------------------------
 # POST /dictionary/seed-values-from-cards  — one-time seed from user's cards table
 # Copies book values from cards to dictionary_entries where brand+year+card_number match
 # and book_high > 0. Admin-only convenience endpoint for initial population.
-# ---------------------------------------------------------------------------
+# ?async=true runs the seed as a background job.
+# ---------------------------------------------------------------------------
+def _seed_values(db: Session, ctx, user: User) -> dict:
+    """
+    Copy the user's card book values into the dictionary (job worker — see
+    services/jobs.py). The caller invalidates dictionary_index after committing.
+    """
+    cursor = db.connection().connection.cursor()
+    try:
+        counts = seed_card_values(cursor, user.id)
+    finally:
+        cursor.close()
+
+    updated, created = counts["updated"], counts["created"]
+    return {
+        "updated": updated,
+        "created": created,
+        "message": f"Seeded {updated + created} dictionary entries ({updated} updated, {created} created).",
+    }
+
+
 @router.post("/seed-values-from-cards")
 def seed_values_from_cards(
+    run_async: bool = Query(False, alias="async"),
     db: Session = Depends(get_db),
     current: User = Depends(get_current_user),
 ):
-    now = datetime.now(timezone.utc)
-
-    # Fetch all cards with all 5 book values set belonging to this user
-    cards_with_values = db.query(Card).filter(
-        Card.user_id == current.id,
-        Card.book_high.isnot(None),    Card.book_high > 0,
-        Card.book_high_mid.isnot(None), Card.book_high_mid > 0,
-        Card.book_mid.isnot(None),      Card.book_mid > 0,
-        Card.book_low_mid.isnot(None),  Card.book_low_mid > 0,
-        Card.book_low.isnot(None),      Card.book_low > 0,
-    ).all()
-
-    created = 0
-    updated = 0
-    for card in cards_with_values:
-        if not card.brand or not card.year or not card.card_number:
-            continue
-        entry = db.query(DictionaryEntry).filter(
-            func.lower(DictionaryEntry.brand) == card.brand.lower(),
-            DictionaryEntry.year == card.year,
-            func.lower(DictionaryEntry.card_number) == card.card_number.lower(),
-        ).first()
-
-        if entry:
-            entry.book_high     = card.book_high
-            entry.book_high_mid = card.book_high_mid
-            entry.book_mid      = card.book_mid
-            entry.book_low_mid  = card.book_low_mid
-            entry.book_low      = card.book_low
-            entry.book_values_imported_at = now
-            updated += 1
-        else:
-            db.add(DictionaryEntry(
-                first_name=card.first_name,
-                last_name=card.last_name,
-                rookie_year=None,
-                brand=card.brand,
-                year=card.year,
-                card_number=card.card_number,
-                book_high=card.book_high,
-                book_high_mid=card.book_high_mid,
-                book_mid=card.book_mid,
-                book_low_mid=card.book_low_mid,
-                book_low=card.book_low,
-                book_values_imported_at=now,
-            ))
-            created += 1
+    if run_async:
+        return accepted(submit_job(db, current, "seed-values-from-cards", _seed_values,
+                                   after_commit=dictionary_index.invalidate))
 
+    result = _seed_values(db, NO_PROGRESS, current)
     db.commit()
-    return {
-        "updated": updated,
-        "created": created,
-        "message": f"Seeded {updated + created} dictionary entries ({updated} updated, {created} created).",
-    }
+    dictionary_index.invalidate()
+    return result
 
 
 # ---------------------------------------------------------------------------
@@ -653,8 +656,11 @@ def deduplicate_entries(
         WHERE id IN (SELECT id FROM to_delete)
         RETURNING id
     """))
-    removed = len(result.fetchall())
+    removed_ids = [row.id for row in result]
+    removed = len(removed_ids)
+    version = dictionary_index.written_version(db)
     db.commit()
+    dictionary_index.remove(removed_ids, version)
     return {
         "removed": removed,
         "message": f"Removed {removed} duplicate {'entry' if removed == 1 else 'entries'}. Dictionary is now clean.",
@@ -714,8 +720,11 @@ def purge_invalid_entries(
         WHERE {_INVALID_BRAND_SQL}
         RETURNING id
     """))
-    removed = len(result.fetchall())
+    removed_ids = [row.id for row in result]
+    removed = len(removed_ids)
+    version = dictionary_index.written_version(db)
     db.commit()
+    dictionary_index.remove(removed_ids, version)
     return {
         "removed": removed,
         "message": f"Removed {removed} invalid {'entry' if removed == 1 else 'entries'}. Dictionary is now clean.",
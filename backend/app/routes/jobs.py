@@ -0,0 +1,90 @@
+"""
+backend/app/routes/jobs.py
+---------------------------
+Background job status — all mounted under /jobs.
+
+Jobs are created by bulk endpoints called with ?async=true (see services/jobs.py).
+
+Endpoints:
+  GET  /jobs/               Most recent jobs for the current user
+  GET  /jobs/{id}           Poll a single job (status, progress %, result/error)
+                            (both read the user from access-token claims — get_token_user)
+  POST /jobs/{id}/cancel    Request cancellation (immediate if still queued)
+"""
+from datetime import datetime, timezone
+
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy import update
+from sqlalchemy.orm import Session
+
+from app import schemas
+from app.database import get_db
+from app.auth.security import TokenUser, get_current_user, get_token_user
+from app.models import Job, User
+from app.services.jobs import TERMINAL_STATUSES
+
+router = APIRouter(prefix="/jobs", tags=["jobs"])
+
+JOB_NOT_FOUND_MSG = "Job not found"
+
+
+def _get_owned_job(db: Session, job_id: int, user_id: int) -> Job:
+    job = db.query(Job).filter(Job.id == job_id, Job.user_id == user_id).first()
+    if not job:
+        raise HTTPException(status_code=404, detail=JOB_NOT_FOUND_MSG)
+    return job
+
+
+@router.get("/", response_model=list[schemas.JobOut])
+def list_jobs(
+    limit: int = 20,
+    db: Session = Depends(get_db),
+    current: TokenUser = Depends(get_token_user),
+):
+    return (
+        db.query(Job)
+        .filter(Job.user_id == current.id)
+        .order_by(Job.id.desc())
+        .limit(min(limit, 100))
+        .all()
+    )
+
+
+@router.get("/{job_id}", response_model=schemas.JobOut)
+def get_job(
+    job_id: int,
+    db: Session = Depends(get_db),
+    current: TokenUser = Depends(get_token_user),
+):
+    return _get_owned_job(db, job_id, current.id)
+
+
+@router.post("/{job_id}/cancel", response_model=schemas.JobOut)
+def cancel_job(
+    job_id: int,
+    db: Session = Depends(get_db),
+    current: User = Depends(get_current_user),
+):
+    """
+    Flag a job for cancellation. Queued jobs are cancelled on the spot; running
+    jobs stop at their next progress checkpoint and roll back their work.
+    """
+    job = _get_owned_job(db, job_id, current.id)
+    # Conditional UPDATEs: the runner may flip queued → running (or finish)
+    # concurrently, and a read-modify-write here would overwrite its status.
+    flagged = db.execute(
+        update(Job)
+        .where(Job.id == job.id, Job.status.notin_(TERMINAL_STATUSES))
+        .values(cancel_requested=True)
+    ).rowcount
+    if flagged:
+        db.execute(
+            update(Job)
+            .where(Job.id == job.id, Job.status == "queued")
+            .values(status="cancelled", finished_at=datetime.now(timezone.utc))
+        )
+    db.commit()
+    db.refresh(job)
+    if not flagged:
+        raise HTTPException(status_code=409, detail=f"Job already {job.status}")
+    return job
@@ -1,7 +1,6 @@
-import io, base64, os
+import os
 from datetime import datetime, timezone
 
-import qrcode
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 
@@ -9,6 +8,7 @@ from app import models, schemas
 from app.database import get_db
 from app.auth.security import get_current_user
 from app.models import User
+from app.services.labels import qr_b64 as qr_label_b64
 
 router = APIRouter(prefix="/packs", tags=["packs"])
 
@@ -25,13 +25,7 @@ def get_pack_public(pack_id: int, db: Session = Depends(get_db)):
     frontend_url = os.getenv("FRONTEND_BASE_URL", "http://localhost:3000")
     view_url = f"{frontend_url}/pack-view/{record.id}"
 
-    qr_obj = qrcode.QRCode(version=1, box_size=10, border=2)
-    qr_obj.add_data(view_url)
-    qr_obj.make(fit=True)
-    img = qr_obj.make_image(fill_color="black", back_color="white")
-    buf = io.BytesIO()
-    img.save(buf, format="PNG")
-    qr_b64 = base64.b64encode(buf.getvalue()).decode()
+    qr_b64 = qr_label_b64(view_url)
 
     descriptor = f"{record.year} {record.brand}"
     if record.set_name:
@@ -3,6 +3,7 @@ from sqlalchemy.orm import Session
 from .. import models, schemas
 from ..database import get_db
 from ..auth.security import get_current_user
+from ..services.revaluation import FACTOR_FIELDS, revalue_factor_buckets
 
 router = APIRouter(prefix="/settings", tags=["settings"])
 
@@ -14,9 +15,7 @@ def get_settings(
     db: Session = Depends(get_db),
     current: models.User = Depends(get_current_user),
 ):
-    settings = db.query(models.GlobalSettings).filter(
-        models.GlobalSettings.user_id == current.id
-    ).first()
+    settings = current.settings
 
     if not settings:
         settings = models.GlobalSettings(user_id=current.id)
@@ -36,9 +35,7 @@ def update_settings(
     db: Session = Depends(get_db),
     current: models.User = Depends(get_current_user),
 ):
-    settings = db.query(models.GlobalSettings).filter(
-        models.GlobalSettings.user_id == current.id
-    ).first()
+    settings = current.settings
 
     if not settings:
         settings = models.GlobalSettings(user_id=current.id)
@@ -46,9 +43,19 @@ def update_settings(
         db.commit()
         db.refresh(settings)
 
-    for field, value in updated.dict(exclude_unset=True).items():
+    changes = updated.dict(exclude_unset=True)
+    changed_factors = [
+        f for f in FACTOR_FIELDS if f in changes and changes[f] != getattr(settings, f)
+    ]
+
+    for field, value in changes.items():
         setattr(settings, field, value)
 
+    # Revalue only the cards whose market factor reads a changed column
+    if changed_factors:
+        db.flush()
+        revalue_factor_buckets(db, current.id, settings.id, changed_factors)
+
     db.commit()
     db.refresh(settings)
     return settings
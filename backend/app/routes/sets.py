@@ -9,7 +9,11 @@ Two-tier data model:
 
 Endpoints:
   GET  /sets/                              List all sets with entry_count + in_collection_count per user
+  GET  /sets/progress                      Completion %, owned value, est. cost-to-complete per set
+  GET  /sets/{set_id}/progress             Same for one set + its missing cards with est. prices
   GET  /sets/{set_id}/entries              Set checklist overlaid with user's build status
+                                           (?status=owned|missing, ?rookies=true|false)
+  GET  /sets/{set_id}/entries/page         Same, one page (?offset=&limit=) + entry / in-build counts
   POST /sets/{set_id}/user-cards           Mark a set entry as 'in build' for current user
   PATCH /sets/{set_id}/user-cards/{id}     Update grade/values/notes on a user set card
   DELETE /sets/{set_id}/user-cards/{id}    Remove a card from the user's build
@@ -21,16 +25,18 @@ CSV format: SetName, Brand, Year, CardNumber, First, Last, Rookie
 """
 import io, csv
 from datetime import datetime, timezone
-from typing import Optional
+from typing import Literal, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File
+from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Query
 from sqlalchemy.orm import Session
-from sqlalchemy import func, cast, Integer
+from sqlalchemy import and_, func, true
 
 from app import models, schemas
 from app.database import get_db
 from app.auth.security import get_current_user
 from app.models import User
+from app.services.set_import import import_set_rows, missing_set_headers, parse_set_rows
+from app.services.set_progress import missing_cards, set_progress
 
 router = APIRouter(prefix="/sets", tags=["sets"])
 
@@ -43,93 +49,139 @@ def list_sets(
     db: Session = Depends(get_db),
     current: User = Depends(get_current_user),
 ):
-    sets = db.query(models.SetList).order_by(models.SetList.year, models.SetList.name).all()
-
-    # Count total entries and in-collection entries per set for this user
-    entry_counts = dict(
-        db.query(models.SetEntry.set_id, func.count(models.SetEntry.id))
-        .group_by(models.SetEntry.set_id)
+    uc = models.UserSetCard
+    rows = (
+        db.query(models.SetList, func.count(models.SetEntry.id), func.count(uc.id))
+        .outerjoin(models.SetEntry, models.SetEntry.set_id == models.SetList.id)
+        .outerjoin(uc, and_(uc.set_entry_id == models.SetEntry.id, uc.user_id == current.id))
+        .group_by(models.SetList.id)
+        .order_by(models.SetList.year, models.SetList.name)
         .all()
     )
+    return [
+        schemas.SetListOut(
+            id=s.id, name=s.name, brand=s.brand, year=s.year, created_at=s.created_at,
+            entry_count=entry_count, in_collection_count=in_col_count,
+        )
+        for s, entry_count, in_col_count in rows
+    ]
 
-    in_col_counts = dict(
-        db.query(models.SetEntry.set_id, func.count(models.UserSetCard.id))
-        .join(models.UserSetCard, models.UserSetCard.set_entry_id == models.SetEntry.id)
-        .filter(models.UserSetCard.user_id == current.id)
-        .group_by(models.SetEntry.set_id)
-        .all()
-    )
 
-    result = []
-    for s in sets:
-        result.append(schemas.SetListOut(
-            id=s.id, name=s.name, brand=s.brand, year=s.year, created_at=s.created_at,
-            entry_count=entry_counts.get(s.id, 0),
-            in_collection_count=in_col_counts.get(s.id, 0),
-        ))
-    return result
+# ---------------------------------------------------------------------------
+# GET /sets/progress  — completion analytics for every set
+# ---------------------------------------------------------------------------
+@router.get("/progress", response_model=list[schemas.SetProgressOut])
+def sets_progress(
+    started: bool = False,
+    db: Session = Depends(get_db),
+    current: User = Depends(get_current_user),
+):
+    """Completion %, owned value and estimated cost-to-complete per set (?started=true: owned > 0 only)."""
+    return set_progress(db, current.id, started_only=started)
 
 
 # ---------------------------------------------------------------------------
-# GET /sets/{set_id}/entries  — all entries, overlaid with user status
+# GET /sets/{set_id}/progress  — one set's analytics + missing-card list
 # ---------------------------------------------------------------------------
-@router.get("/{set_id}/entries", response_model=list[schemas.SetEntryOut])
-def list_set_entries(
+@router.get("/{set_id}/progress", response_model=schemas.SetProgressDetail)
+def set_progress_detail(
     set_id: int,
     db: Session = Depends(get_db),
     current: User = Depends(get_current_user),
 ):
-    s = db.query(models.SetList).filter(models.SetList.id == set_id).first()
-    if not s:
+    rows = set_progress(db, current.id, set_id=set_id)
+    if not rows:
         raise HTTPException(status_code=404, detail="Set not found")
+    return {**rows[0], "missing": missing_cards(db, current.id, set_id)}
 
-    entries = (
-        db.query(models.SetEntry)
+
+# ---------------------------------------------------------------------------
+# GET /sets/{set_id}/entries  — checklist overlaid with user status
+# ---------------------------------------------------------------------------
+_UC = models.UserSetCard
+
+# SetEntryOut fields, selected as columns from set_entries LEFT JOIN user_set_cards
+_ENTRY_COLUMNS = (
+    models.SetEntry.id,
+    models.SetEntry.set_id,
+    models.SetEntry.card_number,
+    models.SetEntry.first_name,
+    models.SetEntry.last_name,
+    func.coalesce(models.SetEntry.rookie, False).label("rookie"),
+    _UC.id.label("user_set_card_id"),
+    _UC.id.isnot(None).label("in_build"),
+    _UC.grade, _UC.book_high, _UC.book_high_mid, _UC.book_mid, _UC.book_low_mid, _UC.book_low,
+    _UC.value, _UC.notes, _UC.book_values_updated_at,
+)
+
+
+def _entry_filters(status: Optional[str], rookies: Optional[bool]) -> list:
+    conds = []
+    if status == "owned":
+        conds.append(_UC.id.isnot(None))
+    elif status == "missing":
+        conds.append(_UC.id.is_(None))
+    if rookies is not None:
+        conds.append(func.coalesce(models.SetEntry.rookie, False).is_(rookies))
+    return conds
+
+
+def _set_checklist(db: Session, set_id: int, user_id: int, *columns):
+    """set_entries of one set LEFT JOINed to the user's user_set_cards."""
+    if not db.query(models.SetList.id).filter(models.SetList.id == set_id).first():
+        raise HTTPException(status_code=404, detail="Set not found")
+    return (
+        db.query(*columns)
+        .select_from(models.SetEntry)
+        .outerjoin(_UC, and_(_UC.set_entry_id == models.SetEntry.id, _UC.user_id == user_id))
         .filter(models.SetEntry.set_id == set_id)
-        .order_by(
-            cast(func.regexp_replace(models.SetEntry.card_number, r"[^0-9]", "", "g"), Integer),
-            models.SetEntry.card_number,
-        )
-        .all()
     )
 
-    # Build lookup of user's set cards for this set
-    entry_ids = [e.id for e in entries]
-    user_cards = {}
-    if entry_ids:
-        rows = (
-            db.query(models.UserSetCard)
-            .filter(
-                models.UserSetCard.user_id == current.id,
-                models.UserSetCard.set_entry_id.in_(entry_ids),
-            )
-            .all()
-        )
-        user_cards = {uc.set_entry_id: uc for uc in rows}
-
-    result = []
-    for e in entries:
-        uc = user_cards.get(e.id)
-        result.append(schemas.SetEntryOut(
-            id=e.id,
-            set_id=e.set_id,
-            card_number=e.card_number,
-            first_name=e.first_name,
-            last_name=e.last_name,
-            rookie=bool(e.rookie),
-            user_set_card_id=uc.id if uc else None,
-            in_build=uc is not None,
-            grade=uc.grade if uc else None,
-            book_high=uc.book_high if uc else None,
-            book_high_mid=uc.book_high_mid if uc else None,
-            book_mid=uc.book_mid if uc else None,
-            book_low_mid=uc.book_low_mid if uc else None,
-            book_low=uc.book_low if uc else None,
-            value=uc.value if uc else None,
-            notes=uc.notes if uc else None,
-            book_values_updated_at=uc.book_values_updated_at if uc else None,
-        ))
-    return result
+
+def _checklist_order(q):
+    return q.order_by(models.SetEntry.sort_key.asc().nullslast(), models.SetEntry.card_number)
+
+
+@router.get("/{set_id}/entries", response_model=list[schemas.SetEntryOut])
+def list_set_entries(
+    set_id: int,
+    status: Optional[Literal["owned", "missing"]] = None,
+    rookies: Optional[bool] = None,
+    db: Session = Depends(get_db),
+    current: User = Depends(get_current_user),
+):
+    """Whole checklist in card-number order; ?status=owned|missing and ?rookies= filter it."""
+    q = _set_checklist(db, set_id, current.id, *_ENTRY_COLUMNS).filter(*_entry_filters(status, rookies))
+    return [schemas.SetEntryOut(**row._mapping) for row in _checklist_order(q)]
+
+
+@router.get("/{set_id}/entries/page", response_model=schemas.SetEntryPage)
+def page_set_entries(
+    set_id: int,
+    status: Optional[Literal["owned", "missing"]] = None,
+    rookies: Optional[bool] = None,
+    offset: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=1000),
+    db: Session = Depends(get_db),
+    current: User = Depends(get_current_user),
+):
+    """One page of the checklist plus filtered / whole-set / in-build counts."""
+    conds = _entry_filters(status, rookies)
+    matching = and_(*conds) if conds else true()
+    total, entry_count, in_build_count = _set_checklist(
+        db, set_id, current.id,
+        func.count().filter(matching),
+        func.count(),
+        func.count(_UC.id),
+    ).one()
+
+    q = _set_checklist(db, set_id, current.id, *_ENTRY_COLUMNS).filter(*conds)
+    rows = _checklist_order(q).offset(offset).limit(limit)
+    return schemas.SetEntryPage(
+        items=[schemas.SetEntryOut(**row._mapping) for row in rows],
+        total=total, offset=offset, limit=limit,
+        entry_count=entry_count, in_build_count=in_build_count,
+    )
 
 
 # ---------------------------------------------------------------------------
@@ -207,11 +259,7 @@ def update_user_set_card(
         uc.book_values_updated_at = datetime.now(timezone.utc)
 
     # Recalculate value using same service as cards
-    settings = (
-        db.query(models.GlobalSettings)
-        .filter(models.GlobalSettings.user_id == current.id)
-        .first()
-    )
+    settings = current.settings
     if settings and uc.grade is not None:
         from ..services.card_value import calculate_market_factor, pick_avg_book, calculate_card_value
 
@@ -303,9 +351,8 @@ async def validate_set_csv(
     content = (await file.read()).decode("utf-8", errors="ignore")
     reader = csv.DictReader(io.StringIO(content))
 
-    expected = {"SetName", "Brand", "Year", "CardNumber", "First", "Last", "Rookie"}
-    if not reader.fieldnames or not expected.issubset(set(reader.fieldnames)):
-        missing = expected.difference(set(reader.fieldnames or []))
+    missing = missing_set_headers(reader.fieldnames)
+    if missing:
         return {"valid": False, "row_count": 0, "set_count": 0,
                 "errors": [f"Missing required columns: {', '.join(sorted(missing))}"],
                 "warnings": []}
@@ -349,86 +396,34 @@ async def import_set_csv(
     db: Session = Depends(get_db),
     current: User = Depends(get_current_user),
 ):
+    """Stage and upsert the checklist in a few set-based statements (services/set_import.py)."""
     if not file.filename.lower().endswith(".csv"):
         raise HTTPException(status_code=400, detail="Please upload a .csv file")
 
     content = (await file.read()).decode("utf-8", errors="ignore")
     reader = csv.DictReader(io.StringIO(content))
 
-    expected = {"SetName", "Brand", "Year", "CardNumber", "First", "Last", "Rookie"}
-    if not reader.fieldnames or not expected.issubset(set(reader.fieldnames)):
-        missing = expected.difference(set(reader.fieldnames or []))
+    missing = missing_set_headers(reader.fieldnames)
+    if missing:
         raise HTTPException(
             status_code=400,
             detail=f"CSV is missing required headers: {', '.join(sorted(missing))}"
         )
 
-    # Group rows by (set_name, brand, year)
-    from collections import defaultdict
-    set_rows = defaultdict(list)
-    rownum = 0
-    for row in reader:
-        rownum += 1
-        try:
-            set_name = (row["SetName"] or "").strip()
-            brand    = (row["Brand"] or "").strip()
-            year     = int((row["Year"] or "").strip())
-            card_num = (row["CardNumber"] or "").strip()
-            first    = (row["First"] or "").strip()
-            last     = (row["Last"] or "").strip()
-            rookie   = (row["Rookie"] or "").strip() in ("1", "true", "True", "yes")
-            set_rows[(set_name, brand, year)].append((card_num, first, last, rookie))
-        except Exception as e:
-            raise HTTPException(status_code=400, detail=f"Row {rownum} invalid: {e}")
-
-    sets_created = 0
-    sets_updated = 0
-    entries_added = 0
-    entries_skipped = 0
-
-    for (set_name, brand, year), cards in set_rows.items():
-        # Upsert the set record
-        s = db.query(models.SetList).filter(
-            func.lower(models.SetList.name) == set_name.lower(),
-            func.lower(models.SetList.brand) == brand.lower(),
-            models.SetList.year == year,
-        ).first()
-        if not s:
-            s = models.SetList(name=set_name, brand=brand, year=year)
-            db.add(s)
-            db.flush()  # get id
-            sets_created += 1
-        else:
-            sets_updated += 1
-
-        # Build existing card_number set for this set_id
-        existing_nums = {
-            r[0] for r in db.query(models.SetEntry.card_number)
-            .filter(models.SetEntry.set_id == s.id).all()
-        }
-
-        new_entries = []
-        for (card_num, first, last, rookie) in cards:
-            if card_num in existing_nums:
-                entries_skipped += 1
-                continue
-            new_entries.append(models.SetEntry(
-                set_id=s.id, card_number=card_num,
-                first_name=first or None, last_name=last or None, rookie=rookie,
-            ))
-            existing_nums.add(card_num)
-
-        if new_entries:
-            db.add_all(new_entries)
-            entries_added += len(new_entries)
+    try:
+        rows = list(parse_set_rows(reader))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
+    cursor = db.connection().connection.cursor()
+    try:
+        counts = import_set_rows(cursor, rows)
+    finally:
+        cursor.close()
     db.commit()
 
-    msg = f"Import complete: {sets_created} new set(s), {sets_updated} existing. {entries_added} entries added, {entries_skipped} skipped."
-    return {
-        "sets_created": sets_created,
-        "sets_updated": sets_updated,
-        "entries_added": entries_added,
-        "entries_skipped": entries_skipped,
-        "message": msg,
-    }
+    msg = (
+        f"Import complete: {counts['sets_created']} new set(s), {counts['sets_updated']} existing. "
+        f"{counts['entries_added']} entries added, {counts['entries_skipped']} skipped."
+    )
+    return {**counts, "message": msg}
@@ -4,12 +4,14 @@ backend/app/schemas.py
 Pydantic schemas for request validation and response serialization.
 
 Schema hierarchy:
-  CardBase / CardCreate / CardUpdate / Card (response)
+  CardBase / CardCreate / CardUpdate / Card (response, + thumbnail URLs) / CardPage (keyset page)
   GlobalSettingsBase / GlobalSettingsCreate / GlobalSettingsUpdate / GlobalSettings (response)
   UserBase / UserCreate / UserRead
-  SetListOut / SetEntryOut / UserSetCardCreate / UserSetCardUpdate
+  SetListOut / SetEntryOut / SetEntryPage / UserSetCardCreate / UserSetCardUpdate
+  SetProgressOut / SetMissingCard / SetProgressDetail
   BoxBinderBase / BoxBinderCreate / BoxBinderUpdate / BoxBinderOut
   DictionaryEntryBase / DictionaryEntryCreate / DictionaryEntryRead
+  JobOut
 
 VALID_GRADES — the set of accepted numeric grade values: {3.0, 1.5, 1.0, 0.8, 0.4, 0.2}
   Maps to: MT (3.0), EX (1.5), VG (1.0), GD (0.8), FR (0.4), PR (0.2)
@@ -20,10 +22,12 @@ Notable validators:
 - GlobalSettingsBase.coerce_null_bool — converts DB NULL booleans to False
 - BoxBinderOut.coerce_null_quantity — converts NULL quantity to 1 (DB nullable gotcha)
 """
-from pydantic import BaseModel, EmailStr, field_validator
+from pydantic import BaseModel, EmailStr, Field, computed_field, field_validator
 from typing import List, Optional
 from datetime import datetime
 
+from app.services.thumbnails import thumbnail_urls
+
 VALID_GRADES = {3.0, 1.5, 1.0, 0.8, 0.4, 0.2}
 
 class CardBase(BaseModel):
@@ -97,9 +101,30 @@ class Card(CardBase):
     user_id: int   # ✅ include owner
     updated_at: Optional[datetime] = None
 
+    front_thumb_key: Optional[str] = Field(None, exclude=True)
+    back_thumb_key: Optional[str] = Field(None, exclude=True)
+
+    @computed_field
+    @property
+    def front_thumbs(self) -> Optional[dict]:
+        """{"sm"|"md": {"webp": url, "jpeg": url}} — None until generated."""
+        return thumbnail_urls(self.front_thumb_key)
+
+    @computed_field
+    @property
+    def back_thumbs(self) -> Optional[dict]:
+        return thumbnail_urls(self.back_thumb_key)
+
     class Config:
         from_attributes = True
 
+class CardPage(BaseModel):
+    """One keyset page from GET /cards/page. Pass next_cursor back as ?cursor= for the next page."""
+    items: List[Card]
+    next_cursor: Optional[str] = None
+    total: int
+    sort: List[dict]
+
 class GlobalSettingsBase(BaseModel):
     app_name: Optional[str] = "CardStoard"
     card_makes: Optional[List[str]] = ["Bowman","Donruss","Fleer","Score","Topps","Upper Deck"]
@@ -233,6 +258,15 @@ class SetEntryOut(BaseModel):
     class Config:
         from_attributes = True
 
+class SetEntryPage(BaseModel):
+    """One page of GET /sets/{id}/entries/page. total counts entries matching the filters."""
+    items: List[SetEntryOut]
+    total: int
+    offset: int
+    limit: int
+    entry_count: int
+    in_build_count: int
+
 class SetListOut(BaseModel):
     id: int
     name: str
@@ -245,6 +279,30 @@ class SetListOut(BaseModel):
     class Config:
         from_attributes = True
 
+class SetProgressOut(BaseModel):
+    """Completion analytics for one set (GET /sets/progress). Prices are dictionary book-value estimates."""
+    id: int
+    name: str
+    brand: str
+    year: int
+    entry_count: int
+    owned_count: int
+    completion_pct: float
+    owned_value: float
+    cost_to_complete: float
+    unpriced_missing: int
+
+class SetMissingCard(BaseModel):
+    id: int
+    card_number: str
+    first_name: Optional[str]
+    last_name: Optional[str]
+    rookie: bool
+    est_price: Optional[float] = None
+
+class SetProgressDetail(SetProgressOut):
+    missing: List[SetMissingCard]
+
 class UserSetCardCreate(BaseModel):
     set_entry_id: int
 
@@ -416,4 +474,23 @@ class WaxPackOut(WaxPackBase):
     updated_at: Optional[datetime] = None
 
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+# ---------------------------------------------------------------------------
+# Background jobs
+# ---------------------------------------------------------------------------
+class JobOut(BaseModel):
+    id: int
+    kind: str
+    status: str
+    progress: int = 0
+    message: Optional[str] = None
+    result: Optional[dict] = None
+    error: Optional[str] = None
+    cancel_requested: bool = False
+    created_at: Optional[datetime] = None
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
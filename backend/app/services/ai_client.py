@@ -0,0 +1,93 @@
+# backend/app/services/ai_client.py
+"""
+Shared async Anthropic client for Cy chat and card image identification.
+
+One anthropic.AsyncAnthropic per process replaces a new synchronous client per
+request, so HTTPS connections to the API are pooled and reused, and waiting on
+the model no longer ties up a threadpool worker.
+
+Limits:
+  - AI_MAX_CONCURRENCY     requests in flight to the API per process; further
+                           calls queue for up to AI_QUEUE_TIMEOUT_SECONDS, then
+                           fail with 503 + Retry-After
+  - AI_USER_REQUESTS_PER_MINUTE / AI_USER_BURST
+                           per-user token bucket, charged once per chat turn or
+                           identification (not per tool round); 429 + Retry-After
+
+The SDK honours ANTHROPIC_BASE_URL, so the whole path can be exercised against
+a local fake server (utils/fake_anthropic.py).
+"""
+
+import asyncio
+import os
+from contextlib import asynccontextmanager
+
+import anthropic
+from fastapi import HTTPException
+
+from .rate_limit import TokenBuckets, enforce
+
+AI_MAX_CONCURRENCY = int(os.getenv("AI_MAX_CONCURRENCY", "8"))
+AI_QUEUE_TIMEOUT_SECONDS = float(os.getenv("AI_QUEUE_TIMEOUT_SECONDS", "30"))
+AI_USER_REQUESTS_PER_MINUTE = float(os.getenv("AI_USER_REQUESTS_PER_MINUTE", "20"))
+AI_USER_BURST = float(os.getenv("AI_USER_BURST", "5"))
+AI_REQUEST_TIMEOUT_SECONDS = float(os.getenv("AI_REQUEST_TIMEOUT_SECONDS", "120"))
+
+_client = None
+_slots = asyncio.Semaphore(AI_MAX_CONCURRENCY)
+_user_buckets = TokenBuckets(AI_USER_BURST, AI_USER_REQUESTS_PER_MINUTE / 60)
+
+
+def get_client() -> anthropic.AsyncAnthropic:
+    """The process-wide client. 500 if ANTHROPIC_API_KEY is not set."""
+    global _client
+    if _client is None:
+        api_key = os.getenv("ANTHROPIC_API_KEY")
+        if not api_key:
+            raise HTTPException(status_code=500, detail="Anthropic API key not configured")
+        _client = anthropic.AsyncAnthropic(api_key=api_key, timeout=AI_REQUEST_TIMEOUT_SECONDS)
+    return _client
+
+
+async def close_client() -> None:
+    global _client
+    if _client is not None:
+        await _client.close()
+        _client = None
+
+
+def check_ai_rate_limit(user_id: int) -> None:
+    """Charge one AI request to user_id, or raise 429."""
+    enforce(_user_buckets, user_id, "Too many AI requests — please wait a moment and try again")
+
+
+@asynccontextmanager
+async def _slot():
+    try:
+        await asyncio.wait_for(_slots.acquire(), AI_QUEUE_TIMEOUT_SECONDS)
+    except asyncio.TimeoutError:
+        raise HTTPException(
+            status_code=503,
+            detail="The AI assistant is busy — please try again shortly",
+            headers={"Retry-After": "5"},
+        )
+    try:
+        yield
+    finally:
+        _slots.release()
+
+
+async def create_message(**kwargs):
+    """messages.create() under the concurrency limit."""
+    client = get_client()
+    async with _slot():
+        return await client.messages.create(**kwargs)
+
+
+@asynccontextmanager
+async def stream_message(**kwargs):
+    """messages.stream() under the concurrency limit; yields the MessageStream."""
+    client = get_client()
+    async with _slot():
+        async with client.messages.stream(**kwargs) as stream:
+            yield stream
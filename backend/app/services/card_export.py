@@ -0,0 +1,166 @@
+# backend/app/services/card_export.py
+"""
+Streaming generators for GET /cards/export and GET /cards/backup.
+
+Cards are read through a server-side cursor (stream_results + yield_per) as
+plain column rows, and the response body is emitted in chunks of
+EXPORT_CHUNK_ROWS as soon as they are fetched, so memory stays flat and the
+first byte goes out immediately however large the collection is.
+
+Each generator opens its own session: the body is produced after the endpoint
+has returned, when the request's get_db() session may already be closed.
+Output is byte-for-byte what the old build-then-send endpoints produced
+(json.dumps(..., indent=2) layout included). With gzip=True the chunks are
+compressed on the fly and the endpoint sends Content-Encoding: gzip.
+"""
+
+import csv
+import io
+import json
+import zlib
+
+from sqlalchemy import select
+
+from ..database import SessionLocal
+from ..models import Card
+
+EXPORT_CHUNK_ROWS = 500
+
+_CARD_COLUMNS = (
+    Card.first_name, Card.last_name, Card.year, Card.brand, Card.rookie, Card.card_number,
+    Card.book_high, Card.book_high_mid, Card.book_mid, Card.book_low_mid, Card.book_low,
+    Card.grade, Card.value,
+)
+
+CSV_HEADER = [
+    "First", "Last", "Year", "Brand", "Rookie", "Card Number",
+    "BookHi", "BookHiMid", "BookMid", "BookLowMid", "BookLow", "Grade", "Value",
+]
+
+
+def _val(v):
+    return "" if v is None else v
+
+
+def _card_rows(user_id: int):
+    """Yield lists of up to EXPORT_CHUNK_ROWS card rows through a server-side cursor."""
+    stmt = (
+        select(*_CARD_COLUMNS)
+        .where(Card.user_id == user_id)
+        .order_by(Card.id)
+        .execution_options(stream_results=True, yield_per=EXPORT_CHUNK_ROWS)
+    )
+    with SessionLocal() as db:
+        for chunk in db.execute(stmt).partitions():
+            yield chunk
+
+
+def _indent(text: str, prefix: str) -> str:
+    return "\n".join(prefix + line for line in text.split("\n"))
+
+
+def _json_array(items, prefix: str):
+    """Yield the text of json.dumps(list(items), indent=2), nested at prefix."""
+    first = True
+    for chunk in items:
+        parts = [_indent(json.dumps(item, indent=2, default=str), prefix + "  ") for item in chunk]
+        if not parts:
+            continue
+        yield ("[\n" if first else ",\n") + ",\n".join(parts)
+        first = False
+    yield "[]" if first else "\n" + prefix + "]"
+
+
+def _encode(pieces, gzip: bool):
+    """UTF-8 encode text pieces, optionally gzip-compressing them as they stream."""
+    if not gzip:
+        for piece in pieces:
+            yield piece.encode()
+        return
+    z = zlib.compressobj(wbits=31)   # 31 → gzip container
+    for piece in pieces:
+        out = z.compress(piece.encode())
+        if out:
+            yield out
+    yield z.flush()
+
+
+def stream_cards_delimited(user_id: int, delimiter: str, gzip: bool = False):
+    """CSV/TSV export body."""
+    def pieces():
+        buf = io.StringIO()
+        writer = csv.writer(buf, delimiter=delimiter)
+        writer.writerow(CSV_HEADER)
+        for chunk in _card_rows(user_id):
+            for (first, last, year, brand, rookie, number,
+                 bh, bhm, bm, blm, bl, grade, value) in chunk:
+                writer.writerow([
+                    first, last, _val(year), _val(brand),
+                    1 if rookie else 0, _val(number),
+                    _val(bh), _val(bhm), _val(bm), _val(blm), _val(bl), _val(grade), _val(value),
+                ])
+            yield buf.getvalue()
+            buf.seek(0)
+            buf.truncate()
+        if buf.tell():
+            yield buf.getvalue()
+    return _encode(pieces(), gzip)
+
+
+def stream_cards_json(user_id: int, gzip: bool = False):
+    """JSON export body: an array of card objects."""
+    def items():
+        for chunk in _card_rows(user_id):
+            yield [
+                {
+                    "first_name": first,
+                    "last_name": last,
+                    "year": year,
+                    "brand": brand,
+                    "rookie": 1 if rookie else 0,
+                    "card_number": _val(number),
+                    "book_high": bh,
+                    "book_high_mid": bhm,
+                    "book_mid": bm,
+                    "book_low_mid": blm,
+                    "book_low": bl,
+                    "grade": grade,
+                    "value": value,
+                }
+                for (first, last, year, brand, rookie, number,
+                     bh, bhm, bm, blm, bl, grade, value) in chunk
+            ]
+    return _encode(_json_array(items(), ""), gzip)
+
+
+def stream_backup(user_id: int, username: str, settings_dict: dict, gzip: bool = False):
+    """Backup body: {"version", "user", "cards": [...], "settings"}."""
+    def items():
+        for chunk in _card_rows(user_id):
+            yield [
+                {
+                    "first_name": first,
+                    "last_name": last,
+                    "year": year,
+                    "brand": brand,
+                    "card_number": number,
+                    "rookie": bool(rookie),
+                    "grade": grade,
+                    "book_high": bh,
+                    "book_high_mid": bhm,
+                    "book_mid": bm,
+                    "book_low_mid": blm,
+                    "book_low": bl,
+                    "value": value,
+                }
+                for (first, last, year, brand, rookie, number,
+                     bh, bhm, bm, blm, bl, grade, value) in chunk
+            ]
+
+    def pieces():
+        yield "{\n"
+        yield f'  "version": 1,\n  "user": {json.dumps(username)},\n  "cards": '
+        yield from _json_array(items(), "  ")
+        settings = _indent(json.dumps(settings_dict, indent=2, default=str), "  ").lstrip()
+        yield f',\n  "settings": {settings}\n}}'
+    return _encode(pieces(), gzip)
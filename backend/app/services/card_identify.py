@@ -0,0 +1,397 @@
+# backend/app/services/card_identify.py
+"""
+Card identification from photos with Claude Vision.
+
+Used by:
+  POST /cards/identify-image    one photo, JSON response
+  POST /cards/identify-images   a stack of photos (multipart list and/or ZIP),
+                                NDJSON response streamed as each photo resolves
+
+Per photo: fingerprint → identify cache (services/identify_cache.py) → on a
+miss, resize/encode and call the vision model → dictionary and collection
+matches.
+
+Batch pipeline (identify_batch):
+  - fingerprinting and resize/encode run in a small process pool
+    (IDENTIFY_PREP_WORKERS), off the event loop and outside the GIL
+  - vision calls fan out at most IDENTIFY_BATCH_CONCURRENCY at a time per batch,
+    and the shared client's global limit (services/ai_client.py) still applies
+  - every cache miss is charged to the per-user AI rate limit before its vision
+    call, as on the single-photo endpoint; photos over the limit fail with 429's
+    message instead of calling the model
+  - photos are emitted in completion order; each group that completes together
+    has its collection matches resolved with one query (cache hits usually
+    finish together, so a fully cached batch costs one query). Dictionary
+    matches come from the in-process index and cost no queries.
+"""
+
+import asyncio
+import io
+import json
+import multiprocessing
+import os
+import re
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from types import SimpleNamespace
+from typing import Optional
+
+from fastapi import HTTPException
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import func, tuple_
+from sqlalchemy.orm import Session
+
+from ..database import SessionLocal
+from ..models import Card
+from .ai_client import check_ai_rate_limit, create_message
+from .dictionary_index import dictionary_index
+from .identify_cache import lookup_identification, store_identification
+from .image_prep import encode_image, image_fingerprint
+
+IDENTIFY_MODEL = "claude-sonnet-4-6"
+
+VALID_MEDIA_TYPES = {"image/jpeg", "image/png", "image/jpg"}
+MAX_IMAGE_BYTES = 5 * 1024 * 1024  # 5MB
+
+IDENTIFY_BATCH_MAX_IMAGES = int(os.getenv("IDENTIFY_BATCH_MAX_IMAGES", "40"))
+IDENTIFY_BATCH_CONCURRENCY = int(os.getenv("IDENTIFY_BATCH_CONCURRENCY", "4"))
+IDENTIFY_PREP_WORKERS = int(os.getenv("IDENTIFY_PREP_WORKERS", "2"))
+
+COLLECTION_MATCH_LIMIT = 10
+
+# ---- AI prompts ----
+IDENTIFY_PROMPT = """\
+You are reading a sports trading card. Extract exactly what is printed on the card.
+
+Return ONLY this JSON (no other text):
+{
+  "first_name": "<player first name as printed, or null>",
+  "last_name": "<player last name as printed, or null>",
+  "year": <4-digit year from copyright line or set name, or null>,
+  "brand": "<manufacturer: Topps/Bowman/Fleer/Donruss/Upper Deck/Score/Panini/Leaf/Goudey, or null>",
+  "card_number": "<number as printed (digits only, no #), or null>",
+  "confidence": <0.0-1.0, your confidence in the extraction>
+}"""
+
+GRADE_EXTENSION = """\
+
+
+Also assess the card's physical condition. Add these fields to your JSON response:
+  "grade": <one of: 3.0=Mint, 1.5=Excellent, 1.0=VeryGood, 0.8=Good, 0.4=Fair, 0.2=Poor>,
+  "grade_label": "<MT|EX|VG|GD|FR|PR>",
+  "condition_notes": "<1-2 sentence description of visible condition issues>"
+
+Return ONLY the complete JSON object with all fields including the ones above."""
+
+
+def media_type_for(content_type: Optional[str], filename: Optional[str]) -> Optional[str]:
+    """image/png or image/jpeg for a supported upload, else None."""
+    ct = (content_type or "").lower()
+    fname = (filename or "").lower()
+    if ct not in VALID_MEDIA_TYPES and not fname.endswith((".jpg", ".jpeg", ".png")):
+        return None
+    return "image/png" if (ct == "image/png" or fname.endswith(".png")) else "image/jpeg"
+
+
+# ---------------------------------------------------------------------------
+# Vision call
+# ---------------------------------------------------------------------------
+def parse_identification(raw: str, include_grade: bool) -> dict:
+    """Model reply → {"fields", "confidence", "grade_estimate"}. Raises ValueError."""
+    raw = raw.strip()
+    # 1. Strip markdown code fences
+    if "```" in raw:
+        fence_match = re.search(r"```(?:json)?\s*(\{.*?\})\s*```", raw, re.DOTALL)
+        if fence_match:
+            raw = fence_match.group(1)
+    # 2. If still not a JSON object, grab the first {...} block
+    if not raw.startswith("{"):
+        obj_match = re.search(r"\{.*\}", raw, re.DOTALL)
+        raw = obj_match.group(0) if obj_match else raw
+    parsed = json.loads(raw.strip())
+
+    fields = {
+        "first_name": parsed.get("first_name"),
+        "last_name": parsed.get("last_name"),
+        "year": parsed.get("year"),
+        "brand": parsed.get("brand"),
+        "card_number": parsed.get("card_number"),
+    }
+    grade_estimate = None
+    if include_grade and "grade" in parsed:
+        grade_estimate = {
+            "grade": parsed.get("grade"),
+            "grade_label": parsed.get("grade_label"),
+            "condition_notes": parsed.get("condition_notes"),
+        }
+    return {
+        "fields": fields,
+        "confidence": float(parsed.get("confidence") or 0.0),
+        "grade_estimate": grade_estimate,
+    }
+
+
+async def vision_identify(img_b64: str, media_type: str, include_grade: bool) -> dict:
+    """Send one encoded image to Claude Vision. 502 if the call fails, 500 on an unparseable reply."""
+    prompt_text = IDENTIFY_PROMPT + (GRADE_EXTENSION if include_grade else "")
+    try:
+        response = await create_message(
+            model=IDENTIFY_MODEL,
+            max_tokens=512,
+            messages=[{
+                "role": "user",
+                "content": [
+                    {"type": "image", "source": {"type": "base64", "media_type": media_type, "data": img_b64}},
+                    {"type": "text", "text": prompt_text},
+                ],
+            }],
+        )
+    except HTTPException:
+        raise
+    except Exception as exc:
+        raise HTTPException(status_code=502, detail=f"AI request failed: {exc}")
+    try:
+        return parse_identification(response.content[0].text, include_grade)
+    except ValueError:
+        raise HTTPException(status_code=500, detail="AI returned unexpected format")
+
+
+# ---------------------------------------------------------------------------
+# Matches
+# ---------------------------------------------------------------------------
+def _name_key(fields: dict) -> tuple:
+    return ((fields.get("first_name") or "").strip().lower(), (fields.get("last_name") or "").strip().lower())
+
+
+def dictionary_match(db: Session, fields: dict) -> Optional[dict]:
+    """Book values from the dictionary. Back-fills fields["card_number"] when the model missed it."""
+    fn, ln = _name_key(fields)
+    if not (fn and ln):
+        return None
+    entry = dictionary_index.find(
+        db, fn, ln, fields["brand"], fields["year"] or None, fields["card_number"],
+    )
+    # If matched entry has no book values, fall back to card_number+year+brand
+    # to find a valued entry (handles duplicate entries with different name spellings)
+    if entry and not any([entry.book_high, entry.book_mid, entry.book_low]):
+        cn = fields.get("card_number") or entry.card_number
+        if cn and fields.get("year") and fields.get("brand"):
+            valued = dictionary_index.find_valued(db, fields["brand"], fields["year"], str(cn))
+            if valued:
+                entry = valued
+    if not entry:
+        return None
+    # Back-fill card_number if Claude didn't extract it
+    if not fields["card_number"] and entry.card_number:
+        fields["card_number"] = entry.card_number
+    return {
+        "found": True,
+        "book_high": entry.book_high,
+        "book_high_mid": entry.book_high_mid,
+        "book_mid": entry.book_mid,
+        "book_low_mid": entry.book_low_mid,
+        "book_low": entry.book_low,
+        "rookie": (entry.rookie_year is not None and fields.get("year") == entry.rookie_year),
+    }
+
+
+def collection_matches(db: Session, user_id: int, fields_list: list[dict]) -> list[dict]:
+    """
+    The user's cards matching each identification (same name, and brand/year
+    when identified), up to COLLECTION_MATCH_LIMIT each — one query for the list.
+    """
+    names = {_name_key(f) for f in fields_list}
+    names = [n for n in names if n[0] and n[1]]
+    by_name: dict = {}
+    if names:
+        rows = (
+            db.query(Card.id, Card.first_name, Card.last_name, Card.year, Card.brand,
+                     Card.card_number, Card.grade, Card.value)
+            .filter(
+                Card.user_id == user_id,
+                tuple_(func.lower(Card.first_name), func.lower(Card.last_name)).in_(names),
+            )
+            .order_by(Card.id)
+            .all()
+        )
+        for r in rows:
+            by_name.setdefault(((r.first_name or "").lower(), (r.last_name or "").lower()), []).append(r)
+
+    out = []
+    for fields in fields_list:
+        brand = (fields.get("brand") or "").lower()
+        year = fields.get("year")
+        matches = [
+            c for c in by_name.get(_name_key(fields), [])
+            if (not brand or (c.brand or "").lower() == brand) and (not year or c.year == year)
+        ][:COLLECTION_MATCH_LIMIT]
+        out.append({
+            "found": bool(matches),
+            "cards": [
+                {"id": c.id, "year": c.year, "brand": c.brand, "card_number": c.card_number, "grade": c.grade, "value": c.value}
+                for c in matches
+            ],
+            "duplicate_count": len(matches),
+        })
+    return out
+
+
+def identification_response(ai: dict, dictionary: Optional[dict], collection: dict, cached: bool) -> dict:
+    return {
+        "fields": ai["fields"],
+        "confidence": ai["confidence"],
+        "grade_estimate": ai["grade_estimate"],
+        "dictionary_match": dictionary,
+        "collection_match": collection,
+        "cached": cached,
+    }
+
+
+# ---------------------------------------------------------------------------
+# Batch
+# ---------------------------------------------------------------------------
+_pool = None
+
+
+def _prep_pool() -> ProcessPoolExecutor:
+    # spawn: workers import only image_prep, not a copy of the running server
+    global _pool
+    if _pool is None:
+        _pool = ProcessPoolExecutor(
+            max_workers=IDENTIFY_PREP_WORKERS,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+    return _pool
+
+
+async def _in_pool(fn, *args):
+    return await asyncio.get_running_loop().run_in_executor(_prep_pool(), fn, *args)
+
+
+def shutdown_prep_pool() -> None:
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(cancel_futures=True)
+        _pool = None
+
+
+def expand_uploads(uploads: list[tuple]) -> list[SimpleNamespace]:
+    """
+    (filename, content_type, bytes) uploads → images to identify, expanding
+    ZIP archives. Each image has filename, media_type, content and error
+    (a per-image problem reported in its result line). 400 if there are
+    more than IDENTIFY_BATCH_MAX_IMAGES images or a ZIP is unreadable.
+    """
+    images = []
+
+    def _add(filename, content_type, size, read):
+        if len(images) >= IDENTIFY_BATCH_MAX_IMAGES:
+            raise HTTPException(status_code=400, detail=f"At most {IDENTIFY_BATCH_MAX_IMAGES} images per batch")
+        media_type = media_type_for(content_type, filename)
+        error = None
+        if media_type is None:
+            error = "Only JPEG and PNG images are supported"
+        elif size > MAX_IMAGE_BYTES:
+            error = "Image exceeds 5MB limit"
+        images.append(SimpleNamespace(
+            filename=filename, media_type=media_type, error=error,
+            content=read() if error is None else None,
+        ))
+
+    for filename, content_type, data in uploads:
+        if (filename or "").lower().endswith(".zip") or content_type in ("application/zip", "application/x-zip-compressed"):
+            try:
+                zf = zipfile.ZipFile(io.BytesIO(data))
+            except zipfile.BadZipFile:
+                raise HTTPException(status_code=400, detail=f"{filename} is not a valid ZIP file")
+            for info in zf.infolist():
+                base = os.path.basename(info.filename)
+                if info.is_dir() or info.filename.startswith("__MACOSX/") or base.startswith("."):
+                    continue
+                _add(base, None, info.file_size, lambda info=info: zf.read(info))
+        else:
+            _add(filename, content_type, len(data), lambda data=data: data)
+
+    if not images:
+        raise HTTPException(status_code=400, detail="No images uploaded")
+    return images
+
+
+async def identify_batch(user_id: int, images: list, include_grade: bool):
+    """
+    Async generator of one result dict per image, in completion order:
+      {"index", "filename", "status": "ok", <identification_response fields>}
+      {"index", "filename", "status": "error", "detail"}
+    followed by {"status": "done", "total", "identified", "cached", "failed"}.
+    """
+    db = SessionLocal()
+    db_lock = asyncio.Lock()          # one Session, used from the threadpool one call at a time
+    vision_slots = asyncio.Semaphore(IDENTIFY_BATCH_CONCURRENCY)
+
+    async def _db(fn, *args):
+        async with db_lock:
+            return await run_in_threadpool(fn, db, *args)
+
+    async def _one(index: int, img) -> SimpleNamespace:
+        r = SimpleNamespace(index=index, filename=img.filename, ai=None, cached=False, error=img.error)
+        if r.error:
+            return r
+        try:
+            sha256, phash = await _in_pool(image_fingerprint, img.content)
+        except Exception as exc:
+            r.error = f"Could not process image: {exc}"
+            return r
+        r.ai = await _db(lookup_identification, user_id, sha256, phash, include_grade)
+        r.cached = r.ai is not None
+        if r.ai is None:
+            # Each cache miss is one vision call, charged like /identify-image
+            try:
+                check_ai_rate_limit(user_id)
+            except HTTPException as exc:
+                r.error = exc.detail
+                return r
+            async with vision_slots:
+                try:
+                    img_b64, media_type = await _in_pool(encode_image, img.content, img.media_type)
+                    r.ai = await vision_identify(img_b64, media_type, include_grade)
+                except HTTPException as exc:
+                    r.error = exc.detail
+                    return r
+                except Exception as exc:
+                    r.error = f"Could not process image: {exc}"
+                    return r
+            await _db(store_identification, user_id, sha256, phash, r.ai)
+        return r
+
+    def _matches(db: Session, results: list) -> list:
+        dictionary = [dictionary_match(db, r.ai["fields"]) for r in results]
+        collection = collection_matches(db, user_id, [r.ai["fields"] for r in results])
+        return list(zip(dictionary, collection))
+
+    pending = {asyncio.ensure_future(_one(i, img)) for i, img in enumerate(images)}
+    counts = {"identified": 0, "cached": 0, "failed": 0}
+    try:
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            results = sorted((t.result() for t in done), key=lambda r: r.index)
+            ok = [r for r in results if r.ai is not None]
+            matches = dict(zip((r.index for r in ok), await _db(_matches, ok))) if ok else {}
+            for r in results:
+                if r.ai is None:
+                    counts["failed"] += 1
+                    yield {"index": r.index, "filename": r.filename, "status": "error", "detail": r.error}
+                    continue
+                counts["identified"] += 1
+                counts["cached"] += r.cached
+                dictionary, collection = matches[r.index]
+                yield {
+                    "index": r.index, "filename": r.filename, "status": "ok",
+                    **identification_response(r.ai, dictionary, collection, r.cached),
+                }
+        yield {"status": "done", "total": len(images), **counts}
+    finally:
+        # Client went away: stop outstanding work before releasing the session
+        for t in pending:
+            t.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+        db.close()
@@ -0,0 +1,231 @@
+# backend/app/services/card_import.py
+"""
+Streaming card CSV import for POST /cards/import-csv.
+
+Rows are parsed one at a time straight off the uploaded file, valued inline
+with the card_value.py functions, and written in batches of IMPORT_BATCH_ROWS
+with PostgreSQL COPY (psycopg2 copy_expert) into a temp staging table. One
+INSERT ... SELECT then merges the staged rows into cards. Memory is bounded by
+the batch size rather than the file size, and no ORM object is built per row.
+
+The import stays all-or-nothing like the old one: an invalid row raises before
+the merge, and the staging table (ON COMMIT DROP) goes away with the rollback.
+"""
+
+import csv
+import io
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+from fastapi import HTTPException
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from ..models import User
+from ..schemas import VALID_GRADES
+from .card_value import calculate_card_value, calculate_market_factor, pick_avg_book
+
+IMPORT_BATCH_ROWS = 5000
+
+IMPORT_HEADERS = {
+    "First", "Last", "Year", "Brand", "Rookie", "Card Number",
+    "BookHi", "BookHiMid", "BookMid", "BookLowMid", "BookLow", "Grade",
+}
+
+_IMPORT_GRADE_MAP = {0.6: 0.8, 1.0: 1.0}  # normalize legacy grade values
+
+# Staged columns, in COPY order. has_books stands in for book_values_updated_at,
+# which the merge stamps with the import time.
+_STAGE_COLUMNS = (
+    "ord", "first_name", "last_name", "year", "brand", "rookie", "card_number",
+    "book_high", "book_high_mid", "book_mid", "book_low_mid", "book_low",
+    "grade", "value", "has_books",
+)
+
+_NULL = r"\N"
+
+_CREATE_STAGE = text("""
+    CREATE TEMP TABLE card_import_stage (
+        ord           INTEGER,
+        first_name    VARCHAR,
+        last_name     VARCHAR,
+        year          INTEGER,
+        brand         VARCHAR,
+        rookie        BOOLEAN,
+        card_number   VARCHAR,
+        book_high     FLOAT8,
+        book_high_mid FLOAT8,
+        book_mid      FLOAT8,
+        book_low_mid  FLOAT8,
+        book_low      FLOAT8,
+        grade         FLOAT8,
+        value         FLOAT8,
+        has_books     BOOLEAN
+    ) ON COMMIT DROP
+""")
+
+_COPY_STAGE = (
+    f"COPY card_import_stage ({', '.join(_STAGE_COLUMNS)}) "
+    f"FROM STDIN WITH (FORMAT csv, NULL '{_NULL}')"
+)
+
+# card_attributes/created_at/updated_at are ORM-side defaults, so spelled out here
+_MERGE_STAGE = text("""
+    INSERT INTO cards (
+        user_id, first_name, last_name, year, brand, rookie, card_number,
+        book_high, book_high_mid, book_mid, book_low_mid, book_low,
+        grade, value, book_values_updated_at, card_attributes, created_at, updated_at
+    )
+    SELECT
+        :user_id, first_name, last_name, year, brand, rookie, card_number,
+        book_high, book_high_mid, book_mid, book_low_mid, book_low,
+        grade, value, CASE WHEN has_books THEN :now END, '{}'::json, :now, :now
+    FROM card_import_stage
+    ORDER BY ord
+""")
+
+
+def _to_int(v):
+    v = (v or "").strip()
+    return int(v) if v != "" else None
+
+def _to_float(v):
+    v = (v or "").strip()
+    return float(v) if v != "" else None
+
+def _to_rookie(v):
+    v = (v or "").strip().lower()
+    return 1 if v in {"1", "yes", "true", "y", "t", "*"} else 0
+
+
+def _parse_row(row: dict, rownum: int) -> SimpleNamespace:
+    """Parse one CSV row into a card-shaped record. Raises ValueError on invalid data."""
+    grade = _to_float(row["Grade"]) or 1.0
+    grade = _IMPORT_GRADE_MAP.get(grade, grade)
+    if grade not in VALID_GRADES:
+        raise ValueError(
+            f"Row {rownum} ({row['First']} {row['Last']}): invalid grade '{row['Grade']}'"
+            f" — must be one of {sorted(VALID_GRADES)}"
+        )
+    return SimpleNamespace(
+        first_name=(row["First"] or "").strip(),
+        last_name=(row["Last"] or "").strip(),
+        year=_to_int(row["Year"]) or 0,
+        brand=(row["Brand"] or "").strip(),
+        rookie=_to_rookie(row["Rookie"]),
+        card_number=(row["Card Number"] or "").strip(),
+        book_high=_to_float(row["BookHi"]),
+        book_high_mid=_to_float(row["BookHiMid"]),
+        book_mid=_to_float(row["BookMid"]),
+        book_low_mid=_to_float(row["BookLowMid"]),
+        book_low=_to_float(row["BookLow"]),
+        grade=grade,
+        card_attributes=None,
+    )
+
+
+def _stage_record(ord_: int, card: SimpleNamespace, value) -> list:
+    books = [card.book_high, card.book_high_mid, card.book_mid, card.book_low_mid, card.book_low]
+    fields = [
+        ord_, card.first_name, card.last_name, card.year, card.brand,
+        "t" if card.rookie else "f", card.card_number,
+        *books, card.grade, value, "t" if any(books) else "f",
+    ]
+    return [_NULL if f is None else f for f in fields]
+
+
+def _missing_headers(fieldnames) -> set:
+    return IMPORT_HEADERS.difference(set(fieldnames or []))
+
+
+def check_import_headers(src):
+    """
+    Validate the header line of a binary CSV upload and rewind it.
+    Raises 400 listing any missing required headers.
+    """
+    reader = io.TextIOWrapper(src, encoding="utf-8", errors="ignore", newline="")
+    try:
+        header = next(csv.reader(reader), None)
+    finally:
+        reader.detach()
+    src.seek(0)
+    missing = _missing_headers(header)
+    if missing:
+        raise HTTPException(
+            status_code=400,
+            detail=f"CSV is missing required headers: {', '.join(sorted(missing))}"
+        )
+
+
+def stream_import_cards(db: Session, ctx, user: User, src) -> dict:
+    """
+    Import every row of the binary CSV file object src for user
+    (job worker — see services/jobs.py). Caller commits.
+    """
+    settings = user.settings
+    size = src.seek(0, io.SEEK_END) or 1
+    src.seek(0)
+
+    db.execute(_CREATE_STAGE)
+    cursor = db.connection().connection.cursor()
+
+    text_src = io.TextIOWrapper(src, encoding="utf-8", errors="ignore", newline="")
+    try:
+        reader = csv.DictReader(text_src)
+        missing = _missing_headers(reader.fieldnames)
+        if missing:
+            raise HTTPException(
+                status_code=400,
+                detail=f"CSV is missing required headers: {', '.join(sorted(missing))}"
+            )
+
+        buf = io.StringIO()
+        writer = csv.writer(buf)
+        imported = 0
+        brands = set()
+
+        for rownum, row in enumerate(reader, start=1):
+            try:
+                card = _parse_row(row, rownum)
+            except ValueError as e:
+                raise HTTPException(status_code=400, detail=str(e))
+            except Exception as e:
+                raise HTTPException(status_code=400, detail=f"Row {rownum} invalid: {e}")
+
+            value = None
+            if settings:
+                factor = calculate_market_factor(card, settings)
+                value = calculate_card_value(pick_avg_book(card), float(card.grade), factor)
+            writer.writerow(_stage_record(rownum, card, value))
+            if card.brand:
+                brands.add(card.brand)
+            imported += 1
+
+            if imported % IMPORT_BATCH_ROWS == 0:
+                buf.seek(0)
+                cursor.copy_expert(_COPY_STAGE, buf)
+                buf.seek(0)
+                buf.truncate()
+                ctx.progress(src.tell(), size)
+
+        if buf.tell():
+            buf.seek(0)
+            cursor.copy_expert(_COPY_STAGE, buf)
+    finally:
+        text_src.detach()
+        cursor.close()
+
+    if not imported:
+        return {"imported": 0}
+
+    db.execute(_MERGE_STAGE, {"user_id": user.id, "now": datetime.now(timezone.utc)})
+
+    if settings:
+        existing_brands = set(settings.card_makes or [])
+        if brands - existing_brands:
+            settings.card_makes = sorted(existing_brands | brands)
+
+    return {
+        "imported": imported,
+        "message": f"Successfully imported {imported} cards."
+    }
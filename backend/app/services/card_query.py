@@ -0,0 +1,190 @@
+# backend/app/services/card_query.py
+"""
+Card listing query builder — server-side sort, filters, and keyset pagination.
+
+Used by GET /cards/page. Instead of OFFSET paging, each page returns an opaque
+cursor holding the sort-key values of its last row; the next page seeks past
+that row with a keyset predicate, so page N costs the same as page 1.
+
+Sort levels use the same shape the frontend stores in GlobalSettings.default_sort:
+    [{"key": "last_name", "direction": "asc"}, {"key": "year", "direction": "desc"}]
+
+Sort keys mirror the ListCards SORT_COLUMNS, with NULLs coalesced the same way
+the client-side getVal() does (0 for numbers, "" for strings). market_factor is
+computed in Python and cannot be sorted in SQL, so it is ignored here.
+Card.id is always appended as the final tiebreaker (in the direction of the
+last level) to make the order stable and keep single-direction sorts indexable.
+
+Composite indexes backing these expressions live in migrations/029.
+"""
+
+import base64
+import json
+from typing import Optional
+
+from sqlalchemy import and_, or_, func, tuple_
+from sqlalchemy.orm import Query
+
+from .. import models
+
+Card = models.Card
+
+# key → SQL sort expression (must match the index expressions in migration 029)
+SORT_EXPRESSIONS = {
+    "last_name":   func.lower(func.coalesce(Card.last_name, "")),
+    "first_name":  func.lower(func.coalesce(Card.first_name, "")),
+    "year":        func.coalesce(Card.year, 0),
+    "brand":       func.lower(func.coalesce(Card.brand, "")),
+    "card_number": func.lower(func.coalesce(Card.card_number, "")),
+    "grade":       Card.grade,
+    "card_value":  func.coalesce(Card.value, 0),
+    "rookie":      func.coalesce(Card.rookie, False),
+}
+
+# Python-side equivalents, used to build the cursor from the last row of a page
+_ROW_VALUES = {
+    "last_name":   lambda c: (c.last_name or "").lower(),
+    "first_name":  lambda c: (c.first_name or "").lower(),
+    "year":        lambda c: c.year or 0,
+    "brand":       lambda c: (c.brand or "").lower(),
+    "card_number": lambda c: (c.card_number or "").lower(),
+    "grade":       lambda c: c.grade,
+    "card_value":  lambda c: c.value or 0,
+    "rookie":      lambda c: bool(c.rookie),
+}
+
+DEFAULT_SORT = [{"key": "last_name", "direction": "asc"}, {"key": "first_name", "direction": "asc"}]
+
+
+class InvalidCursor(ValueError):
+    """Raised when a cursor cannot be decoded or was issued for a different sort."""
+
+
+def normalize_sort(levels) -> list[dict]:
+    """
+    Clean a list of sort levels: drop unknown/duplicate keys, default direction to asc.
+    Falls back to DEFAULT_SORT when nothing usable remains.
+    """
+    out, seen = [], set()
+    for level in levels or []:
+        if not isinstance(level, dict):
+            continue
+        key = level.get("key")
+        if key not in SORT_EXPRESSIONS or key in seen:
+            continue
+        direction = "desc" if str(level.get("direction", "asc")).lower() == "desc" else "asc"
+        out.append({"key": key, "direction": direction})
+        seen.add(key)
+    return out or list(DEFAULT_SORT)
+
+
+def parse_sort_param(sort: Optional[str]) -> Optional[list[dict]]:
+    """
+    Parse the ?sort= query param: comma-separated keys, '-' prefix for descending.
+    e.g. "last_name,-year" → [{"key": "last_name", ...asc}, {"key": "year", ...desc}]
+    """
+    if not sort:
+        return None
+    levels = []
+    for part in sort.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        if part.startswith("-"):
+            levels.append({"key": part[1:], "direction": "desc"})
+        else:
+            levels.append({"key": part, "direction": "asc"})
+    return levels
+
+
+def _sort_signature(levels: list[dict]) -> str:
+    return ",".join(("-" if l["direction"] == "desc" else "") + l["key"] for l in levels)
+
+
+def encode_cursor(card, levels: list[dict]) -> str:
+    """Build an opaque cursor from the last card on a page."""
+    payload = {
+        "s": _sort_signature(levels),
+        "v": [_ROW_VALUES[l["key"]](card) for l in levels] + [card.id],
+    }
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, levels: list[dict]) -> list:
+    """Decode a cursor into its sort-key values. Raises InvalidCursor on mismatch."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        values = payload["v"]
+        signature = payload["s"]
+    except Exception as exc:
+        raise InvalidCursor("Malformed cursor") from exc
+    if signature != _sort_signature(levels) or len(values) != len(levels) + 1:
+        raise InvalidCursor("Cursor does not match the requested sort")
+    return values
+
+
+def _keyset_predicate(levels: list[dict], values: list):
+    """
+    Rows strictly after `values` in (levels..., id) order.
+
+    When every level shares one direction this is a single row-value comparison
+    the planner can satisfy straight from a composite index; mixed directions
+    expand into the equivalent OR-of-ANDs form.
+    """
+    exprs = [SORT_EXPRESSIONS[l["key"]] for l in levels] + [Card.id]
+    directions = [l["direction"] for l in levels]
+    directions.append(directions[-1])
+
+    if len(set(directions)) == 1:
+        lhs, rhs = tuple_(*exprs), tuple_(*values)
+        return lhs < rhs if directions[0] == "desc" else lhs > rhs
+
+    clauses = []
+    for i, (expr, direction) in enumerate(zip(exprs, directions)):
+        ties = [exprs[j] == values[j] for j in range(i)]
+        step = expr < values[i] if direction == "desc" else expr > values[i]
+        clauses.append(and_(*ties, step))
+    return or_(*clauses)
+
+
+def apply_card_filters(
+    q: Query,
+    brand: Optional[str] = None,
+    year: Optional[int] = None,
+    player: Optional[str] = None,
+    grade: Optional[float] = None,
+    rookie: Optional[bool] = None,
+    min_value: Optional[float] = None,
+    max_value: Optional[float] = None,
+) -> Query:
+    """Apply the optional listing filters to a Card query."""
+    if brand:
+        q = q.filter(SORT_EXPRESSIONS["brand"] == brand.strip().lower())
+    if year is not None:
+        q = q.filter(Card.year == year)
+    if player:
+        pattern = f"%{player.strip()}%"
+        q = q.filter(or_(Card.last_name.ilike(pattern), Card.first_name.ilike(pattern)))
+    if grade is not None:
+        q = q.filter(Card.grade == grade)
+    if rookie is not None:
+        q = q.filter(SORT_EXPRESSIONS["rookie"] == rookie)
+    if min_value is not None:
+        q = q.filter(Card.value >= min_value)
+    if max_value is not None:
+        q = q.filter(Card.value <= max_value)
+    return q
+
+
+def apply_keyset_page(q: Query, levels: list[dict], cursor: Optional[str], limit: int) -> Query:
+    """Order by the sort levels + id, seek past the cursor, and fetch limit + 1 rows."""
+    if cursor:
+        q = q.filter(_keyset_predicate(levels, decode_cursor(cursor, levels)))
+    order = []
+    for l in levels:
+        expr = SORT_EXPRESSIONS[l["key"]]
+        order.append(expr.desc() if l["direction"] == "desc" else expr.asc())
+    order.append(Card.id.desc() if levels[-1]["direction"] == "desc" else Card.id.asc())
+    return q.order_by(*order).limit(limit + 1)
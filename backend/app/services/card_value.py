@@ -18,7 +18,9 @@ Valuation formula:   value = avg_book × grade × market_factor
                     PR(0.2)          → prgrade_factor
 
 All three functions are called from create_card, update_card, import_csv,
-revalue_all, and the sets overlay (with a duck-typed proxy object).
+and the sets overlay (with a duck-typed proxy object). revalue_all and the
+factor-change revalue in PUT /settings/ use the SQL twin in
+services/revaluation.py — keep the two in step when changing the formula.
 """
 
 import math
@@ -0,0 +1,307 @@
+# backend/app/services/chat_context.py
+"""
+Collection summary for the Cy chat system prompt.
+
+Each chat turn used to load every card, ball, wax box, pack and set/binder the
+user owns and re-aggregate them in Python. The summary is now computed in
+Postgres with one GROUPING SETS query per inventory table (five in all, each
+an index range on user_id) and rendered under a token budget:
+
+  - headline totals (counts, values, auth split) are always included
+  - the per-player, grade, brand and type breakdowns share what is left of
+    CHAT_CONTEXT_TOKEN_BUDGET; a breakdown that does not fit keeps its
+    largest entries and says how many were left out
+
+Tokens are estimated at ~4 characters each, which is close enough for sizing
+a prompt.
+"""
+
+import os
+from typing import Optional
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from ..models import GlobalSettings
+
+CHAT_CONTEXT_TOKEN_BUDGET = int(os.getenv("CHAT_CONTEXT_TOKEN_BUDGET", "6000"))
+
+_CHARS_PER_TOKEN = 4
+
+# GROUPING(col) is 1 on rows where col is not part of the grouping set, so each
+# result row says which breakdown it belongs to; the () set is the grand total.
+_CARD_SUMMARY_SQL = text("""
+    SELECT first_name, last_name, grade, brand,
+           GROUPING(first_name) AS no_player,
+           GROUPING(grade)      AS no_grade,
+           GROUPING(brand)      AS no_brand,
+           COUNT(*)                           AS n,
+           COUNT(*) FILTER (WHERE rookie)     AS rookies,
+           COALESCE(SUM(value), 0)            AS value
+    FROM (
+        SELECT first_name, last_name, grade, rookie, value,
+               COALESCE(NULLIF(brand, ''), 'Unknown') AS brand
+        FROM cards WHERE user_id = :uid
+    ) c
+    GROUP BY GROUPING SETS ((first_name, last_name), (grade), (brand), ())
+""")
+
+_BALL_SUMMARY_SQL = text("""
+    SELECT first_name, last_name,
+           GROUPING(first_name) AS no_signer,
+           COUNT(*)                       AS n,
+           COUNT(*) FILTER (WHERE auth)   AS authenticated,
+           COALESCE(SUM(value), 0)        AS value
+    FROM auto_balls WHERE user_id = :uid
+    GROUP BY GROUPING SETS ((first_name, last_name), ())
+    ORDER BY COUNT(*) DESC, last_name, first_name
+""")
+
+# Wax boxes, packs and sets/binders: quantity NULL or 0 counts as 1.
+_STOCK_SUMMARY_SQL = """
+    SELECT {keys},
+           {groupings},
+           COUNT(*)                                        AS n,
+           COALESCE(SUM(qty), 0)                           AS qty,
+           COALESCE(SUM(qty * COALESCE(value, 0)), 0)      AS value
+    FROM (
+        SELECT {key_exprs}, value, COALESCE(NULLIF(quantity, 0), 1) AS qty
+        FROM {table} WHERE user_id = :uid
+    ) s
+    GROUP BY GROUPING SETS ({sets}, ())
+"""
+
+
+def _stock_sql(table: str, **key_exprs: str):
+    keys = list(key_exprs)
+    return text(_STOCK_SUMMARY_SQL.format(
+        table=table,
+        keys=", ".join(keys),
+        groupings=", ".join(f"GROUPING({k}) AS no_{k}" for k in keys),
+        key_exprs=", ".join(f"{expr} AS {k}" for k, expr in key_exprs.items()),
+        sets=", ".join(f"({k})" for k in keys),
+    ))
+
+
+_WAX_SUMMARY_SQL = _stock_sql("wax_boxes", brand="COALESCE(NULLIF(brand, ''), 'Unknown')")
+_PACK_SUMMARY_SQL = _stock_sql(
+    "wax_packs",
+    pack_type="COALESCE(NULLIF(pack_type, ''), '(none)')",
+    brand="COALESCE(NULLIF(brand, ''), 'Unknown')",
+)
+_BINDER_SUMMARY_SQL = _stock_sql("boxes_binders", set_type="COALESCE(NULLIF(set_type, ''), 'Unknown')")
+
+
+def _tokens(s: str) -> int:
+    return -(-len(s) // _CHARS_PER_TOKEN)
+
+
+def _money(v) -> str:
+    return f"${round(float(v or 0)):,}"
+
+
+class _Breakdown:
+    """
+    A capped list within the context. `items` are (rank, text) pairs; when the
+    list must be cut, the lowest-ranked items go first and the survivors keep
+    their display order. Rendered one per line, or joined inline after `prefix`.
+    """
+
+    def __init__(self, items, more: str, prefix: str = "", sep: Optional[str] = None, priority: int = 0):
+        self.items = items
+        self.more = more          # e.g. "players" → "... and 12 more players"
+        self.prefix = prefix
+        self.sep = sep
+        self.priority = priority  # lower is allocated budget first
+        self.keep = len(items)
+
+    def cost(self, n: int) -> int:
+        texts = [t for _, t in self.items[:n]]
+        if self.sep is None:
+            return sum(_tokens(t) + 1 for t in texts)
+        return _tokens(self.prefix + self.sep.join(texts)) + 1
+
+    def fit(self, budget: int) -> int:
+        """Keep as many top-ranked items as fit in budget tokens; returns tokens used."""
+        ranked = sorted(range(len(self.items)), key=lambda i: self.items[i][0])
+        self.items = [self.items[i] for i in ranked]
+        overflow = _tokens(f"... and {len(self.items)} more {self.more}") + 1
+        if self.cost(len(self.items)) <= budget:
+            self.keep = len(self.items)
+        else:
+            self.keep = 0
+            used = overflow
+            for i, (_, t) in enumerate(self.items):
+                step = _tokens(t) + 1 if self.sep is None else _tokens(self.sep + t)
+                if used + step > budget:
+                    break
+                used += step
+                self.keep = i + 1
+        return self.cost(self.keep) + (overflow if self.keep < len(self.items) else 0)
+
+    def render(self, order) -> list[str]:
+        shown = sorted(self.items[:self.keep], key=order)
+        texts = [t for _, t in shown]
+        left = len(self.items) - self.keep
+        more = f"... and {left} more {self.more}" if left else None
+        if self.sep is None:
+            return [*texts, *([f"  {more}"] if more else [])]
+        parts = texts + ([more] if more else [])
+        return [self.prefix + self.sep.join(parts)]
+
+
+class _Context:
+    """Fixed lines plus capped breakdowns, laid out in document order."""
+
+    def __init__(self):
+        self.parts: list = []
+
+    def line(self, s: str):
+        self.parts.append(s)
+
+    def breakdown(self, b: _Breakdown, order):
+        self.parts.append((b, order))
+
+    def render(self, budget: int) -> str:
+        fixed = sum(_tokens(p) + 1 for p in self.parts if isinstance(p, str))
+        remaining = max(budget - fixed, 0)
+        breakdowns = sorted((p[0] for p in self.parts if not isinstance(p, str)), key=lambda b: b.priority)
+        for b in breakdowns:
+            remaining -= b.fit(remaining)
+        lines = []
+        for p in self.parts:
+            if isinstance(p, str):
+                lines.append(p)
+            else:
+                lines.extend(p[0].render(p[1]))
+        return "\n".join(lines)
+
+
+def _text_order(item):
+    return item[1]
+
+
+def build_collection_context(
+    db: Session,
+    user_id: int,
+    settings: GlobalSettings | None,
+    budget: int = CHAT_CONTEXT_TOKEN_BUDGET,
+) -> str:
+    params = {"uid": user_id}
+    ctx = _Context()
+
+    # ------------------------------------------------------------------
+    # Cards
+    # ------------------------------------------------------------------
+    players, grades, brands, total = [], [], [], None
+    for r in db.execute(_CARD_SUMMARY_SQL, params):
+        if not r.no_player:
+            players.append(r)
+        elif not r.no_grade:
+            grades.append(r)
+        elif not r.no_brand:
+            brands.append(r)
+        else:
+            total = r
+
+    if not total or not total.n:
+        ctx.line("The user has no cards in their collection.\n")
+    else:
+        ctx.line(f"The user has {total.n} cards in their collection.\n")
+        ctx.line(f"Total card collection value: {_money(total.value)}\n")
+
+        if settings:
+            market_factor = getattr(settings, 'market_factor', None)
+            if market_factor:
+                ctx.line(f"Current market factor: {market_factor}\n")
+
+        ctx.line("\nPLAYER SUMMARY (use for counting/totalling by player):")
+        ctx.breakdown(_Breakdown(
+            [((-r.n, -r.value), f"  - {r.first_name} {r.last_name}: {r.n} cards ({r.rookies} rookie), "
+                                f"total value {_money(r.value)}") for r in players],
+            more="players (use find_cards for them)", priority=2,
+        ), _text_order)
+
+        ctx.line("\nGRADE SUMMARY (use for counting/totalling by grade):")
+        ctx.breakdown(_Breakdown(
+            [((-r.n, -r.grade), f"  - Grade {r.grade}: {r.n} cards, total value {_money(r.value)}") for r in grades],
+            more="grades",
+        ), lambda item: item[0][1])
+
+        ctx.line("\nBRAND SUMMARY (use for counting/totalling by brand):")
+        ctx.breakdown(_Breakdown(
+            [((-r.n, -r.value), f"  - {r.brand}: {r.n} cards, total value {_money(r.value)}") for r in brands],
+            more="brands (use find_cards for them)", priority=1,
+        ), _text_order)
+
+        ctx.line("\nTo look up specific cards (e.g. for update or delete), use the find_cards tool.")
+
+    # ------------------------------------------------------------------
+    # Auto Balls
+    # ------------------------------------------------------------------
+    ctx.line("\n\nAUTO BALLS SUMMARY:")
+    signers = [r for r in db.execute(_BALL_SUMMARY_SQL, params)]
+    total = next((r for r in signers if r.no_signer), None)
+    signers = [r for r in signers if not r.no_signer]
+    if not total or not total.n:
+        ctx.line("  No autographed balls in collection.")
+    else:
+        ctx.line(f"  Total: {total.n} balls | Total value: {_money(total.value)}")
+        ctx.breakdown(_Breakdown(
+            [(i, f"{r.first_name} {r.last_name}: {r.n} ball(s), value {_money(r.value)}")
+             for i, r in enumerate(signers[:5])],
+            more="signers", prefix="  Top signers: ", sep=" | ",
+        ), lambda item: item[0])
+        ctx.line(f"  Auth breakdown: {total.authenticated} authenticated, "
+                 f"{total.n - total.authenticated} unauthenticated")
+        ctx.line("  To look up specific balls, use the find_balls tool.")
+
+    # ------------------------------------------------------------------
+    # Wax Boxes / Wax Packs / Sets-Binders
+    # ------------------------------------------------------------------
+    def _stock(sql, *keys):
+        rows = list(db.execute(sql, params))
+        total = next((r for r in rows if all(getattr(r, f"no_{k}") for k in keys)), None)
+        by_key = {
+            k: [r for r in rows if not getattr(r, f"no_{k}")]
+            for k in keys
+        }
+        return total, by_key
+
+    def _counts(rows, key, unit, fmt=str):
+        # "By brand: Topps: 3 box(es), ..." / "By type: wax: 2, ..."
+        noun = "brand" if key == "brand" else "type"
+        return _Breakdown(
+            [((-r.n, getattr(r, key)), f"{fmt(getattr(r, key))}: {r.n}{unit}") for r in rows],
+            more=f"{noun}s", prefix=f"  By {noun}: ", sep=", ",
+        )
+
+    ctx.line("\n\nWAX BOXES SUMMARY:")
+    total, by = _stock(_WAX_SUMMARY_SQL, "brand")
+    if not total or not total.n:
+        ctx.line("  No wax boxes in collection.")
+    else:
+        ctx.line(f"  Total: {total.n} boxes ({total.qty} qty) | Total value: {_money(total.value)}")
+        ctx.breakdown(_counts(by["brand"], "brand", " box(es)"), _text_order)
+        ctx.line("  To look up specific wax boxes, use the find_wax tool.")
+
+    ctx.line("\n\nWAX PACKS SUMMARY:")
+    total, by = _stock(_PACK_SUMMARY_SQL, "pack_type", "brand")
+    if not total or not total.n:
+        ctx.line("  No wax packs in collection.")
+    else:
+        ctx.line(f"  Total: {total.n} packs ({total.qty} qty) | Total value: {_money(total.value)}")
+        ctx.breakdown(_counts(by["pack_type"], "pack_type", ""), _text_order)
+        ctx.breakdown(_counts(by["brand"], "brand", " pack(s)"), _text_order)
+        ctx.line("  To look up specific wax packs, use the find_packs tool.")
+
+    ctx.line("\n\nSETS/BINDERS SUMMARY:")
+    total, by = _stock(_BINDER_SUMMARY_SQL, "set_type")
+    if not total or not total.n:
+        ctx.line("  No sets/binders in collection.")
+    else:
+        ctx.line(f"  Total: {total.n} sets ({total.qty} qty) | Total value: {_money(total.value)}")
+        ctx.breakdown(_counts(by["set_type"], "set_type", "", fmt=str.capitalize), _text_order)
+        ctx.line("  Sets/Binders are read-only — Cy cannot add, update, or delete them via chat.")
+
+    return ctx.render(budget)
@@ -0,0 +1,357 @@
+# backend/app/services/dictionary_index.py
+"""
+In-process Smart Fill index over dictionary_entries.
+
+Smart Fill, identify-image and /dictionary/search match the dictionary on
+lower-cased names on every keystroke-driven call. This module loads the whole
+table once per process into compact records (tens of thousands of rows is a
+few MB) keyed by normalized values, so those lookups are dict hits instead of
+database queries:
+
+  by name   (first, last)              → entries, lowest id first
+  by card   (brand, year, card_number) → entries, lowest id first
+  prefix    sorted first / last / "first last" / "last first" keys for typeahead
+
+Freshness:
+  - Routes that write single entries read written_version(db) after flushing
+    (the dictionary_version their commit will publish) and pass it to
+    upsert()/remove()/apply() after commit. The writing process sees its own
+    change immediately, and when that version directly follows the index's,
+    the index adopts it — so the writer's own statement does not trigger a
+    reload of the whole table.
+  - Bulk writers call invalidate() after commit; the next lookup reloads.
+  - Other uvicorn workers notice writes through the dictionary_version counter
+    in app_metadata (bumped per statement by a trigger, migration 032), checked
+    at most every DICTIONARY_INDEX_CHECK_SECONDS. A changed counter triggers a
+    full reload on a background thread; lookups keep using the previous index
+    until the new one is swapped in. Only the first load (and the one after
+    invalidate()) makes lookups wait.
+
+If the index cannot be loaded (e.g. migration 032 not applied yet), lookups
+fall back to the func.lower(...) queries, which migration 032's functional
+indexes also serve.
+"""
+
+import bisect
+import logging
+import os
+import threading
+import time
+from collections import namedtuple
+from typing import Optional
+
+from sqlalchemy import func, select, text
+from sqlalchemy.orm import Session
+
+from ..database import engine
+from ..models import DictionaryEntry
+
+logger = logging.getLogger("cardstoard.dictionary_index")
+
+DICTIONARY_INDEX_CHECK_SECONDS = float(os.getenv("DICTIONARY_INDEX_CHECK_SECONDS", "10"))
+
+DictRecord = namedtuple("DictRecord", [
+    "id", "first_name", "last_name", "rookie_year", "brand", "year", "card_number",
+    "book_high", "book_high_mid", "book_mid", "book_low_mid", "book_low",
+])
+
+_COLUMNS = [getattr(DictionaryEntry, f) for f in DictRecord._fields]
+
+_VERSION_SQL = text("SELECT value FROM app_metadata WHERE key = 'dictionary_version'")
+
+
+def _norm(v) -> str:
+    return (v or "").strip().lower()
+
+
+def _name_key(first, last) -> tuple:
+    return (_norm(first), _norm(last))
+
+
+def _card_key(brand, year, card_number) -> tuple:
+    return (_norm(brand), year, _norm(card_number))
+
+
+class DictionaryIndex:
+    """Normalized in-memory view of dictionary_entries. Thread-safe."""
+
+    def __init__(self):
+        self._lock = threading.RLock()          # guards the maps below; held only briefly
+        self._reload_lock = threading.Lock()    # one (re)load at a time
+        self._generation = 0                    # bumped by invalidate(); stale builds are dropped
+        self._replay = None                     # apply() calls made while a build is running
+        self._loaded = False
+        self._version = None
+        self._checked_at = 0.0
+        self._retry_at = 0.0
+        self._by_id: dict[int, DictRecord] = {}
+        self._by_name: dict[tuple, list[int]] = {}
+        self._by_card: dict[tuple, list[int]] = {}
+        self._prefix_keys: list[tuple] = []   # sorted (field, key, first_l, last_l)
+
+    # ------------------------------------------------------------------
+    # Loading / freshness
+    # ------------------------------------------------------------------
+    def _reset(self):
+        self._by_id, self._by_name, self._by_card, self._prefix_keys = {}, {}, {}, []
+
+    def _build(self):
+        """Read the table and build fresh maps, without touching the live ones."""
+        with engine.connect() as conn:
+            version = conn.execute(_VERSION_SQL).scalar()
+            rows = conn.execute(select(*_COLUMNS).order_by(DictionaryEntry.id)).all()
+        # Bulk build: rows arrive in id order, so plain appends keep id lists sorted
+        by_id, by_name, by_card = {}, {}, {}
+        for row in rows:
+            rec = DictRecord(*row)
+            by_id[rec.id] = rec
+            by_name.setdefault(_name_key(rec.first_name, rec.last_name), []).append(rec.id)
+            by_card.setdefault(_card_key(rec.brand, rec.year, rec.card_number), []).append(rec.id)
+        prefix_keys = sorted(key for name in by_name for key in self._prefix_entries(name))
+        return version, (by_id, by_name, by_card, prefix_keys)
+
+    def _load(self):
+        """Build a new index outside the lookup lock, then swap it in. Caller holds _reload_lock."""
+        with self._lock:
+            generation = self._generation
+            self._replay = []
+        try:
+            version, maps = self._build()
+        except Exception:
+            with self._lock:
+                self._replay = None
+            raise
+        with self._lock:
+            replay, self._replay = self._replay, None
+            if generation != self._generation:
+                return   # invalidate() ran meanwhile; this build may predate the bulk write
+            self._by_id, self._by_name, self._by_card, self._prefix_keys = maps
+            self._version = version
+            self._loaded = True
+            self._checked_at = time.monotonic()
+            # Single-entry writes committed during the build may be missing from it;
+            # ones the build already covers are skipped (a later write may follow them)
+            for change in replay:
+                if change[0] is None or version is None or int(change[0]) > int(version):
+                    self._apply(*change)
+        logger.info("Loaded %d dictionary entries (version %s)", len(maps[0]), version)
+
+    def _refresh(self):
+        """Background check: reload if another writer moved dictionary_version."""
+        try:
+            with engine.connect() as conn:
+                version = conn.execute(_VERSION_SQL).scalar()
+            if version != self._version:
+                self._load()
+        except Exception:
+            logger.exception("Smart Fill index refresh failed; keeping the previous index")
+        finally:
+            self._reload_lock.release()
+
+    def _ensure_fresh(self) -> bool:
+        """Load or schedule a reload as needed. Returns False when the index is unavailable."""
+        now = time.monotonic()
+        if self._loaded:
+            if (now - self._checked_at >= DICTIONARY_INDEX_CHECK_SECONDS
+                    and self._reload_lock.acquire(blocking=False)):
+                self._checked_at = now
+                threading.Thread(target=self._refresh, name="cardstoard-dictionary-index", daemon=True).start()
+            return True
+        if now < self._retry_at:
+            return False
+        with self._reload_lock:
+            if self._loaded:
+                return True   # loaded by another thread while this one waited
+            try:
+                self._load()
+            except Exception:
+                logger.exception("Smart Fill index unavailable; using database lookups")
+                self._retry_at = now + DICTIONARY_INDEX_CHECK_SECONDS
+                return False
+        return self._loaded
+
+    def invalidate(self):
+        """Drop the index; the next lookup reloads it. For bulk writes."""
+        with self._lock:
+            self._generation += 1
+            self._loaded = False
+            self._reset()
+
+    def written_version(self, db: Session) -> Optional[str]:
+        """
+        dictionary_version as seen inside db's transaction — call after flushing
+        the transaction's dictionary writes and before committing. The trigger's
+        UPDATE keeps app_metadata's row locked until commit, so this is exactly
+        the version the commit publishes. None when the index is not loaded
+        (migration 032 may be missing).
+        """
+        if not self._loaded:
+            return None
+        return db.execute(_VERSION_SQL).scalar()
+
+    # ------------------------------------------------------------------
+    # Incremental maintenance
+    # ------------------------------------------------------------------
+    def _prefix_entries(self, name: tuple) -> list[tuple]:
+        first, last = name
+        return [
+            ("first_name", first, first, last),
+            ("last_name", last, first, last),
+            ("full", f"{first} {last}", first, last),
+            ("full", f"{last} {first}", first, last),
+        ]
+
+    def _add(self, rec: DictRecord):
+        self._by_id[rec.id] = rec
+        name = _name_key(rec.first_name, rec.last_name)
+        ids = self._by_name.setdefault(name, [])
+        if not ids:
+            for key in self._prefix_entries(name):
+                bisect.insort(self._prefix_keys, key)
+        bisect.insort(ids, rec.id)
+        bisect.insort(self._by_card.setdefault(_card_key(rec.brand, rec.year, rec.card_number), []), rec.id)
+
+    def _discard(self, entry_id: int):
+        rec = self._by_id.pop(entry_id, None)
+        if rec is None:
+            return
+        name = _name_key(rec.first_name, rec.last_name)
+        ids = self._by_name.get(name, [])
+        if entry_id in ids:
+            ids.remove(entry_id)
+        if not ids:
+            self._by_name.pop(name, None)
+            for key in self._prefix_entries(name):
+                i = bisect.bisect_left(self._prefix_keys, key)
+                if i < len(self._prefix_keys) and self._prefix_keys[i] == key:
+                    del self._prefix_keys[i]
+        card = _card_key(rec.brand, rec.year, rec.card_number)
+        ids = self._by_card.get(card, [])
+        if entry_id in ids:
+            ids.remove(entry_id)
+        if not ids:
+            self._by_card.pop(card, None)
+
+    def _apply(self, version, upserts: tuple, removed_ids: tuple):
+        for entry_id in removed_ids:
+            self._discard(entry_id)
+        for rec in upserts:
+            self._discard(rec.id)
+            self._add(rec)
+        if version is not None and self._version is not None and int(version) == int(self._version) + 1:
+            self._version = version   # nothing else changed in between: no reload needed
+
+    def apply(self, version: Optional[str], upserts=(), removed_ids=()):
+        """
+        Apply one committed transaction's changes: upserts are entries (or rows
+        with the same columns) as committed, removed_ids the deleted entry ids.
+        version is its written_version(), or None if unknown.
+        """
+        upserts = tuple(DictRecord(*(getattr(e, f) for f in DictRecord._fields)) for e in upserts)
+        removed_ids = tuple(removed_ids)
+        with self._lock:
+            if self._replay is not None:
+                self._replay.append((version, upserts, removed_ids))
+            if self._loaded:
+                self._apply(version, upserts, removed_ids)
+
+    def upsert(self, entry, version: Optional[str] = None):
+        """Add or replace one committed entry."""
+        self.apply(version, upserts=(entry,))
+
+    def remove(self, entry_ids, version: Optional[str] = None):
+        """Forget committed deletes (an iterable of entry ids)."""
+        self.apply(version, removed_ids=entry_ids)
+
+    # ------------------------------------------------------------------
+    # Lookups
+    # ------------------------------------------------------------------
+    def find(
+        self,
+        db: Session,
+        first_name: str,
+        last_name: str,
+        brand: Optional[str] = None,
+        year: Optional[int] = None,
+        card_number: Optional[str] = None,
+    ):
+        """
+        First entry (lowest id) matching the name and any of brand/year/card_number,
+        compared case-insensitively. Returns a DictRecord, a DictionaryEntry on the
+        database fallback path, or None.
+        """
+        if not self._ensure_fresh():
+            return _db_find(db, first_name, last_name, brand, year, card_number)
+        with self._lock:
+            brand_l, cn_l = _norm(brand), _norm(card_number)
+            for entry_id in self._by_name.get(_name_key(first_name, last_name), ()):
+                rec = self._by_id[entry_id]
+                if brand and _norm(rec.brand) != brand_l:
+                    continue
+                if year is not None and rec.year != year:
+                    continue
+                if card_number and _norm(rec.card_number) != cn_l:
+                    continue
+                return rec
+        return None
+
+    def find_valued(self, db: Session, brand: str, year: int, card_number: str):
+        """First entry for (brand, year, card_number) that has book values."""
+        if not self._ensure_fresh():
+            return db.query(DictionaryEntry).filter(
+                func.lower(DictionaryEntry.card_number) == _norm(card_number),
+                DictionaryEntry.year == year,
+                func.lower(DictionaryEntry.brand) == _norm(brand),
+                DictionaryEntry.book_high.isnot(None),
+            ).first()
+        with self._lock:
+            for entry_id in self._by_card.get(_card_key(brand, year, card_number), ()):
+                rec = self._by_id[entry_id]
+                if rec.book_high is not None:
+                    return rec
+        return None
+
+    def players_with_prefix(self, prefix: str, field: str = "full", limit: int = 10) -> Optional[list[tuple]]:
+        """
+        Up to limit (first_name, last_name, entry_count) candidates, in
+        alphabetical key order, whose field starts with prefix. field is
+        "first_name", "last_name" or "full" (either "first last" or "last first").
+        For a single-name field, candidates are distinct on that name. Names use
+        the casing of their lowest-id entry. Returns None if the index is unavailable.
+        """
+        if not self._ensure_fresh():
+            return None
+        p = _norm(prefix)
+        out, seen = [], set()
+        with self._lock:
+            i = bisect.bisect_left(self._prefix_keys, (field, p))
+            while i < len(self._prefix_keys) and len(out) < limit:
+                kind, key, first, last = self._prefix_keys[i]
+                if kind != field or not key.startswith(p):
+                    break
+                i += 1
+                dedup = key if field != "full" else (first, last)
+                if dedup in seen:
+                    continue
+                seen.add(dedup)
+                ids = self._by_name[(first, last)]
+                rec = self._by_id[ids[0]]
+                out.append((rec.first_name, rec.last_name, len(ids)))
+        return out
+
+
+def _db_find(db, first_name, last_name, brand=None, year=None, card_number=None):
+    q = db.query(DictionaryEntry).filter(
+        func.lower(DictionaryEntry.first_name) == _norm(first_name),
+        func.lower(DictionaryEntry.last_name) == _norm(last_name),
+    )
+    if brand:
+        q = q.filter(func.lower(DictionaryEntry.brand) == _norm(brand))
+    if year is not None:
+        q = q.filter(DictionaryEntry.year == year)
+    if card_number:
+        q = q.filter(func.lower(DictionaryEntry.card_number) == _norm(card_number))
+    return q.order_by(DictionaryEntry.id).first()
+
+
+dictionary_index = DictionaryIndex()
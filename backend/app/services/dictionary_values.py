@@ -0,0 +1,182 @@
+# backend/app/services/dictionary_values.py
+"""
+Bulk book-value ingest for the card dictionary, used by
+POST /dictionary/import-values-csv and POST /dictionary/seed-values-from-cards.
+
+CSV: Brand, Year, CardNumber, BookHigh, BookHighMid, BookMid, BookLowMid, BookLow
+
+Both paths used to look up one DictionaryEntry per row and mutate it through
+the ORM — a 50k-row price guide meant 50k sequential queries. Now:
+
+  import  rows are COPY-loaded into a temp staging table, then one
+          UPDATE dictionary_entries ... FROM staging applies them all,
+          joined on (lower(brand), year, lower(card_number)) — the key of
+          ix_dictionary_card_lower (migration 032)
+  seed    one statement updates matching entries from the user's cards and
+          inserts entries for the keys the dictionary lacks
+
+Counts come from RETURNING. A key repeated in the file applies its last row
+(as the row-by-row import did); every dictionary entry sharing the key gets
+the values. Rows missing any of the five tiers are never staged and count as
+not found.
+
+Works on a raw psycopg2 cursor (the routes pass
+db.connection().connection.cursor()) and only imports the standard library.
+Caller commits.
+"""
+
+import csv
+import io
+
+VALUES_CSV_HEADERS = {"Brand", "Year", "CardNumber", "BookHigh", "BookHighMid", "BookMid", "BookLowMid", "BookLow"}
+
+_TIERS = ("BookHigh", "BookHighMid", "BookMid", "BookLowMid", "BookLow")
+
+_CREATE_STAGE = """
+    DROP TABLE IF EXISTS book_value_stage;
+    CREATE TEMP TABLE book_value_stage (
+        ord           INTEGER NOT NULL,
+        brand_key     VARCHAR NOT NULL,
+        year          INTEGER NOT NULL,
+        number_key    VARCHAR NOT NULL,
+        book_high     DOUBLE PRECISION NOT NULL,
+        book_high_mid DOUBLE PRECISION NOT NULL,
+        book_mid      DOUBLE PRECISION NOT NULL,
+        book_low_mid  DOUBLE PRECISION NOT NULL,
+        book_low      DOUBLE PRECISION NOT NULL
+    ) ON COMMIT DROP
+"""
+
+# FORCE_NOT_NULL: an empty Brand / CardNumber stays '' and can still match
+_COPY_STAGE = "COPY book_value_stage FROM STDIN WITH (FORMAT csv, FORCE_NOT_NULL (brand_key, number_key))"
+
+_APPLY_STAGE = """
+    WITH latest AS (
+        SELECT DISTINCT ON (brand_key, year, number_key) *
+        FROM book_value_stage
+        ORDER BY brand_key, year, number_key, ord DESC
+    ), upd AS (
+        UPDATE dictionary_entries d
+        SET book_high     = s.book_high,
+            book_high_mid = s.book_high_mid,
+            book_mid      = s.book_mid,
+            book_low_mid  = s.book_low_mid,
+            book_low      = s.book_low,
+            book_values_imported_at = NOW()
+        FROM latest s
+        WHERE lower(d.brand) = s.brand_key
+          AND d.year = s.year
+          AND lower(d.card_number) = s.number_key
+        RETURNING s.brand_key, s.year, s.number_key
+    ), matched AS (
+        SELECT DISTINCT brand_key, year, number_key FROM upd
+    )
+    SELECT count(m.year)              AS updated,
+           count(*) - count(m.year)   AS not_found,
+           (SELECT count(*) FROM upd) AS entries_updated
+    FROM book_value_stage st
+    LEFT JOIN matched m USING (brand_key, year, number_key)
+"""
+
+# Last card per key wins, as when cards were applied one at a time
+_SEED_FROM_CARDS = """
+    WITH src AS (
+        SELECT DISTINCT ON (lower(brand), year, lower(card_number))
+               first_name, last_name, brand, year, card_number,
+               book_high, book_high_mid, book_mid, book_low_mid, book_low
+        FROM cards
+        WHERE user_id = %(user_id)s
+          AND brand <> '' AND year IS NOT NULL AND card_number <> ''
+          AND book_high > 0 AND book_high_mid > 0 AND book_mid > 0
+          AND book_low_mid > 0 AND book_low > 0
+        ORDER BY lower(brand), year, lower(card_number), id DESC
+    ), upd AS (
+        UPDATE dictionary_entries d
+        SET book_high     = c.book_high,
+            book_high_mid = c.book_high_mid,
+            book_mid      = c.book_mid,
+            book_low_mid  = c.book_low_mid,
+            book_low      = c.book_low,
+            book_values_imported_at = NOW()
+        FROM src c
+        WHERE lower(d.brand) = lower(c.brand)
+          AND d.year = c.year
+          AND lower(d.card_number) = lower(c.card_number)
+        RETURNING d.id
+    ), ins AS (
+        INSERT INTO dictionary_entries
+            (first_name, last_name, rookie_year, brand, year, card_number,
+             book_high, book_high_mid, book_mid, book_low_mid, book_low, book_values_imported_at)
+        SELECT c.first_name, c.last_name, NULL, c.brand, c.year, c.card_number,
+               c.book_high, c.book_high_mid, c.book_mid, c.book_low_mid, c.book_low, NOW()
+        FROM src c
+        WHERE NOT EXISTS (
+            SELECT 1 FROM dictionary_entries d
+            WHERE lower(d.brand) = lower(c.brand)
+              AND d.year = c.year
+              AND lower(d.card_number) = lower(c.card_number)
+        )
+        ON CONFLICT (first_name, last_name, brand, year, card_number) DO NOTHING
+        RETURNING id
+    )
+    SELECT (SELECT count(*) FROM upd) AS updated,
+           (SELECT count(*) FROM ins) AS created
+"""
+
+
+def missing_values_headers(fieldnames) -> set:
+    return VALUES_CSV_HEADERS.difference(fieldnames or [])
+
+
+def parse_values_rows(reader: csv.DictReader):
+    """
+    Yield (brand, year, card_number, high, high_mid, mid, low_mid, low) per CSV
+    row; a tier is None when blank. Raises ValueError("Row N invalid: ...") on
+    an unparseable row.
+    """
+    for rownum, row in enumerate(reader, start=1):
+        try:
+            tiers = []
+            for col in _TIERS:
+                v = (row.get(col) or "").strip()
+                tiers.append(float(v) if v else None)
+            yield (
+                (row["Brand"] or "").strip(),
+                int((row["Year"] or "").strip()),
+                (row["CardNumber"] or "").strip(),
+                *tiers,
+            )
+        except Exception as e:
+            raise ValueError(f"Row {rownum} invalid: {e}")
+
+
+def import_values_rows(cursor, rows) -> dict:
+    """Stage rows from parse_values_rows() and apply them. Returns the import counts."""
+    cursor.execute(_CREATE_STAGE)
+
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    incomplete = 0
+    for ord_, (brand, year, card_number, *tiers) in enumerate(rows):
+        # Rows missing any of the 5 value tiers are skipped
+        if not all(tiers):
+            incomplete += 1
+            continue
+        writer.writerow([ord_, brand.lower(), year, card_number.lower(), *tiers])
+    buf.seek(0)
+    cursor.copy_expert(_COPY_STAGE, buf)
+
+    cursor.execute(_APPLY_STAGE)
+    updated, not_found, entries_updated = cursor.fetchone()
+    return {
+        "updated": updated,
+        "not_found": not_found + incomplete,
+        "entries_updated": entries_updated,
+    }
+
+
+def seed_values_from_cards(cursor, user_id: int) -> dict:
+    """Copy a user's complete card book values into the dictionary. Returns the counts."""
+    cursor.execute(_SEED_FROM_CARDS, {"user_id": user_id})
+    updated, created = cursor.fetchone()
+    return {"updated": updated, "created": created}
@@ -0,0 +1,137 @@
+# backend/app/services/email_outbox.py
+"""
+Outgoing mail queue (email_outbox table, migration 041).
+
+Registration, resend-verify and email changes used to talk SMTP inside the
+request — several seconds per sign-up on a slow relay, and a failed send
+failed the request. Now they call queue_email(), which adds a row in the
+request's own transaction (no mail for a rolled-back sign-up), and
+notify_outbox() after committing.
+
+A daemon sender thread per uvicorn worker (start_outbox / stop_outbox, from
+main.py) claims due rows with FOR UPDATE SKIP LOCKED — workers never send the
+same message twice — and delivers them via utils/email_service.deliver_email.
+A failed send is retried after OUTBOX_RETRY_SECONDS × 2^(attempts-1); after
+OUTBOX_MAX_ATTEMPTS the row is marked failed with its last error. The thread
+wakes on notify_outbox() or every OUTBOX_POLL_SECONDS, which also picks up
+retries and rows queued by other workers. Send latency is tracked in
+SEND_LATENCY (GET /admin/auth-metrics).
+"""
+
+import logging
+import os
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import func, text
+from sqlalchemy.orm import Session
+
+from ..database import SessionLocal
+from ..models import EmailOutbox
+from ..utils.email_service import deliver_email
+from .latency import LatencyStats
+
+logger = logging.getLogger("cardstoard.email_outbox")
+
+OUTBOX_POLL_SECONDS  = int(os.getenv("OUTBOX_POLL_SECONDS", "15"))
+OUTBOX_RETRY_SECONDS = int(os.getenv("OUTBOX_RETRY_SECONDS", "30"))
+OUTBOX_MAX_ATTEMPTS  = int(os.getenv("OUTBOX_MAX_ATTEMPTS", "6"))
+OUTBOX_BATCH         = int(os.getenv("OUTBOX_BATCH", "10"))
+
+SEND_LATENCY = LatencyStats()
+
+_CLAIM_SQL = text("""
+    SELECT id FROM email_outbox
+    WHERE status = 'pending' AND next_attempt_at <= NOW()
+    ORDER BY next_attempt_at, id
+    LIMIT :limit
+    FOR UPDATE SKIP LOCKED
+""")
+
+_wake = threading.Event()
+_stop = threading.Event()
+_thread = None
+
+
+def queue_email(db: Session, to_address: str, subject: str, body: str, html: str | None = None) -> None:
+    """Add a message to the outbox in db's transaction; call notify_outbox() after commit."""
+    db.add(EmailOutbox(to_address=to_address, subject=subject, body=body, html=html))
+
+
+def notify_outbox() -> None:
+    """Wake this worker's sender thread (newly committed mail)."""
+    _wake.set()
+
+
+def _send_one(db: Session, msg: EmailOutbox) -> None:
+    msg.attempts += 1
+    started = time.perf_counter()
+    try:
+        deliver_email(msg.to_address, msg.subject, msg.body, msg.html)
+    except Exception as e:
+        msg.last_error = str(e)[:2000]
+        if msg.attempts >= OUTBOX_MAX_ATTEMPTS:
+            msg.status = "failed"
+            logger.error("Email %s to %s failed permanently: %s", msg.id, msg.to_address, e)
+        else:
+            delay = OUTBOX_RETRY_SECONDS * 2 ** (msg.attempts - 1)
+            msg.next_attempt_at = datetime.now(timezone.utc) + timedelta(seconds=delay)
+            logger.warning("Email %s to %s failed (attempt %d), retrying in %ds: %s",
+                           msg.id, msg.to_address, msg.attempts, delay, e)
+        return
+    finally:
+        SEND_LATENCY.record(time.perf_counter() - started)
+    msg.status = "sent"
+    msg.sent_at = datetime.now(timezone.utc)
+    msg.last_error = None
+
+
+def drain_outbox() -> int:
+    """Send every due message, a batch per transaction. Returns how many were attempted."""
+    attempted = 0
+    while not _stop.is_set():
+        with SessionLocal() as db:
+            ids = [r[0] for r in db.execute(_CLAIM_SQL, {"limit": OUTBOX_BATCH})]
+            if not ids:
+                return attempted
+            for msg in db.query(EmailOutbox).filter(EmailOutbox.id.in_(ids)).order_by(EmailOutbox.id):
+                _send_one(db, msg)
+            db.commit()
+            attempted += len(ids)
+    return attempted
+
+
+def _run() -> None:
+    while not _stop.is_set():
+        _wake.clear()
+        try:
+            drain_outbox()
+        except Exception:
+            logger.exception("Email outbox drain failed")
+        _wake.wait(OUTBOX_POLL_SECONDS)
+
+
+def start_outbox() -> None:
+    global _thread
+    if _thread is None or not _thread.is_alive():
+        _stop.clear()
+        _thread = threading.Thread(target=_run, name="cardstoard-outbox", daemon=True)
+        _thread.start()
+
+
+def stop_outbox() -> None:
+    _stop.set()
+    _wake.set()
+    if _thread is not None:
+        _thread.join(timeout=5)
+
+
+def outbox_stats(db: Session) -> dict:
+    counts = dict(db.query(EmailOutbox.status, func.count(EmailOutbox.id)).group_by(EmailOutbox.status).all())
+    return {
+        "pending": counts.get("pending", 0),
+        "sent": counts.get("sent", 0),
+        "failed": counts.get("failed", 0),
+        "send_latency": SEND_LATENCY.summary(),
+    }
@@ -0,0 +1,28 @@
+# backend/app/services/http_cache.py
+"""
+Conditional-GET helper for small, frequently repeated JSON responses.
+
+etag_json() serializes the payload once, tags it with a weak ETag derived from
+the body, and answers 304 Not Modified (no body) when the client's
+If-None-Match already names that tag. Responses are marked private so shared
+caches never store per-user data.
+"""
+
+import hashlib
+import json
+
+from fastapi import Request, Response
+
+
+def etag_json(request: Request, payload, max_age: int = 0) -> Response:
+    """JSON response with ETag / If-None-Match support."""
+    body = json.dumps(payload, separators=(",", ":"), default=str).encode()
+    etag = f'W/"{hashlib.sha1(body).hexdigest()[:20]}"'
+    cache = f"private, max-age={max_age}" if max_age else "private, no-cache"
+    headers = {"ETag": etag, "Cache-Control": cache, "Vary": "Cookie, Authorization"}
+
+    if_none_match = request.headers.get("if-none-match", "")
+    tags = {t.strip() for t in if_none_match.split(",") if t.strip()}
+    if "*" in tags or etag in tags or etag[2:] in tags:
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
@@ -0,0 +1,133 @@
+# backend/app/services/identify_cache.py
+"""
+Content-addressed cache for POST /cards/identify-image results.
+
+Before resizing an upload and paying for a Claude Vision call, the identify
+endpoints fingerprint the raw bytes (image_prep.image_fingerprint) and look for
+a previous identification:
+
+  sha256  exact re-upload of the same file — serves any user
+  phash   64-bit difference hash of a 9x8 grayscale thumbnail; a stored image
+          within IDENTIFY_PHASH_MAX_DISTANCE bits is the same card photographed
+          again. Only the uploader's own images are considered: cards from one
+          set share layout and colours, so a near match across collections
+          could name the wrong player or number. Only used when no grade
+          estimate is requested, since a grade describes one particular
+          photo/copy of the card.
+
+Cached: the model's fields, confidence and grade estimate. Dictionary and
+collection matches are always recomputed, as they change independently.
+
+Eviction: rows older than IDENTIFY_CACHE_TTL_DAYS are ignored and deleted;
+beyond IDENTIFY_CACHE_MAX_ROWS the least recently used are trimmed. Both run
+on every IDENTIFY_CACHE_EVICT_EVERY-th store in a process, i.e. only after
+(slow) vision calls, and never on the request path of a cache hit.
+
+Cache failures are logged and treated as misses — identification never
+depends on the cache.
+"""
+
+import itertools
+import logging
+import os
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from sqlalchemy import cast, func, text
+from sqlalchemy.dialects.postgresql import BIT, insert as pg_insert
+from sqlalchemy.orm import Session
+
+from ..models import ImageIdentification
+
+logger = logging.getLogger("cardstoard.identify_cache")
+
+IDENTIFY_CACHE_TTL_DAYS = int(os.getenv("IDENTIFY_CACHE_TTL_DAYS", "30"))
+IDENTIFY_CACHE_MAX_ROWS = int(os.getenv("IDENTIFY_CACHE_MAX_ROWS", "50000"))
+IDENTIFY_PHASH_MAX_DISTANCE = int(os.getenv("IDENTIFY_PHASH_MAX_DISTANCE", "2"))
+IDENTIFY_CACHE_EVICT_EVERY = int(os.getenv("IDENTIFY_CACHE_EVICT_EVERY", "100"))
+
+_EVICT_SQL = text("""
+    DELETE FROM image_identifications
+    WHERE created_at < :cutoff
+       OR id IN (
+           SELECT id FROM image_identifications
+           ORDER BY last_used_at DESC
+           OFFSET :max_rows
+       )
+""")
+
+_stores = itertools.count(1)
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def _distance(phash: int):
+    return func.bit_count(cast(ImageIdentification.phash.op("#")(phash), BIT(64)))
+
+
+def _result(row: ImageIdentification, include_grade: bool) -> dict:
+    return {
+        "fields": dict(row.fields),
+        "confidence": row.confidence,
+        "grade_estimate": row.grade_estimate if include_grade else None,
+    }
+
+
+def lookup_identification(db: Session, user_id: int, sha256: str, phash: int,
+                          include_grade: bool) -> Optional[dict]:
+    """Cached {"fields", "confidence", "grade_estimate"} for user_id's image, or None."""
+    try:
+        cutoff = _now() - timedelta(days=IDENTIFY_CACHE_TTL_DAYS)
+        live = db.query(ImageIdentification).filter(ImageIdentification.created_at >= cutoff)
+        row = live.filter(ImageIdentification.sha256 == sha256).first()
+        if row is not None and include_grade and row.grade_estimate is None:
+            row = None
+        if row is None and not include_grade:
+            d = _distance(phash)
+            row = (
+                live.filter(ImageIdentification.user_id == user_id, d <= IDENTIFY_PHASH_MAX_DISTANCE)
+                .order_by(d, ImageIdentification.last_used_at.desc())
+                .first()
+            )
+        if row is None:
+            return None
+        row.hits += 1
+        row.last_used_at = _now()
+        result = _result(row, include_grade)
+        db.commit()
+        return result
+    except Exception:
+        db.rollback()
+        logger.exception("identify-image cache lookup failed")
+        return None
+
+
+def store_identification(db: Session, user_id: int, sha256: str, phash: int, result: dict) -> None:
+    """Insert or replace the cached result for user_id's image; periodically evict expired / LRU rows."""
+    now = _now()
+    values = {
+        "phash": phash,
+        "user_id": user_id,
+        "fields": result["fields"],
+        "confidence": result["confidence"],
+        "grade_estimate": result.get("grade_estimate"),
+        "created_at": now,
+        "last_used_at": now,
+    }
+    try:
+        db.execute(
+            pg_insert(ImageIdentification.__table__)
+            .values(sha256=sha256, hits=0, **values)
+            .on_conflict_do_update(index_elements=["sha256"], set_=values)
+        )
+        if next(_stores) % IDENTIFY_CACHE_EVICT_EVERY == 0:
+            db.execute(_EVICT_SQL, {
+                "cutoff": now - timedelta(days=IDENTIFY_CACHE_TTL_DAYS),
+                "max_rows": IDENTIFY_CACHE_MAX_ROWS,
+            })
+        db.commit()
+    except Exception:
+        db.rollback()
+        logger.exception("identify-image cache store failed")
@@ -0,0 +1,58 @@
+# backend/app/services/image_prep.py
+"""
+CPU-bound image preparation for card identification.
+
+Kept free of database and web imports so the functions can run in the
+process pool used by POST /cards/identify-images (services/card_identify.py),
+whose workers are spawned fresh and import only this module and Pillow.
+
+  image_fingerprint  SHA-256 + 64-bit difference hash (identify cache key)
+  resize_image       downscale to MAX_IMAGE_DIM for the vision call
+  encode_image       resize_image + base64, as sent to the API
+"""
+
+import base64
+import hashlib
+import io
+
+from PIL import Image as PILImage
+
+MAX_IMAGE_DIM = 2100
+
+
+def image_fingerprint(content: bytes) -> tuple[str, int]:
+    """(sha256 hex, signed 64-bit difference hash) for raw image bytes."""
+    sha = hashlib.sha256(content).hexdigest()
+    img = PILImage.open(io.BytesIO(content))
+    img.draft("L", (64, 64))   # JPEG: decode straight at reduced scale
+    px = list(img.convert("L").resize((9, 8), PILImage.LANCZOS).getdata())
+    bits = 0
+    for row in range(8):
+        for col in range(8):
+            bits = (bits << 1) | (px[row * 9 + col] > px[row * 9 + col + 1])
+    if bits >= 1 << 63:        # store as BIGINT
+        bits -= 1 << 64
+    return sha, bits
+
+
+def resize_image(content: bytes, media_type: str) -> tuple[bytes, str]:
+    """Resize image to max 2100px on longest side. Returns (bytes, media_type)."""
+    img = PILImage.open(io.BytesIO(content))
+    # Convert RGBA or palette to RGB for JPEG compatibility
+    if img.mode not in ("RGB", "L"):
+        img = img.convert("RGB")
+        media_type = "image/jpeg"
+    if max(img.width, img.height) > MAX_IMAGE_DIM:
+        ratio = MAX_IMAGE_DIM / max(img.width, img.height)
+        new_size = (int(img.width * ratio), int(img.height * ratio))
+        img = img.resize(new_size, PILImage.LANCZOS)
+    fmt = "PNG" if media_type == "image/png" else "JPEG"
+    buf = io.BytesIO()
+    img.save(buf, format=fmt)
+    return buf.getvalue(), media_type
+
+
+def encode_image(content: bytes, media_type: str) -> tuple[str, str]:
+    """(base64 data, media_type) ready for an image content block."""
+    img_bytes, media_type = resize_image(content, media_type)
+    return base64.b64encode(img_bytes).decode(), media_type
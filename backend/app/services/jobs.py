@@ -0,0 +1,217 @@
+# backend/app/services/jobs.py
+"""
+In-process background job runner for long-running bulk operations.
+
+Bulk endpoints (card CSV import, revalue-all, restore, bulk image import,
+dictionary value import, seed-values-from-cards) accept ?async=true. In that
+mode the request only validates its input, persists a Job row, hands the work
+to a small thread pool and returns 202 with the job id. The uvicorn worker and
+its pooled DB connection are released immediately; the job runs on its own
+session and reports progress back to the jobs table.
+
+Worker functions share one signature so the same code serves both modes:
+
+    def _do_thing(db: Session, ctx: JobContext, user: User, *args) -> dict
+
+  - db    — session owned by the caller; the runner commits it on success
+            and rolls it back on failure/cancel
+  - ctx   — ctx.progress(done, total, message) records progress and raises
+            JobCancelled if a cancel was requested. Synchronous callers pass
+            NO_PROGRESS, whose progress() is a no-op.
+  - user  — User with .settings loaded (same as get_current_user returns)
+  - returns a JSON-serializable result dict (stored on Job.result)
+
+submit_job(..., after_commit=fn) runs fn() once the job's work has committed
+(e.g. to invalidate an in-process cache, which must not reload pre-commit data).
+
+Progress/status writes use short-lived sessions of their own so they never
+commit the job's in-flight work. Pool size: JOB_WORKERS env var (default 2),
+kept well under database.py's pool_size so jobs can't starve interactive traffic.
+"""
+
+import logging
+import os
+import socket
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
+from fastapi import HTTPException
+from fastapi.responses import JSONResponse
+from sqlalchemy import update
+from sqlalchemy.orm import Session, joinedload
+
+from ..database import SessionLocal
+from ..models import Job, User
+
+logger = logging.getLogger("cardstoard.jobs")
+
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "2"))
+
+_executor = ThreadPoolExecutor(max_workers=JOB_WORKERS, thread_name_prefix="cardstoard-job")
+
+TERMINAL_STATUSES = {"succeeded", "failed", "cancelled"}
+
+# Identifies the process that owns a job; uvicorn runs several workers per container
+WORKER_ID = f"{socket.gethostname()}:{os.getpid()}"
+
+
+class JobCancelled(Exception):
+    """Raised from JobContext.progress() when the job's cancel flag is set."""
+
+
+class JobContext:
+    """Progress reporter + cancellation check handed to worker functions."""
+
+    def __init__(self, job_id: int):
+        self.job_id = job_id
+        self._last_pct = -1
+
+    def progress(self, done: int, total: int, message: str | None = None):
+        """
+        Record progress as a percentage of total. Only writes when the whole
+        percentage changes (at most ~100 writes per job), and checks the cancel
+        flag on each write.
+        """
+        pct = min(99, int(done * 100 / total)) if total else 0
+        if pct == self._last_pct and message is None:
+            return
+        self._last_pct = pct
+        with SessionLocal() as s:
+            job = s.get(Job, self.job_id)
+            if job is None:
+                return
+            if job.cancel_requested:
+                raise JobCancelled()
+            job.progress = pct
+            if message is not None:
+                job.message = message
+            s.commit()
+
+
+class _NoProgress:
+    """Stand-in context for synchronous (non-job) calls."""
+
+    def progress(self, done: int, total: int, message: str | None = None):
+        pass
+
+
+NO_PROGRESS = _NoProgress()
+
+
+def _finish(job_id: int, status: str, result=None, error: str | None = None):
+    with SessionLocal() as s:
+        job = s.get(Job, job_id)
+        if job is None:
+            return
+        job.status = status
+        job.finished_at = datetime.now(timezone.utc)
+        if status == "succeeded":
+            job.progress = 100
+            job.result = result
+            if isinstance(result, dict) and result.get("message"):
+                job.message = result["message"]
+        if error is not None:
+            job.error = error
+        s.commit()
+
+
+def _start(job_id: int) -> bool:
+    """
+    Flip queued → running in one conditional UPDATE, so it cannot interleave
+    with a cancel. Returns False if the job was cancelled while queued.
+    """
+    with SessionLocal() as s:
+        started = s.execute(
+            update(Job)
+            .where(Job.id == job_id, Job.status == "queued")
+            .values(status="running", started_at=datetime.now(timezone.utc))
+        ).rowcount
+        s.commit()
+        return started == 1
+
+
+def _run(job_id: int, user_id: int, fn, args, kwargs, after_commit=None):
+    if not _start(job_id):
+        return
+    db = SessionLocal()
+    try:
+        user = (
+            db.query(User)
+            .options(joinedload(User.settings))
+            .filter(User.id == user_id)
+            .first()
+        )
+        if user is None:
+            raise HTTPException(404, "User not found")
+        result = fn(db, JobContext(job_id), user, *args, **kwargs)
+        db.commit()
+        if after_commit is not None:
+            try:
+                after_commit()
+            except Exception:
+                logger.exception("Job %s after-commit hook failed", job_id)
+        _finish(job_id, "succeeded", result=result)
+    except JobCancelled:
+        db.rollback()
+        _finish(job_id, "cancelled")
+    except HTTPException as e:
+        db.rollback()
+        _finish(job_id, "failed", error=str(e.detail))
+    except Exception as e:
+        db.rollback()
+        logger.exception("Job %s failed", job_id)
+        _finish(job_id, "failed", error=repr(e))
+    finally:
+        db.close()
+
+
+def submit_job(db: Session, user: User, kind: str, fn, *args, after_commit=None, **kwargs) -> Job:
+    """
+    Persist a queued Job for user and schedule fn on the worker pool.
+    after_commit, if given, is called with no arguments after fn's work commits.
+    """
+    job = Job(user_id=user.id, kind=kind, status="queued", progress=0, worker=WORKER_ID)
+    db.add(job)
+    db.commit()
+    db.refresh(job)
+    _executor.submit(_run, job.id, user.id, fn, args, kwargs, after_commit)
+    return job
+
+
+def accepted(job: Job) -> JSONResponse:
+    """202 response returned by endpoints running in async mode."""
+    return JSONResponse(
+        status_code=202,
+        content={"job_id": job.id, "kind": job.kind, "status": job.status, "poll": f"/jobs/{job.id}"},
+    )
+
+
+def _worker_alive(worker: str | None) -> bool:
+    host, _, pid = (worker or "").rpartition(":")
+    if host != socket.gethostname() or not pid.isdigit():
+        return False   # previous container, or unknown owner
+    try:
+        os.kill(int(pid), 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def fail_interrupted_jobs(db: Session) -> int:
+    """
+    Startup hook: jobs left queued/running by a process that no longer exists can
+    never finish. Jobs owned by sibling workers that are still alive are left alone.
+    """
+    orphans = [
+        job for job in db.query(Job).filter(Job.status.in_(("queued", "running"))).all()
+        if not _worker_alive(job.worker)
+    ]
+    now = datetime.now(timezone.utc)
+    for job in orphans:
+        job.status = "failed"
+        job.error = "Interrupted by server restart"
+        job.finished_at = now
+    db.commit()
+    return len(orphans)
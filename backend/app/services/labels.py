@@ -0,0 +1,311 @@
+# backend/app/services/labels.py
+"""
+QR label rendering: cached QR PNGs and printable label sheets.
+
+QR codes
+  Every label endpoint (GET /{cards|balls|boxes|wax|packs}/{id}/public,
+  /cards/labels/*) encodes the item's public URL. The PNG depends only on
+  that URL, so it is cached by content key — sha256(QR_RENDER_VERSION | url):
+
+    memory  LRU of LABEL_QR_CACHE_SIZE PNGs per process
+    disk    LABEL_QR_CACHE_DIR/{key[:2]}/{key}.png, shared by all workers
+            and kept across restarts
+
+  Batches (qr_pngs) render their cache misses in a spawned process pool of
+  LABEL_QR_WORKERS once there are at least LABEL_QR_POOL_MIN of them; qrcode
+  is pure Python, so threads would not help.
+
+Label sheets
+  label_sheet_pdf / label_sheet_png rasterize labels at SHEET_DPI onto US
+  Letter pages laid out like the BatchLabels print view (4 × 14 labels of
+  1.75" × 0.75"). The PDF is written one page at a time — each page's image is
+  rendered, compressed and yielded before the next page's QR codes are even
+  looked up — so a sheet for a whole collection streams from the first page
+  with flat memory.
+
+Kept free of database and web imports so the process pool's spawned workers
+import only this module, qrcode and Pillow.
+"""
+
+import base64
+import hashlib
+import io
+import multiprocessing
+import os
+import threading
+import zlib
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+
+import qrcode
+from PIL import Image as PILImage, ImageDraw, ImageFont
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+LABEL_QR_CACHE_SIZE = int(os.getenv("LABEL_QR_CACHE_SIZE", "5000"))
+LABEL_QR_CACHE_DIR = os.getenv("LABEL_QR_CACHE_DIR", os.path.join(BASE_DIR, "cache", "qr"))
+LABEL_QR_WORKERS = int(os.getenv("LABEL_QR_WORKERS", "2"))
+LABEL_QR_POOL_MIN = int(os.getenv("LABEL_QR_POOL_MIN", "32"))
+
+# Bump when render_qr_png's output changes, so cached PNGs are not reused
+QR_RENDER_VERSION = "1"
+
+
+# ---------------------------------------------------------------------------
+# QR codes
+# ---------------------------------------------------------------------------
+def render_qr_png(url: str) -> bytes:
+    """QR code PNG for url, as the label endpoints have always drawn it."""
+    qr = qrcode.QRCode(version=1, box_size=10, border=2)
+    qr.add_data(url)
+    qr.make(fit=True)
+    img = qr.make_image(fill_color="black", back_color="white")
+    buf = io.BytesIO()
+    img.save(buf, format="PNG")
+    return buf.getvalue()
+
+
+_memory: OrderedDict[str, bytes] = OrderedDict()
+_memory_lock = threading.Lock()
+
+
+def _cache_key(url: str) -> str:
+    return hashlib.sha256(f"{QR_RENDER_VERSION}|{url}".encode()).hexdigest()
+
+
+def _disk_path(key: str) -> str:
+    return os.path.join(LABEL_QR_CACHE_DIR, key[:2], f"{key}.png")
+
+
+def _remember(key: str, png: bytes) -> None:
+    with _memory_lock:
+        _memory[key] = png
+        _memory.move_to_end(key)
+        while len(_memory) > LABEL_QR_CACHE_SIZE:
+            _memory.popitem(last=False)
+
+
+def _cached(key: str):
+    with _memory_lock:
+        png = _memory.get(key)
+        if png is not None:
+            _memory.move_to_end(key)
+            return png
+    try:
+        with open(_disk_path(key), "rb") as f:
+            png = f.read()
+    except OSError:
+        return None
+    _remember(key, png)
+    return png
+
+
+def _store(key: str, png: bytes) -> None:
+    _remember(key, png)
+    path = _disk_path(key)
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.{os.getpid()}-{threading.get_ident()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(png)
+        os.replace(tmp, path)
+    except OSError:
+        pass   # disk cache is best-effort; the memory cache still has it
+
+
+def qr_png(url: str) -> bytes:
+    key = _cache_key(url)
+    png = _cached(key)
+    if png is None:
+        png = render_qr_png(url)
+        _store(key, png)
+    return png
+
+
+def qr_b64(url: str) -> str:
+    """Base64 QR PNG, the "qr_b64" field of the label endpoints."""
+    return base64.b64encode(qr_png(url)).decode()
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def _qr_pool() -> ProcessPoolExecutor:
+    # spawn: workers import only this module, not a copy of the running server
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(
+                max_workers=LABEL_QR_WORKERS,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _pool
+
+
+def shutdown_label_pool() -> None:
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(cancel_futures=True)
+            _pool = None
+
+
+def qr_pngs(urls: list[str]) -> list[bytes]:
+    """QR PNGs for many URLs, in order; misses are rendered in parallel."""
+    keys = [_cache_key(u) for u in urls]
+    pngs = [_cached(k) for k in keys]
+    misses = [i for i, png in enumerate(pngs) if png is None]
+    missing_urls = list(dict.fromkeys(urls[i] for i in misses))
+    if not missing_urls:
+        return pngs
+
+    if len(missing_urls) >= LABEL_QR_POOL_MIN and LABEL_QR_WORKERS > 1:
+        rendered = _qr_pool().map(render_qr_png, missing_urls, chunksize=16)
+    else:
+        rendered = map(render_qr_png, missing_urls)
+    by_url = {}
+    for url, png in zip(missing_urls, rendered):
+        _store(_cache_key(url), png)
+        by_url[url] = png
+    for i in misses:
+        pngs[i] = by_url[urls[i]]
+    return pngs
+
+
+# ---------------------------------------------------------------------------
+# Label sheets
+# ---------------------------------------------------------------------------
+SHEET_DPI = 300
+
+# US Letter, 0.25" margins, 4 columns of 1.75" × 0.75" labels with 0.25" gutters
+_PAGE_IN = (8.5, 11.0)
+_MARGIN_IN = 0.25
+_LABEL_IN = (1.75, 0.75)
+_GUTTER_IN = 0.25
+_COLUMNS = 4
+_ROWS = int((_PAGE_IN[1] - 2 * _MARGIN_IN) // _LABEL_IN[1])
+LABELS_PER_PAGE = _COLUMNS * _ROWS
+
+
+def _px(inches: float) -> int:
+    return round(inches * SHEET_DPI)
+
+
+def _font(points: float):
+    size = round(points * SHEET_DPI / 72)
+    try:
+        return ImageFont.load_default(size=size)
+    except TypeError:   # Pillow built without FreeType: fixed-size bitmap font
+        return ImageFont.load_default()
+
+
+_FONT_ID = _font(7)
+_FONT_TEXT = _font(6.5)
+
+
+def page_count(n_labels: int) -> int:
+    return max(1, -(-n_labels // LABELS_PER_PAGE))
+
+
+def render_sheet_page(labels: list[tuple[bytes, list[str]]]) -> PILImage.Image:
+    """
+    One page (grayscale, SHEET_DPI) for up to LABELS_PER_PAGE labels, each a
+    (QR PNG, [label id, more lines...]) pair, filled row by row.
+    """
+    page = PILImage.new("L", (_px(_PAGE_IN[0]), _px(_PAGE_IN[1])), 255)
+    draw = ImageDraw.Draw(page)
+    label_h = _px(_LABEL_IN[1])
+    pad = _px(0.04)
+    qr_side = _px(0.62)
+
+    for i, (png, lines) in enumerate(labels[:LABELS_PER_PAGE]):
+        row, col = divmod(i, _COLUMNS)
+        x = _px(_MARGIN_IN + col * (_LABEL_IN[0] + _GUTTER_IN))
+        y = _px(_MARGIN_IN + row * _LABEL_IN[1])
+
+        qr = PILImage.open(io.BytesIO(png)).convert("L").resize((qr_side, qr_side), PILImage.NEAREST)
+        page.paste(qr, (x + pad, y + (label_h - qr_side) // 2))
+
+        fonts = [_FONT_ID] + [_FONT_TEXT] * (len(lines) - 1)
+        heights = [draw.textbbox((0, 0), "Ag", font=f)[3] for f in fonts]
+        line_gap = _px(0.02)
+        ty = y + (label_h - sum(heights) - line_gap * (len(lines) - 1)) // 2
+        tx = x + pad + qr_side + _px(0.05)
+        for text, font, h in zip(lines, fonts, heights):
+            draw.text((tx, ty), text, fill=0, font=font)
+            ty += h + line_gap
+    return page
+
+
+def _pages(labels):
+    """Yield rendered pages; QR codes are fetched per page, so memory stays flat."""
+    for start in range(0, max(len(labels), 1), LABELS_PER_PAGE):
+        chunk = labels[start:start + LABELS_PER_PAGE]
+        pngs = qr_pngs([url for url, _ in chunk])
+        yield render_sheet_page([(png, lines) for png, (_, lines) in zip(pngs, chunk)])
+
+
+def label_sheet_png(labels: list[tuple[str, list[str]]], page: int) -> bytes:
+    """PNG of one sheet page (1-based). labels: (QR url, text lines) per label."""
+    start = (page - 1) * LABELS_PER_PAGE
+    chunk = labels[start:start + LABELS_PER_PAGE]
+    img = next(_pages(chunk))
+    buf = io.BytesIO()
+    img.save(buf, format="PNG", dpi=(SHEET_DPI, SHEET_DPI), optimize=True)
+    return buf.getvalue()
+
+
+def label_sheet_pdf(labels: list[tuple[str, list[str]]]):
+    """
+    Yield a PDF of the whole sheet in pieces, one page per piece (plus header
+    and trailer). Each page is a single full-page grayscale image.
+    """
+    n_pages = page_count(len(labels))
+    width_pt, height_pt = (round(v * 72) for v in _PAGE_IN)
+    offsets = {}
+    written = 0
+
+    def obj(num: int, body: bytes) -> bytes:
+        nonlocal written
+        offsets[num] = written
+        data = f"{num} 0 obj\n".encode() + body + b"\nendobj\n"
+        written += len(data)
+        return data
+
+    def emit(data: bytes) -> bytes:
+        nonlocal written
+        written += len(data)
+        return data
+
+    # 1 catalog, 2 page tree, then image / contents / page per sheet page
+    page_nums = [3 + 3 * i + 2 for i in range(n_pages)]
+    head = emit(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+    head += obj(1, b"<< /Type /Catalog /Pages 2 0 R >>")
+    kids = " ".join(f"{n} 0 R" for n in page_nums)
+    head += obj(2, f"<< /Type /Pages /Kids [{kids}] /Count {n_pages} >>".encode())
+    yield head
+
+    for i, img in enumerate(_pages(labels)):
+        image_num, contents_num, page_num = 3 + 3 * i, 4 + 3 * i, 5 + 3 * i
+        pixels = zlib.compress(img.tobytes(), 6)
+        content = f"q {width_pt} 0 0 {height_pt} 0 0 cm /Im0 Do Q".encode()
+        yield (
+            obj(image_num,
+                f"<< /Type /XObject /Subtype /Image /Width {img.width} /Height {img.height} "
+                f"/ColorSpace /DeviceGray /BitsPerComponent 8 /Filter /FlateDecode "
+                f"/Length {len(pixels)} >>\nstream\n".encode() + pixels + b"\nendstream")
+            + obj(contents_num,
+                  f"<< /Length {len(content)} >>\nstream\n".encode() + content + b"\nendstream")
+            + obj(page_num,
+                  f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 {width_pt} {height_pt}] "
+                  f"/Resources << /XObject << /Im0 {image_num} 0 R >> >> "
+                  f"/Contents {contents_num} 0 R >>".encode())
+        )
+
+    xref_at = written
+    size = 3 + 3 * n_pages
+    xref = [f"xref\n0 {size}\n", "0000000000 65535 f \n"]
+    xref += [f"{offsets[n]:010d} 00000 n \n" for n in range(1, size)]
+    xref.append(f"trailer\n<< /Size {size} /Root 1 0 R >>\nstartxref\n{xref_at}\n%%EOF\n")
+    yield "".join(xref).encode()
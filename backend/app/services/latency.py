@@ -0,0 +1,43 @@
+# backend/app/services/latency.py
+"""
+In-process latency tracking for GET /admin/auth-metrics.
+
+LatencyStats keeps the last LATENCY_WINDOW samples of a timed operation and
+reports count / p50 / p95 / max in milliseconds. Per uvicorn worker, reset on
+restart — a cheap window onto "is this slow right now", not a metrics store.
+"""
+
+import os
+import threading
+from collections import deque
+
+LATENCY_WINDOW = int(os.getenv("LATENCY_WINDOW", "1000"))
+
+
+def _percentile(ordered: list, pct: float) -> float:
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct))]
+
+
+class LatencyStats:
+    def __init__(self, window: int = LATENCY_WINDOW):
+        self._samples = deque(maxlen=window)
+        self._count = 0
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float) -> None:
+        with self._lock:
+            self._samples.append(seconds * 1000)
+            self._count += 1
+
+    def summary(self) -> dict:
+        with self._lock:
+            ordered = sorted(self._samples)
+            count = self._count
+        if not ordered:
+            return {"count": count, "p50_ms": None, "p95_ms": None, "max_ms": None}
+        return {
+            "count": count,
+            "p50_ms": round(_percentile(ordered, 0.50), 1),
+            "p95_ms": round(_percentile(ordered, 0.95), 1),
+            "max_ms": round(ordered[-1], 1),
+        }
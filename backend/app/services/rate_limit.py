@@ -0,0 +1,162 @@
+# backend/app/services/rate_limit.py
+"""
+Token-bucket rate limiting.
+
+Each key (a user id, an IP, ...) gets a bucket holding up to `capacity`
+tokens that refills continuously at `refill_per_second`. take() spends one
+token, or reports how long until one is available.
+
+Backends share that interface (RateLimitBackend):
+
+  TokenBuckets       in-process; buckets live in a bounded LRU map, so memory
+                     stays flat however many keys are seen and an evicted
+                     bucket simply starts over full. Per process — with N
+                     uvicorn workers a client can get up to N times the
+                     configured rate, which is acceptable for abuse protection.
+  RedisTokenBuckets  shared by every worker; the bucket update is one Lua
+                     script, so it is atomic. Falls back to a TokenBuckets of
+                     its own while Redis is unreachable. Needs the `redis`
+                     package.
+
+make_buckets() picks one from RATE_LIMIT_BACKEND ("memory", the default, or
+"redis" with RATE_LIMIT_REDIS_URL — e.g. the compose `redis` profile's local
+stand-in). enforce() turns an empty bucket into 429 + Retry-After.
+"""
+
+import logging
+import math
+import os
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+
+from fastapi import HTTPException
+
+logger = logging.getLogger("cardstoard.rate_limit")
+
+RATE_LIMIT_BACKEND   = os.getenv("RATE_LIMIT_BACKEND", "memory")
+RATE_LIMIT_REDIS_URL = os.getenv("RATE_LIMIT_REDIS_URL", "redis://localhost:6379/0")
+
+
+class RateLimitBackend(ABC):
+    """Interface of a rate limiter: per-key token buckets with one capacity / refill rate."""
+
+    capacity: float
+    refill_per_second: float
+
+    @abstractmethod
+    def take(self, key, cost: float = 1.0) -> float:
+        """Spend cost tokens. Returns 0.0 if allowed, else seconds until it would be."""
+
+    @abstractmethod
+    def reset(self, key) -> None:
+        """Forget key's bucket (it starts over full)."""
+
+
+class TokenBuckets(RateLimitBackend):
+    """Per-key token buckets in this process. Thread-safe."""
+
+    def __init__(self, capacity: float, refill_per_second: float, max_keys: int = 10_000):
+        self.capacity = float(capacity)
+        self.refill_per_second = float(refill_per_second)
+        self.max_keys = max_keys
+        self._lock = threading.Lock()
+        self._buckets: OrderedDict = OrderedDict()   # key → [tokens, last_refill]
+
+    def take(self, key, cost: float = 1.0) -> float:
+        """Spend cost tokens. Returns 0.0 if allowed, else seconds until it would be."""
+        now = time.monotonic()
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = [self.capacity, now]
+                self._buckets[key] = bucket
+                if len(self._buckets) > self.max_keys:
+                    self._buckets.popitem(last=False)
+            else:
+                self._buckets.move_to_end(key)
+                bucket[0] = min(self.capacity, bucket[0] + (now - bucket[1]) * self.refill_per_second)
+                bucket[1] = now
+            if bucket[0] >= cost:
+                bucket[0] -= cost
+                return 0.0
+            if self.refill_per_second <= 0:
+                return math.inf
+            return (cost - bucket[0]) / self.refill_per_second
+
+    def reset(self, key):
+        """Forget key's bucket (it starts over full)."""
+        with self._lock:
+            self._buckets.pop(key, None)
+
+
+# KEYS[1] bucket hash; ARGV capacity, refill/s, cost, now (s). Returns the wait in seconds
+# (as a string: Lua numbers are truncated to integers on the way back).
+_REDIS_TAKE = """
+local b = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local capacity, rate, cost, now = tonumber(ARGV[1]), tonumber(ARGV[2]), tonumber(ARGV[3]), tonumber(ARGV[4])
+local tokens = tonumber(b[1]) or capacity
+local ts = tonumber(b[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+local wait = 0
+if tokens >= cost then
+    tokens = tokens - cost
+elseif rate > 0 then
+    wait = (cost - tokens) / rate
+else
+    wait = -1
+end
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'ts', now)
+if rate > 0 then
+    redis.call('EXPIRE', KEYS[1], math.ceil(capacity / rate) + 1)
+end
+return tostring(wait)
+"""
+
+
+class RedisTokenBuckets(RateLimitBackend):
+    """Token buckets in Redis, shared by all workers. Keys: ratelimit:{name}:{key}."""
+
+    def __init__(self, name: str, capacity: float, refill_per_second: float, url: str = RATE_LIMIT_REDIS_URL):
+        import redis   # optional dependency, only needed for this backend
+
+        self.capacity = float(capacity)
+        self.refill_per_second = float(refill_per_second)
+        self.prefix = f"ratelimit:{name}:"
+        self._redis = redis.Redis.from_url(url, socket_timeout=0.5, socket_connect_timeout=0.5)
+        self._take = self._redis.register_script(_REDIS_TAKE)
+        self._fallback = TokenBuckets(capacity, refill_per_second)
+
+    def take(self, key, cost: float = 1.0) -> float:
+        try:
+            wait = float(self._take(
+                keys=[f"{self.prefix}{key}"],
+                args=[self.capacity, self.refill_per_second, cost, time.time()],
+            ))
+        except Exception as e:
+            logger.warning("Redis rate limiter unavailable, limiting in-process: %s", e)
+            return self._fallback.take(key, cost)
+        return math.inf if wait < 0 else wait
+
+    def reset(self, key) -> None:
+        self._fallback.reset(key)
+        try:
+            self._redis.delete(f"{self.prefix}{key}")
+        except Exception as e:
+            logger.warning("Redis rate limiter unavailable: %s", e)
+
+
+def make_buckets(name: str, capacity: float, refill_per_second: float) -> RateLimitBackend:
+    """A limiter from the configured backend; name namespaces its keys in shared backends."""
+    if RATE_LIMIT_BACKEND == "redis":
+        return RedisTokenBuckets(name, capacity, refill_per_second)
+    return TokenBuckets(capacity, refill_per_second)
+
+
+def enforce(buckets: RateLimitBackend, key, detail: str) -> None:
+    """take() one token for key, or raise 429 with a Retry-After header."""
+    wait = buckets.take(key)
+    if wait:
+        retry_after = str(max(1, math.ceil(wait))) if math.isfinite(wait) else "3600"
+        raise HTTPException(status_code=429, detail=detail, headers={"Retry-After": retry_after})
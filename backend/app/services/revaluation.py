@@ -0,0 +1,191 @@
+# backend/app/services/revaluation.py
+"""
+Set-based revaluation engine for POST /cards/revalue-all, plus the incremental
+pass PUT /settings/ runs when valuation factors change.
+
+Expresses the card_value.py formula as SQL so a whole collection is revalued,
+and its ValuationHistory snapshot written, in one statement — no ORM objects
+are loaded and no per-card UPDATEs are flushed.
+
+Parity with the Python functions (checked by the VALUATION suite in
+utils/functional_test.py, which compares this path against POST /cards/{id}/value):
+
+  pick_avg_book        — books summed left-to-right in float8 with NULLs as 0.0
+                         (adding 0.0 is exact, so the sum is bit-identical),
+                         divided by the non-null count, rounded to cents with
+                         py_round_cents() (migration 030), a bit-exact twin of
+                         Python round(x, 2).
+  calculate_market_factor
+                       — same branch order; math.isclose() is spelled out with its
+                         default rel_tol so grade matching is identical; autograph
+                         uses Python truthiness of card_attributes['autograph'].
+  calculate_card_value — round(avg * grade * factor); PostgreSQL round(float8)
+                         is rint(), half-to-even like Python round(). NULL when any
+                         input is missing (grade 0 counts as missing, as in the
+                         old revalue loop).
+"""
+
+from datetime import datetime, timezone
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+
+def _isclose(col: str, target: float) -> str:
+    """SQL spelling of math.isclose(col, target) with the default rel_tol=1e-09."""
+    return f"abs({col} - {target}) <= 1e-09 * greatest(abs({col}), {abs(target)})"
+
+
+# Python truthiness of card_attributes['autograph'] (column may be json or jsonb)
+_IS_AUTO = """
+    CASE jsonb_typeof(c.card_attributes::jsonb -> 'autograph')
+        WHEN 'boolean' THEN (c.card_attributes::jsonb ->> 'autograph')::boolean
+        WHEN 'string'  THEN (c.card_attributes::jsonb ->> 'autograph') <> ''
+        WHEN 'number'  THEN (c.card_attributes::jsonb ->> 'autograph')::numeric <> 0
+        WHEN 'array'   THEN jsonb_array_length(c.card_attributes::jsonb -> 'autograph') > 0
+        WHEN 'object'  THEN (c.card_attributes::jsonb -> 'autograph') <> '{}'::jsonb
+        ELSE false
+    END
+"""
+
+_IS_ROOKIE = "coalesce(c.rookie, false)"
+
+_GRADE = "coalesce(c.grade, 0)"
+
+# calculate_market_factor() branches in order: (SQL condition, GlobalSettings factor column)
+_FACTOR_BRANCHES = (
+    (_IS_AUTO,                                    "auto_factor"),
+    (f"{_isclose(_GRADE, 3.0)} AND {_IS_ROOKIE}", "rookie_mt_factor"),
+    (_isclose(_GRADE, 3.0),                       "mtgrade_factor"),
+    (_IS_ROOKIE,                                  "rookie_factor"),
+    (_isclose(_GRADE, 1.5),                       "exgrade_factor"),
+    (_isclose(_GRADE, 1.0),                       "vggrade_factor"),
+    (_isclose(_GRADE, 0.8),                       "gdgrade_factor"),
+    (_isclose(_GRADE, 0.4),                       "frgrade_factor"),
+    (_isclose(_GRADE, 0.2),                       "prgrade_factor"),
+)
+
+# Settings columns that feed card values; changing any of them calls for a revalue
+FACTOR_FIELDS = tuple(field for _, field in _FACTOR_BRANCHES)
+
+# Mirrors calculate_market_factor() branch-for-branch
+MARKET_FACTOR_SQL = (
+    "CASE "
+    + " ".join(f"WHEN {cond} THEN s.{field}" for cond, field in _FACTOR_BRANCHES)
+    + " ELSE 1.0::float8 END"
+)
+
+# Which factor column a card's value reads (NULL for the fixed 1.0 fallback)
+FACTOR_BUCKET_SQL = (
+    "CASE "
+    + " ".join(f"WHEN {cond} THEN '{field}'" for cond, field in _FACTOR_BRANCHES)
+    + " END"
+)
+
+_BOOKS = ("book_high", "book_high_mid", "book_mid", "book_low_mid", "book_low")
+
+_BOOK_SUM = " + ".join(f"coalesce(c.{b}, 0.0::float8)" for b in _BOOKS)
+_BOOK_COUNT = " + ".join(f"(c.{b} IS NOT NULL)::int" for b in _BOOKS)
+
+# Mirrors pick_avg_book(): NULL when no book values are present
+AVG_BOOK_SQL = f"""
+    CASE WHEN ({_BOOK_COUNT}) = 0 THEN NULL
+         ELSE py_round_cents(({_BOOK_SUM}) / ({_BOOK_COUNT})::float8)
+    END
+"""
+
+# Mirrors calculate_card_value(avg_book, g, factor)
+CARD_VALUE_SQL = f"""
+    round((({AVG_BOOK_SQL}) * NULLIF(c.grade, 0)) * ({MARKET_FACTOR_SQL}))
+"""
+
+# calc    — new value for every card in scope (the UPDATE ... FROM source)
+# changed — UPDATE only rows whose value actually moves, bumping updated_at
+#           the same way the ORM onupdate hook did
+# snap    — ValuationHistory row aggregated from calc in the same statement;
+#           HAVING skips the snapshot for an empty collection
+def _revalue_sql(scope: str = "", snapshot: bool = True):
+    snap = """
+    snap AS (
+        INSERT INTO valuation_history (user_id, "timestamp", total_value, card_count)
+        SELECT :user_id, :now, coalesce(sum(new_value), 0), count(*)
+        FROM calc
+        HAVING count(*) > 0
+        RETURNING total_value, card_count
+    )""" if snapshot else """
+    snap AS (
+        SELECT NULL::float8 AS total_value
+    )"""
+    return text(f"""
+    WITH calc AS (
+        SELECT c.id, {CARD_VALUE_SQL} AS new_value
+        FROM cards c
+        JOIN global_settings s ON s.id = :settings_id
+        WHERE c.user_id = :user_id {scope}
+    ),
+    changed AS (
+        UPDATE cards AS c
+        SET value = calc.new_value,
+            updated_at = :now
+        FROM calc
+        WHERE c.id = calc.id
+          AND c.value IS DISTINCT FROM calc.new_value
+        RETURNING c.id
+    ),{snap}
+    SELECT
+        (SELECT count(*) FROM calc)    AS card_count,
+        (SELECT count(*) FROM changed) AS changed_count,
+        (SELECT total_value FROM snap) AS total_value
+    """)
+
+
+_REVALUE_SQL = _revalue_sql()
+
+# Incremental variant: only cards whose factor branch reads one of :fields.
+# No snapshot — the totals of a partial pass would not describe the collection.
+_REVALUE_BUCKETS_SQL = _revalue_sql(f"AND ({FACTOR_BUCKET_SQL}) = ANY(:fields)", snapshot=False)
+
+
+def _row_result(row) -> dict:
+    return {
+        "card_count": row.card_count,
+        "changed_count": row.changed_count,
+        "total_value": float(row.total_value) if row.total_value is not None else None,
+    }
+
+
+def revalue_user_cards(db: Session, user_id: int, settings_id: int) -> dict:
+    """
+    Revalue every card owned by user_id using the GlobalSettings row settings_id,
+    and record a ValuationHistory snapshot. Caller commits.
+
+    Returns {"card_count", "changed_count", "total_value"}; total_value is None
+    when the user has no cards (no snapshot is written).
+    """
+    row = db.execute(
+        _REVALUE_SQL,
+        {"user_id": user_id, "settings_id": settings_id, "now": datetime.now(timezone.utc)},
+    ).one()
+    return _row_result(row)
+
+
+def revalue_factor_buckets(db: Session, user_id: int, settings_id: int, fields) -> dict:
+    """
+    Revalue only the cards whose market factor comes from one of the given
+    GlobalSettings columns (see FACTOR_FIELDS) — used when those factors change.
+    Settings changes must be flushed first. Caller commits. Same return shape
+    as revalue_user_cards(), with total_value always None.
+    """
+    fields = [f for f in fields if f in FACTOR_FIELDS]
+    if not fields:
+        return {"card_count": 0, "changed_count": 0, "total_value": None}
+    row = db.execute(
+        _REVALUE_BUCKETS_SQL,
+        {
+            "user_id": user_id,
+            "settings_id": settings_id,
+            "fields": fields,
+            "now": datetime.now(timezone.utc),
+        },
+    ).one()
+    return _row_result(row)
@@ -0,0 +1,124 @@
+# backend/app/services/set_import.py
+"""
+Set checklist import, shared by POST /sets/import-csv and seed_sets.py.
+
+CSV: SetName, Brand, Year, CardNumber, First, Last, Rookie
+
+All rows are COPY-loaded into a temp staging table, then two set-based
+statements do the work:
+
+  1. INSERT INTO sets ... ON CONFLICT DO NOTHING — one row per new
+     (name, brand, year), matched case-insensitively (ux_sets_key, 038)
+  2. INSERT INTO set_entries ... ON CONFLICT (set_id, card_number) DO NOTHING
+     (ux_set_entries_set_card, 038)
+
+Counts come from RETURNING. Existing entries are never modified; a card
+number repeated within the file keeps its first row.
+
+Works on a raw psycopg2 cursor (seed_sets.py has no SQLAlchemy session; the
+route passes db.connection().connection.cursor()) and only imports the
+standard library, so the seeder can use it outside the app. Caller commits.
+"""
+
+import csv
+import io
+
+SET_CSV_HEADERS = {"SetName", "Brand", "Year", "CardNumber", "First", "Last", "Rookie"}
+
+_CREATE_STAGE = """
+    DROP TABLE IF EXISTS set_import_stage;
+    CREATE TEMP TABLE set_import_stage (
+        ord         INTEGER NOT NULL,
+        set_name    VARCHAR NOT NULL,
+        brand       VARCHAR NOT NULL,
+        year        INTEGER NOT NULL,
+        card_number VARCHAR NOT NULL,
+        first_name  VARCHAR,
+        last_name   VARCHAR,
+        rookie      BOOLEAN NOT NULL
+    ) ON COMMIT DROP
+"""
+
+# FORCE_NOT_NULL: an empty CardNumber stays '' (as the ORM import stored it), not NULL
+_COPY_STAGE = "COPY set_import_stage FROM STDIN WITH (FORMAT csv, FORCE_NOT_NULL (set_name, brand, card_number))"
+
+_UPSERT_SETS = """
+    INSERT INTO sets (name, brand, year)
+    SELECT DISTINCT ON (lower(set_name), lower(brand), year) set_name, brand, year
+    FROM set_import_stage
+    ORDER BY lower(set_name), lower(brand), year, ord
+    ON CONFLICT ((lower(name)), (lower(brand)), year) DO NOTHING
+    RETURNING id
+"""
+
+_COUNT_SETS = """
+    SELECT count(*) FROM (
+        SELECT DISTINCT lower(set_name), lower(brand), year FROM set_import_stage
+    ) keys
+"""
+
+_UPSERT_ENTRIES = """
+    INSERT INTO set_entries (set_id, card_number, first_name, last_name, rookie)
+    SELECT DISTINCT ON (s.id, st.card_number)
+           s.id, st.card_number, st.first_name, st.last_name, st.rookie
+    FROM set_import_stage st
+    JOIN sets s
+      ON lower(s.name) = lower(st.set_name)
+     AND lower(s.brand) = lower(st.brand)
+     AND s.year = st.year
+    ORDER BY s.id, st.card_number, st.ord
+    ON CONFLICT (set_id, card_number) DO NOTHING
+    RETURNING id
+"""
+
+
+def missing_set_headers(fieldnames) -> set:
+    return SET_CSV_HEADERS.difference(fieldnames or [])
+
+
+def parse_set_rows(reader: csv.DictReader):
+    """
+    Yield (set_name, brand, year, card_number, first, last, rookie) per CSV row.
+    Raises ValueError("Row N invalid: ...") on an unparseable row.
+    """
+    for rownum, row in enumerate(reader, start=1):
+        try:
+            yield (
+                (row["SetName"] or "").strip(),
+                (row["Brand"] or "").strip(),
+                int((row["Year"] or "").strip()),
+                (row["CardNumber"] or "").strip(),
+                (row["First"] or "").strip() or None,
+                (row["Last"] or "").strip() or None,
+                (row["Rookie"] or "").strip() in ("1", "true", "True", "yes"),
+            )
+        except Exception as e:
+            raise ValueError(f"Row {rownum} invalid: {e}")
+
+
+def import_set_rows(cursor, rows) -> dict:
+    """Stage and upsert rows from parse_set_rows(). Returns the import counts."""
+    cursor.execute(_CREATE_STAGE)
+
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    staged = 0
+    for ord_, (set_name, brand, year, card_num, first, last, rookie) in enumerate(rows):
+        writer.writerow([ord_, set_name, brand, year, card_num, first, last, "t" if rookie else "f"])
+        staged += 1
+    buf.seek(0)
+    cursor.copy_expert(_COPY_STAGE, buf)
+
+    cursor.execute(_UPSERT_SETS)
+    sets_created = cursor.rowcount
+    cursor.execute(_COUNT_SETS)
+    sets_total = cursor.fetchone()[0]
+    cursor.execute(_UPSERT_ENTRIES)
+    entries_added = cursor.rowcount
+
+    return {
+        "sets_created": sets_created,
+        "sets_updated": sets_total - sets_created,
+        "entries_added": entries_added,
+        "entries_skipped": staged - entries_added,
+    }
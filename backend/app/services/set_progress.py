@@ -0,0 +1,150 @@
+# backend/app/services/set_progress.py
+"""
+Set completion analytics for GET /sets/progress and GET /sets/{id}/progress.
+
+Per set, for one user, in a single aggregate query:
+
+  entry_count / owned_count / completion_pct
+  owned_value        sum of the user's UserSetCard values
+  cost_to_complete   sum of estimated prices of the entries not yet owned
+  unpriced_missing   missing entries with no dictionary book values to price them
+
+Estimated prices come from the set_entry_estimates materialized view
+(migration 039): per entry, the mean book value of the dictionary rows with
+the same brand / year / card number. That part is the same for every user and
+only changes with the dictionary or the checklists, so it is cached; the join
+to user_set_cards is live, so adding or removing a card shows up immediately
+without any refresh.
+
+Freshness: the view is refreshed (CONCURRENTLY, readers are never blocked)
+once 'dictionary_version' or 'set_entries_version' in app_metadata has moved —
+triggers bump them on every write to dictionary_entries / set_entries and on
+brand / year changes to sets (migrations 039, 044). Requests never wait for
+it: a progress request at most every SET_ESTIMATES_CHECK_SECONDS per worker
+starts a background check-and-refresh and is answered from the current view.
+A transaction-level advisory lock keeps workers from refreshing at the same
+time; the loser keeps the previous data.
+"""
+
+import logging
+import os
+import threading
+import time
+from typing import Optional
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from ..database import SessionLocal
+
+logger = logging.getLogger("cardstoard.set_progress")
+
+SET_ESTIMATES_CHECK_SECONDS = float(os.getenv("SET_ESTIMATES_CHECK_SECONDS", "60"))
+
+_ESTIMATES_VERSION_KEY = "set_estimates_version"
+
+_SOURCE_VERSION_SQL = text("""
+    SELECT string_agg(value, ':' ORDER BY key) FROM app_metadata
+    WHERE key IN ('dictionary_version', 'set_entries_version')
+""")
+
+_REFRESHED_VERSION_SQL = text("SELECT value FROM app_metadata WHERE key = :key")
+
+_TRY_LOCK_SQL = text("SELECT pg_try_advisory_xact_lock(hashtext('set_entry_estimates'))")
+
+_REFRESH_SQL = text("REFRESH MATERIALIZED VIEW CONCURRENTLY set_entry_estimates")
+
+_STORE_VERSION_SQL = text("""
+    INSERT INTO app_metadata (key, value, updated_at) VALUES (:key, :value, NOW())
+    ON CONFLICT (key) DO UPDATE SET value = EXCLUDED.value, updated_at = NOW()
+""")
+
+_PROGRESS_SQL = """
+    SELECT s.id, s.name, s.brand, s.year,
+           count(e.id)                                              AS entry_count,
+           count(u.id)                                              AS owned_count,
+           coalesce(round((100.0 * count(u.id) / NULLIF(count(e.id), 0))::numeric, 1), 0)::float8
+                                                                    AS completion_pct,
+           coalesce(sum(u.value), 0)                                AS owned_value,
+           round(coalesce(sum(x.est_price) FILTER (WHERE u.id IS NULL), 0)::numeric, 2)::float8
+                                                                    AS cost_to_complete,
+           count(e.id) FILTER (WHERE u.id IS NULL AND x.est_price IS NULL)
+                                                                    AS unpriced_missing
+    FROM sets s
+    LEFT JOIN set_entries e          ON e.set_id = s.id
+    LEFT JOIN set_entry_estimates x  ON x.set_entry_id = e.id
+    LEFT JOIN user_set_cards u       ON u.set_entry_id = e.id AND u.user_id = :user_id
+    {where}
+    GROUP BY s.id
+    {having}
+    ORDER BY s.year, s.name
+"""
+
+_MISSING_SQL = text("""
+    SELECT e.id, e.card_number, e.first_name, e.last_name,
+           coalesce(e.rookie, false) AS rookie,
+           round(x.est_price::numeric, 2)::float8 AS est_price
+    FROM set_entries e
+    LEFT JOIN set_entry_estimates x ON x.set_entry_id = e.id
+    WHERE e.set_id = :set_id
+      AND NOT EXISTS (
+          SELECT 1 FROM user_set_cards u
+          WHERE u.set_entry_id = e.id AND u.user_id = :user_id
+      )
+    ORDER BY e.sort_key NULLS LAST, e.card_number
+""")
+
+
+def refresh_estimates_if_stale(db: Session) -> None:
+    """Refresh set_entry_estimates if the dictionary or checklists changed since the last refresh."""
+    try:
+        current = db.execute(_SOURCE_VERSION_SQL).scalar()
+        refreshed = db.execute(_REFRESHED_VERSION_SQL, {"key": _ESTIMATES_VERSION_KEY}).scalar()
+        if current == refreshed or not db.execute(_TRY_LOCK_SQL).scalar():
+            db.rollback()
+            return
+        db.execute(_REFRESH_SQL)
+        db.execute(_STORE_VERSION_SQL, {"key": _ESTIMATES_VERSION_KEY, "value": current})
+        db.commit()
+    except Exception:
+        db.rollback()
+        logger.exception("set_entry_estimates refresh failed; serving previous estimates")
+
+
+_refresh_lock = threading.Lock()   # one background refresh per worker
+_checked_at = 0.0
+
+
+def _refresh_in_background() -> None:
+    try:
+        with SessionLocal() as db:
+            refresh_estimates_if_stale(db)
+    finally:
+        _refresh_lock.release()
+
+
+def schedule_estimates_refresh() -> None:
+    """Start a background refresh check, at most every SET_ESTIMATES_CHECK_SECONDS."""
+    global _checked_at
+    now = time.monotonic()
+    if now - _checked_at < SET_ESTIMATES_CHECK_SECONDS or not _refresh_lock.acquire(blocking=False):
+        return
+    _checked_at = now
+    threading.Thread(target=_refresh_in_background, name="cardstoard-set-estimates", daemon=True).start()
+
+
+def set_progress(db: Session, user_id: int, set_id: Optional[int] = None, started_only: bool = False) -> list[dict]:
+    """Progress rows for every set (or one set_id); started_only drops sets with nothing owned."""
+    schedule_estimates_refresh()
+    sql = _PROGRESS_SQL.format(
+        where="WHERE s.id = :set_id" if set_id is not None else "",
+        having="HAVING count(u.id) > 0" if started_only else "",
+    )
+    rows = db.execute(text(sql), {"user_id": user_id, "set_id": set_id})
+    return [dict(r._mapping) for r in rows]
+
+
+def missing_cards(db: Session, user_id: int, set_id: int) -> list[dict]:
+    """The set's entries the user does not own, checklist order, with estimated prices."""
+    rows = db.execute(_MISSING_SQL, {"user_id": user_id, "set_id": set_id})
+    return [dict(r._mapping) for r in rows]
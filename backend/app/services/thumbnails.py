@@ -0,0 +1,106 @@
+# backend/app/services/thumbnails.py
+"""
+Thumbnails for uploaded card photos.
+
+List views used to load the full-resolution upload (often several MB) into a
+50px grid cell. Each uploaded photo now gets derivatives at THUMB_SIZES, in
+WebP (served to browsers) and JPEG (fallback, and for PDF/label rendering):
+
+  app/static/thumbs/{key[:2]}/{key}_{size}.webp
+  app/static/thumbs/{key[:2]}/{key}_{size}.jpg
+
+key is the SHA-256 of the source bytes, stored on the card as
+front_thumb_key / back_thumb_key. Content addressing makes generation
+idempotent (re-uploads and backfill re-runs find the files already there)
+and lets the static files be cached forever. Thumbnails are never deleted
+with a card, since another card may share them; `backfill_thumbnails.py
+--prune` removes unreferenced ones.
+
+Kept free of database and web imports so backfill_thumbnails.py can run
+make_thumbnails in a process pool.
+"""
+
+import hashlib
+import io
+import os
+import threading
+from typing import Optional
+
+from PIL import Image as PILImage, ImageOps
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+THUMB_DIR = os.path.join(BASE_DIR, "static", "thumbs")
+THUMB_URL = "/static/thumbs"
+
+# Longest side in px. sm fills the list grid / edit row, md the hover preview,
+# both at 2-3x for high-DPI screens.
+THUMB_SIZES = {"md": 480, "sm": 160}   # largest first: each is cut from the previous
+THUMB_FORMATS = {"webp": ("WEBP", {"quality": 80, "method": 4}),
+                 "jpeg": ("JPEG", {"quality": 82, "optimize": True, "progressive": True})}
+_EXT = {"webp": "webp", "jpeg": "jpg"}
+
+
+def _thumb_name(key: str, size: str, fmt: str) -> str:
+    return f"{key[:2]}/{key}_{size}.{_EXT[fmt]}"
+
+
+def thumbnail_urls(key: Optional[str]) -> Optional[dict]:
+    """{"sm": {"webp": url, "jpeg": url}, "md": {...}} for a thumb key, or None."""
+    if not key:
+        return None
+    return {
+        size: {fmt: f"{THUMB_URL}/{_thumb_name(key, size, fmt)}" for fmt in THUMB_FORMATS}
+        for size in THUMB_SIZES
+    }
+
+
+def thumbnail_path(key: str, size: str, fmt: str) -> str:
+    """Filesystem path of one derivative."""
+    return os.path.join(THUMB_DIR, _thumb_name(key, size, fmt))
+
+
+def image_file_path(rel_url: str) -> str:
+    """Filesystem path of an uploaded image from its stored /static/... URL."""
+    static_dir = os.path.realpath(os.path.join(BASE_DIR, "static"))
+    path = os.path.realpath(os.path.join(BASE_DIR, rel_url.lstrip("/")))
+    if not path.startswith(static_dir + os.sep):
+        raise ValueError(f"image path outside static/: {rel_url}")
+    return path
+
+
+def _write_atomic(img, path: str, fmt: str, opts: dict) -> None:
+    tmp = f"{path}.{os.getpid()}-{threading.get_ident()}.tmp"
+    img.save(tmp, format=fmt, **opts)
+    os.replace(tmp, path)
+
+
+def make_thumbnails(src_path: str) -> str:
+    """
+    Write every size/format derivative of the image at src_path that does not
+    exist yet, and return its key. Raises OSError / PIL errors for a missing
+    or unreadable image.
+    """
+    with open(src_path, "rb") as f:
+        content = f.read()
+    key = hashlib.sha256(content).hexdigest()
+
+    targets = {(size, fmt): thumbnail_path(key, size, fmt)
+               for size in THUMB_SIZES for fmt in THUMB_FORMATS}
+    if all(os.path.exists(p) for p in targets.values()):
+        return key
+    os.makedirs(os.path.dirname(next(iter(targets.values()))), exist_ok=True)
+
+    img = PILImage.open(io.BytesIO(content))
+    largest = max(THUMB_SIZES.values())
+    img.draft("RGB", (largest * 2, largest * 2))   # JPEG: decode at reduced scale
+    img = ImageOps.exif_transpose(img)
+    if img.mode != "RGB":
+        img = img.convert("RGB")
+
+    for size, px in THUMB_SIZES.items():
+        img.thumbnail((px, px), PILImage.LANCZOS)
+        for fmt, (pil_fmt, opts) in THUMB_FORMATS.items():
+            path = targets[(size, fmt)]
+            if not os.path.exists(path):
+                _write_atomic(img, path, pil_fmt, opts)
+    return key
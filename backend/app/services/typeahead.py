@@ -0,0 +1,125 @@
+# backend/app/services/typeahead.py
+"""
+Player-name typeahead for GET /cards/players/typeahead and
+GET /dictionary/players/typeahead.
+
+Replaces downloading the full distinct-player list for autocomplete. Each call
+returns at most `limit` ranked completions for a prefix:
+
+  candidates — dictionary names from the in-process prefix index
+               (services/dictionary_index.py), plus the user's own card
+               names (a LIKE over one user's cards, served by ix_cards_user_id_id)
+  ranking    — exact match first, then names from the user's collection,
+               then names with more dictionary entries, then alphabetical
+
+Only the first CANDIDATE_WINDOW dictionary matches (alphabetical) are ranked,
+which keeps one- and two-letter prefixes cheap; a longer prefix narrows it.
+"""
+
+from typing import Optional
+
+from sqlalchemy import func, or_
+from sqlalchemy.orm import Session
+
+from ..models import Card, DictionaryEntry
+from .dictionary_index import dictionary_index
+
+FIELDS = ("first_name", "last_name", "full")
+
+CANDIDATE_WINDOW = 200
+
+# Browser cache lifetime for a typeahead response; after it the ETag revalidates
+TYPEAHEAD_MAX_AGE = 30
+
+
+def _like_prefix(prefix: str) -> str:
+    escaped = prefix.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"{escaped}%"
+
+
+def _name_filter(first_col, last_col, field: str, pattern: str):
+    if field == "first_name":
+        return func.lower(first_col).like(pattern, escape="\\")
+    if field == "last_name":
+        return func.lower(last_col).like(pattern, escape="\\")
+    return or_(
+        func.lower(first_col + " " + last_col).like(pattern, escape="\\"),
+        func.lower(last_col + " " + first_col).like(pattern, escape="\\"),
+    )
+
+
+def _dictionary_candidates(db: Session, prefix: str, field: str) -> list[tuple]:
+    found = dictionary_index.players_with_prefix(prefix, field, CANDIDATE_WINDOW)
+    if found is not None:
+        return found
+    # Index unavailable — same candidates straight from the table
+    rows = (
+        db.query(DictionaryEntry.first_name, DictionaryEntry.last_name, func.count())
+        .filter(_name_filter(DictionaryEntry.first_name, DictionaryEntry.last_name, field, _like_prefix(prefix)))
+        .group_by(DictionaryEntry.first_name, DictionaryEntry.last_name)
+        .order_by(DictionaryEntry.last_name, DictionaryEntry.first_name)
+        .limit(CANDIDATE_WINDOW)
+        .all()
+    )
+    return [tuple(r) for r in rows]
+
+
+def _user_candidates(db: Session, user_id: int, prefix: str, field: str) -> list[tuple]:
+    rows = (
+        db.query(Card.first_name, Card.last_name)
+        .filter(Card.user_id == user_id)
+        .filter(_name_filter(Card.first_name, Card.last_name, field, _like_prefix(prefix)))
+        .distinct()
+        .limit(CANDIDATE_WINDOW)
+        .all()
+    )
+    return [tuple(r) for r in rows]
+
+
+def player_typeahead(
+    db: Session,
+    prefix: str,
+    field: str = "full",
+    limit: int = 10,
+    user_id: Optional[int] = None,
+) -> list[dict]:
+    """
+    Ranked completions for prefix. For field "first_name"/"last_name" results
+    are distinct on that name; for "full" they are distinct (first, last) pairs.
+    user_id adds (and ranks first) names from that user's cards.
+    """
+    p = (prefix or "").strip().lower()
+    if not p:
+        return []
+
+    # key → [first_name, last_name, owned, dictionary entry count]
+    candidates: dict = {}
+
+    def _key(first, last):
+        first_l, last_l = (first or "").strip().lower(), (last or "").strip().lower()
+        if field == "first_name":
+            return first_l
+        if field == "last_name":
+            return last_l
+        return (first_l, last_l)
+
+    for first, last, count in _dictionary_candidates(db, p, field):
+        c = candidates.setdefault(_key(first, last), [first, last, False, 0])
+        c[3] += count
+    if user_id is not None:
+        for first, last in _user_candidates(db, user_id, p, field):
+            c = candidates.setdefault(_key(first, last), [first, last, False, 0])
+            c[2] = True
+
+    def _text(c):
+        if field == "first_name":
+            return (c[0] or "").strip().lower()
+        if field == "last_name":
+            return (c[1] or "").strip().lower()
+        return f"{(c[0] or '').strip().lower()} {(c[1] or '').strip().lower()}"
+
+    ranked = sorted(
+        candidates.values(),
+        key=lambda c: (_text(c) != p, not c[2], -c[3], _text(c)),
+    )[:limit]
+    return [{"first_name": c[0], "last_name": c[1], "owned": c[2]} for c in ranked]
@@ -12,43 +12,52 @@ MAIL_USERNAME = os.getenv("MAIL_USERNAME")
 MAIL_PASSWORD = os.getenv("MAIL_PASSWORD")
 MAIL_FROM = os.getenv("MAIL_FROM", MAIL_USERNAME)
 MAIL_FROM_NAME = os.getenv("MAIL_FROM_NAME", "CardStoard")
+# Local SMTP stand-in (docker compose --profile mail: Mailpit on mailpit:1025):
+# MAIL_SERVER=mailpit MAIL_PORT=1025 MAIL_TLS=false and no MAIL_USERNAME
+MAIL_TLS = os.getenv("MAIL_TLS", "true").lower() == "true"
+MAIL_TIMEOUT = int(os.getenv("MAIL_TIMEOUT", "20"))
 
-def send_email(to_address: str, subject: str, body: str, html: str | None = None) -> bool:
+def deliver_email(to_address: str, subject: str, body: str, html: str | None = None) -> None:
     """
     Production-safe Gmail SMTP sender.
     Adds Message-ID, Date, RFC-compliant headers, UTF-8 handling, and a proper envelope sender.
+    Raises on any failure (the email outbox records the error and retries).
     """
+    # RFC-compliant From header
+    msg = MIMEMultipart("alternative")
+    msg["From"] = email.utils.formataddr((MAIL_FROM_NAME, MAIL_FROM))
+    msg["To"] = to_address
+    msg["Subject"] = subject
 
-    try:
-        # RFC-compliant From header
-        msg = MIMEMultipart("alternative")
-        msg["From"] = email.utils.formataddr((MAIL_FROM_NAME, MAIL_FROM))
-        msg["To"] = to_address
-        msg["Subject"] = subject
-
-        # Required for Gmail → Gmail delivery
-        msg["Date"] = email.utils.formatdate(localtime=True)
-        msg["Message-ID"] = email.utils.make_msgid(domain="cardstoard.com")
-
-        # Plain text part
-        msg.attach(MIMEText(body, "plain", "utf-8"))
-
-        # Optional HTML part
-        if html:
-            msg.attach(MIMEText(html, "html", "utf-8"))
-
-        # Send email through Gmail SMTP
-        with smtplib.SMTP(MAIL_SERVER, MAIL_PORT) as server:
-            # Required for many Gmail auth setups
-            server.ehlo()
+    # Required for Gmail → Gmail delivery
+    msg["Date"] = email.utils.formatdate(localtime=True)
+    msg["Message-ID"] = email.utils.make_msgid(domain="cardstoard.com")
+
+    # Plain text part
+    msg.attach(MIMEText(body, "plain", "utf-8"))
+
+    # Optional HTML part
+    if html:
+        msg.attach(MIMEText(html, "html", "utf-8"))
+
+    # Send email through Gmail SMTP
+    with smtplib.SMTP(MAIL_SERVER, MAIL_PORT, timeout=MAIL_TIMEOUT) as server:
+        # Required for many Gmail auth setups
+        server.ehlo()
+        if MAIL_TLS:
             server.starttls()
             server.ehlo()
 
+        if MAIL_USERNAME:
             server.login(MAIL_USERNAME, MAIL_PASSWORD)
 
-            # Send from MAIL_FROM (envelope sender) to avoid DMARC/ARC failures inside Gmail
-            server.sendmail(MAIL_FROM, [to_address], msg.as_string())
+        # Send from MAIL_FROM (envelope sender) to avoid DMARC/ARC failures inside Gmail
+        server.sendmail(MAIL_FROM, [to_address], msg.as_string())
 
+def send_email(to_address: str, subject: str, body: str, html: str | None = None) -> bool:
+    """Send immediately (blocking); True on success. Request paths queue via services/email_outbox instead."""
+    try:
+        deliver_email(to_address, subject, body, html)
         print(f"✅ Email sent to {to_address}")
         return True
 
@@ -0,0 +1,21 @@
+-- Migration 029: composite indexes for keyset-paginated card listing (GET /cards/page)
+-- Expressions must match SORT_EXPRESSIONS in app/services/card_query.py exactly,
+-- otherwise the planner falls back to a sort over the user's full collection.
+-- Every index ends in id, the stable tiebreaker appended to each sort.
+CREATE INDEX IF NOT EXISTS ix_cards_user_id_id
+    ON cards (user_id, id);
+
+CREATE INDEX IF NOT EXISTS ix_cards_user_last_first
+    ON cards (user_id, lower(coalesce(last_name, '')), lower(coalesce(first_name, '')), id);
+
+CREATE INDEX IF NOT EXISTS ix_cards_user_year
+    ON cards (user_id, coalesce(year, 0), id);
+
+CREATE INDEX IF NOT EXISTS ix_cards_user_brand
+    ON cards (user_id, lower(coalesce(brand, '')), id);
+
+CREATE INDEX IF NOT EXISTS ix_cards_user_value
+    ON cards (user_id, coalesce(value, 0), id);
+
+CREATE INDEX IF NOT EXISTS ix_cards_user_grade
+    ON cards (user_id, grade, id);
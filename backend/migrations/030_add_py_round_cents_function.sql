@@ -0,0 +1,35 @@
+-- Migration 030: py_round_cents(float8) — bit-exact SQL twin of Python round(x, 2)
+-- Used by the set-based revaluation engine (app/services/revaluation.py) so
+-- pick_avg_book() rounds identically in SQL and in Python.
+--
+-- Python rounds the exact binary value of x half-to-even. A plain
+-- round(x * 100) / 100 disagrees whenever x * 100 itself rounds onto .5, so
+-- instead we take the candidate midpoint c / 1000 (c = 10 * floor(100x) + 5)
+-- and get the exact sign of c - 1000x with Dekker's error-free product.
+CREATE OR REPLACE FUNCTION py_round_cents(x float8) RETURNS float8
+LANGUAGE plpgsql IMMUTABLE STRICT PARALLEL SAFE AS $$
+DECLARE
+    f     float8 := floor(x * 100);
+    c     float8 := 10 * f + 5;
+    p     float8 := 1000 * x;
+    t     float8 := 134217729 * x;   -- Veltkamp split (2^27 + 1)
+    x_hi  float8;
+    x_lo  float8;
+    err   float8;
+    diff  float8;
+BEGIN
+    x_hi := t - (t - x);
+    x_lo := x - x_hi;
+    -- 1000 splits exactly as (1000, 0), so the error term reduces to two products
+    err  := (1000 * x_hi - p) + 1000 * x_lo;
+    diff := (c - p) - err;
+    IF diff > 0 THEN
+        RETURN f / 100;
+    ELSIF diff < 0 THEN
+        RETURN (f + 1) / 100;
+    ELSIF f::bigint % 2 = 0 THEN
+        RETURN f / 100;
+    END IF;
+    RETURN (f + 1) / 100;
+END;
+$$;
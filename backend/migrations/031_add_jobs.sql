@@ -0,0 +1,20 @@
+-- Migration 031: jobs table for the background job runner (app/services/jobs.py)
+-- Bulk endpoints called with ?async=true enqueue a row here and return 202;
+-- clients poll GET /jobs/{id} for status/progress and may POST /jobs/{id}/cancel.
+CREATE TABLE IF NOT EXISTS jobs (
+    id               SERIAL PRIMARY KEY,
+    user_id          INTEGER NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+    kind             VARCHAR NOT NULL,
+    status           VARCHAR NOT NULL DEFAULT 'queued',
+    progress         INTEGER NOT NULL DEFAULT 0,
+    message          VARCHAR,
+    result           JSON,
+    error            TEXT,
+    cancel_requested BOOLEAN NOT NULL DEFAULT FALSE,
+    worker           VARCHAR,
+    created_at       TIMESTAMP DEFAULT NOW(),
+    started_at       TIMESTAMP,
+    finished_at      TIMESTAMP
+);
+
+CREATE INDEX IF NOT EXISTS ix_jobs_user_recent ON jobs (user_id, id DESC);
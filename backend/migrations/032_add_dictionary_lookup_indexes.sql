@@ -0,0 +1,39 @@
+-- Migration 032: Smart Fill lookup support for dictionary_entries
+--
+-- 1. Functional indexes matching the func.lower(...) == ... predicates used by
+--    smart-fill, identify-image, /dictionary/search and the values import, so
+--    the DB path (and the in-process index's fallback) stops seq-scanning.
+-- 2. app_metadata key/value table + a statement-level trigger that bumps
+--    'dictionary_version' on any write to dictionary_entries. Each uvicorn
+--    worker's in-memory Smart Fill index (app/services/dictionary_index.py)
+--    compares this counter to the version it loaded to notice other workers'
+--    changes.
+CREATE INDEX IF NOT EXISTS ix_dictionary_name_lower
+    ON dictionary_entries (lower(last_name), lower(first_name));
+
+CREATE INDEX IF NOT EXISTS ix_dictionary_card_lower
+    ON dictionary_entries (lower(brand), year, lower(card_number));
+
+CREATE TABLE IF NOT EXISTS app_metadata (
+    key        VARCHAR PRIMARY KEY,
+    value      VARCHAR,
+    updated_at TIMESTAMP DEFAULT NOW()
+);
+
+INSERT INTO app_metadata (key, value) VALUES ('dictionary_version', '0')
+ON CONFLICT (key) DO NOTHING;
+
+CREATE OR REPLACE FUNCTION bump_dictionary_version() RETURNS trigger
+LANGUAGE plpgsql AS $$
+BEGIN
+    UPDATE app_metadata
+       SET value = (value::bigint + 1)::text, updated_at = NOW()
+     WHERE key = 'dictionary_version';
+    RETURN NULL;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS trg_dictionary_version ON dictionary_entries;
+CREATE TRIGGER trg_dictionary_version
+    AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON dictionary_entries
+    FOR EACH STATEMENT EXECUTE FUNCTION bump_dictionary_version();
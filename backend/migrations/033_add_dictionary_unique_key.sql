@@ -0,0 +1,22 @@
+-- Migration 033: unique natural key on dictionary_entries
+-- Lets seed_dictionary() bulk-insert with INSERT ... ON CONFLICT DO NOTHING
+-- instead of loading every existing key into Python first.
+--
+-- Exact duplicates (same first/last/brand/year/card_number) are removed first,
+-- keeping the row POST /dictionary/deduplicate would keep: most recently
+-- imported book values, then highest id.
+DELETE FROM dictionary_entries
+WHERE id IN (
+    SELECT id FROM (
+        SELECT id,
+               ROW_NUMBER() OVER (
+                   PARTITION BY first_name, last_name, brand, year, card_number
+                   ORDER BY book_values_imported_at DESC NULLS LAST, id DESC
+               ) AS rn
+        FROM dictionary_entries
+    ) ranked
+    WHERE rn > 1
+);
+
+CREATE UNIQUE INDEX IF NOT EXISTS ux_dictionary_entries_key
+    ON dictionary_entries (first_name, last_name, brand, year, card_number);
@@ -0,0 +1,15 @@
+-- Migration 034: user_id indexes for the per-user collection summaries
+-- The chat context (app/services/chat_context.py) aggregates each inventory
+-- table per user with GROUPING SETS; without these every chat turn scanned
+-- the whole table. cards is already covered by ix_cards_user_id_id (029).
+CREATE INDEX IF NOT EXISTS ix_auto_balls_user_id
+    ON auto_balls (user_id);
+
+CREATE INDEX IF NOT EXISTS ix_wax_boxes_user_id
+    ON wax_boxes (user_id);
+
+CREATE INDEX IF NOT EXISTS ix_wax_packs_user_id
+    ON wax_packs (user_id);
+
+CREATE INDEX IF NOT EXISTS ix_boxes_binders_user_id
+    ON boxes_binders (user_id);
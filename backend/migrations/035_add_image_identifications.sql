@@ -0,0 +1,19 @@
+-- Migration 035: identify-image result cache (app/services/identify_cache.py)
+-- Keyed by SHA-256 of the uploaded image; phash is a 64-bit difference hash used
+-- to recognise re-photographed cards (Hamming distance via bit_count, PG 14+).
+-- Rows expire after IDENTIFY_CACHE_TTL_DAYS and the least recently used are
+-- trimmed past IDENTIFY_CACHE_MAX_ROWS.
+CREATE TABLE IF NOT EXISTS image_identifications (
+    id             SERIAL PRIMARY KEY,
+    sha256         VARCHAR(64) NOT NULL UNIQUE,
+    phash          BIGINT NOT NULL,
+    fields         JSON NOT NULL,
+    confidence     DOUBLE PRECISION NOT NULL DEFAULT 0,
+    grade_estimate JSON,
+    hits           INTEGER NOT NULL DEFAULT 0,
+    created_at     TIMESTAMP DEFAULT NOW(),
+    last_used_at   TIMESTAMP DEFAULT NOW()
+);
+
+CREATE INDEX IF NOT EXISTS ix_image_identifications_last_used
+    ON image_identifications (last_used_at DESC);
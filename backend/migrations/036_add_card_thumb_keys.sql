@@ -0,0 +1,7 @@
+-- Migration 036: content-addressed thumbnail keys on cards
+-- SHA-256 of the uploaded front/back photo; the thumbnails live under
+-- app/static/thumbs/ (app/services/thumbnails.py). NULL until generated —
+-- run backfill_thumbnails.py once for photos uploaded before this migration.
+ALTER TABLE cards
+    ADD COLUMN IF NOT EXISTS front_thumb_key VARCHAR(64),
+    ADD COLUMN IF NOT EXISTS back_thumb_key  VARCHAR(64);
@@ -0,0 +1,16 @@
+-- Migration 037: persisted numeric sort key for set checklists
+-- GET /sets/{id}/entries used to order by cast(regexp_replace(card_number, ...))
+-- evaluated for every row on every request (and failed outright for card
+-- numbers without digits). sort_key is the card number's digits as an integer,
+-- NULL when there are none; as a stored generated column it is filled in for
+-- existing rows here and kept current on every insert/update — seed_sets.py,
+-- POST /sets/import-csv or anything else. Digits are capped at 9 to fit INTEGER.
+ALTER TABLE set_entries
+    ADD COLUMN IF NOT EXISTS sort_key INTEGER GENERATED ALWAYS AS (
+        NULLIF(LEFT(regexp_replace(card_number, '[^0-9]', '', 'g'), 9), '')::INTEGER
+    ) STORED;
+
+-- Checklist order within a set; user_set_cards (user_id, set_entry_id) is
+-- already covered by its UNIQUE constraint for the ownership join.
+CREATE INDEX IF NOT EXISTS ix_set_entries_set_id_sort_key
+    ON set_entries (set_id, sort_key, card_number);
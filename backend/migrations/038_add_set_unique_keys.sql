@@ -0,0 +1,60 @@
+-- Migration 038: unique keys for set checklist upserts
+-- app/services/set_import.py loads checklists with INSERT ... ON CONFLICT:
+--   sets        one row per (name, brand, year), case-insensitive — the
+--               lookup the importers always did before inserting
+--   set_entries one row per (set_id, card_number)
+--
+-- Duplicates left by concurrent imports are merged first into the lowest id,
+-- moving users' build rows across (a user's row on the kept entry wins).
+
+-- 1. Merge duplicate sets
+WITH keep AS (
+    SELECT id, MIN(id) OVER (PARTITION BY lower(name), lower(brand), year) AS keep_id
+    FROM sets
+)
+UPDATE set_entries e
+SET set_id = keep.keep_id
+FROM keep
+WHERE e.set_id = keep.id AND keep.id <> keep.keep_id;
+
+DELETE FROM sets s
+USING sets k
+WHERE lower(s.name) = lower(k.name)
+  AND lower(s.brand) = lower(k.brand)
+  AND s.year = k.year
+  AND s.id > k.id;
+
+-- 2. Merge duplicate entries within a set
+CREATE TEMP TABLE set_entry_dups ON COMMIT DROP AS
+SELECT id, keep_id FROM (
+    SELECT id, MIN(id) OVER (PARTITION BY set_id, card_number) AS keep_id
+    FROM set_entries
+) ranked
+WHERE id <> keep_id;
+
+-- One row per (user, kept entry): with 3+ duplicates a user may have rows on
+-- several of them, and NOT EXISTS only sees the statement's starting snapshot.
+WITH movable AS (
+    SELECT u.id, d.keep_id,
+           ROW_NUMBER() OVER (PARTITION BY u.user_id, d.keep_id ORDER BY u.id) AS rn
+    FROM user_set_cards u
+    JOIN set_entry_dups d ON d.id = u.set_entry_id
+    WHERE NOT EXISTS (
+        SELECT 1 FROM user_set_cards k
+        WHERE k.user_id = u.user_id AND k.set_entry_id = d.keep_id
+    )
+)
+UPDATE user_set_cards u
+SET set_entry_id = m.keep_id
+FROM movable m
+WHERE u.id = m.id AND m.rn = 1;
+
+-- remaining build rows on duplicates go with them (ON DELETE CASCADE)
+DELETE FROM set_entries WHERE id IN (SELECT id FROM set_entry_dups);
+
+-- 3. Keys
+CREATE UNIQUE INDEX IF NOT EXISTS ux_sets_key
+    ON sets (lower(name), lower(brand), year);
+
+CREATE UNIQUE INDEX IF NOT EXISTS ux_set_entries_set_card
+    ON set_entries (set_id, card_number);
@@ -0,0 +1,55 @@
+-- Migration 039: set completion analytics (GET /sets/progress)
+--
+-- 1. set_entry_estimates — estimated market price of every set entry, from the
+--    dictionary's book values for the same brand / year / card number (mean
+--    of the non-null book_* columns, averaged over matching dictionary rows).
+--    It does not depend on the user, so it is computed once here and only
+--    recomputed when its sources change; per-user progress joins it to
+--    user_set_cards live (app/services/set_progress.py).
+-- 2. 'set_entries_version' counter in app_metadata, bumped by a statement-level
+--    trigger like 'dictionary_version' (032). set_progress.py refreshes the
+--    view when either counter has moved since its last refresh.
+CREATE MATERIALIZED VIEW IF NOT EXISTS set_entry_estimates AS
+SELECT e.id AS set_entry_id,
+       e.set_id,
+       est.price AS est_price
+FROM set_entries e
+JOIN sets s ON s.id = e.set_id
+LEFT JOIN LATERAL (
+    SELECT avg(
+               (coalesce(d.book_high, 0) + coalesce(d.book_high_mid, 0) + coalesce(d.book_mid, 0)
+                + coalesce(d.book_low_mid, 0) + coalesce(d.book_low, 0))
+               / NULLIF((d.book_high IS NOT NULL)::int + (d.book_high_mid IS NOT NULL)::int
+                        + (d.book_mid IS NOT NULL)::int + (d.book_low_mid IS NOT NULL)::int
+                        + (d.book_low IS NOT NULL)::int, 0)
+           ) AS price
+    FROM dictionary_entries d
+    WHERE lower(d.brand) = lower(s.brand)
+      AND d.year = s.year
+      AND lower(d.card_number) = lower(e.card_number)
+) est ON TRUE;
+
+-- Required by REFRESH MATERIALIZED VIEW CONCURRENTLY
+CREATE UNIQUE INDEX IF NOT EXISTS ux_set_entry_estimates_entry
+    ON set_entry_estimates (set_entry_id);
+
+CREATE INDEX IF NOT EXISTS ix_set_entry_estimates_set_id
+    ON set_entry_estimates (set_id);
+
+INSERT INTO app_metadata (key, value) VALUES ('set_entries_version', '0')
+ON CONFLICT (key) DO NOTHING;
+
+CREATE OR REPLACE FUNCTION bump_set_entries_version() RETURNS trigger
+LANGUAGE plpgsql AS $$
+BEGIN
+    UPDATE app_metadata
+       SET value = (value::bigint + 1)::text, updated_at = NOW()
+     WHERE key = 'set_entries_version';
+    RETURN NULL;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS trg_set_entries_version ON set_entries;
+CREATE TRIGGER trg_set_entries_version
+    AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON set_entries
+    FOR EACH STATEMENT EXECUTE FUNCTION bump_set_entries_version();
@@ -0,0 +1,31 @@
+-- Migration 040: trigram indexes for the chat find_* tools
+-- find_cards / find_balls / find_wax / find_packs (app/routes/chat.py) match
+-- names and brands with ILIKE '%...%', which a btree cannot serve; each call
+-- scanned every row of the user's inventory table and re-checked the pattern.
+-- pg_trgm GIN indexes answer substring ILIKE directly (terms of 3+ chars);
+-- the planner ANDs them with the user_id indexes (029, 034).
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+CREATE INDEX IF NOT EXISTS ix_cards_first_name_trgm
+    ON cards USING gin (first_name gin_trgm_ops);
+
+CREATE INDEX IF NOT EXISTS ix_cards_last_name_trgm
+    ON cards USING gin (last_name gin_trgm_ops);
+
+CREATE INDEX IF NOT EXISTS ix_cards_brand_trgm
+    ON cards USING gin (brand gin_trgm_ops);
+
+CREATE INDEX IF NOT EXISTS ix_auto_balls_first_name_trgm
+    ON auto_balls USING gin (first_name gin_trgm_ops);
+
+CREATE INDEX IF NOT EXISTS ix_auto_balls_last_name_trgm
+    ON auto_balls USING gin (last_name gin_trgm_ops);
+
+CREATE INDEX IF NOT EXISTS ix_auto_balls_brand_trgm
+    ON auto_balls USING gin (brand gin_trgm_ops);
+
+CREATE INDEX IF NOT EXISTS ix_wax_boxes_brand_trgm
+    ON wax_boxes USING gin (brand gin_trgm_ops);
+
+CREATE INDEX IF NOT EXISTS ix_wax_packs_brand_trgm
+    ON wax_packs USING gin (brand gin_trgm_ops);
@@ -0,0 +1,21 @@
+-- Migration 041: outgoing mail queue (app/services/email_outbox.py)
+-- Auth routes enqueue verification mail here in the request's transaction and
+-- return immediately; a sender thread in each worker claims due rows
+-- (FOR UPDATE SKIP LOCKED), sends them over SMTP and retries failures with
+-- exponential backoff until OUTBOX_MAX_ATTEMPTS, then marks them failed.
+CREATE TABLE IF NOT EXISTS email_outbox (
+    id              SERIAL PRIMARY KEY,
+    to_address      VARCHAR NOT NULL,
+    subject         VARCHAR NOT NULL,
+    body            TEXT NOT NULL,
+    html            TEXT,
+    status          VARCHAR NOT NULL DEFAULT 'pending',
+    attempts        INTEGER NOT NULL DEFAULT 0,
+    last_error      TEXT,
+    next_attempt_at TIMESTAMP NOT NULL DEFAULT NOW(),
+    created_at      TIMESTAMP DEFAULT NOW(),
+    sent_at         TIMESTAMP
+);
+
+CREATE INDEX IF NOT EXISTS ix_email_outbox_due
+    ON email_outbox (next_attempt_at) WHERE status = 'pending';
@@ -0,0 +1,8 @@
+-- Migration 042: delete a user's jobs with the user
+-- 031 created jobs.user_id without ON DELETE CASCADE, so DELETE /account/delete
+-- failed for anyone who had run an ?async=true operation. Fresh installs get
+-- the cascade from 031; this re-creates the constraint on existing databases.
+ALTER TABLE jobs DROP CONSTRAINT IF EXISTS jobs_user_id_fkey;
+ALTER TABLE jobs
+    ADD CONSTRAINT jobs_user_id_fkey
+    FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE;
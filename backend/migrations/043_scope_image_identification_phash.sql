@@ -0,0 +1,9 @@
+-- Migration 043: record who uploaded each cached identification
+-- Near-duplicate (phash) matches are now served only to the user whose photo
+-- was identified; exact SHA-256 hits stay shared. Rows outlive their uploader
+-- (user_id is cleared), since they still serve exact re-uploads.
+ALTER TABLE image_identifications
+    ADD COLUMN IF NOT EXISTS user_id INTEGER REFERENCES users(id) ON DELETE SET NULL;
+
+CREATE INDEX IF NOT EXISTS ix_image_identifications_user
+    ON image_identifications (user_id);
@@ -0,0 +1,9 @@
+-- Migration 044: refresh set_entry_estimates when a set's brand or year changes
+-- The view (039) prices entries by their set's brand / year, but only writes to
+-- set_entries bumped 'set_entries_version', so editing a set left its estimates
+-- stale. Inserting a set adds no entries, and deleting one cascades to
+-- set_entries, whose own trigger already fires.
+DROP TRIGGER IF EXISTS trg_sets_version ON sets;
+CREATE TRIGGER trg_sets_version
+    AFTER UPDATE OF brand, year ON sets
+    FOR EACH STATEMENT EXECUTE FUNCTION bump_set_entries_version();
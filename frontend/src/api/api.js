@@ -20,6 +20,7 @@
  * Named exports:
  *   api (default)     — the Axios instance
  *   smartFill()       — GET /cards/smart-fill with player + brand + year params
+ *   postEventStream() — POST returning Server-Sent Events (e.g. /chat/stream), via fetch
  */
 import axios from "axios";
 import { logoutHandler } from "../utils/logoutHandler";
@@ -123,4 +124,46 @@ export const smartFill = async (first, last, brand, year) => {
   }
 };
 
+// 🔹 Server-Sent Events over POST (EventSource only supports GET).
+// Calls onEvent(name, data) for each event as it arrives. Resolves false —
+// without consuming anything — when the response is a 401 or the browser
+// cannot stream, so the caller can fall back to a plain api request (which
+// gets the interceptor's token refresh). Other HTTP errors reject with the
+// server's detail.
+export const postEventStream = async (path, body, onEvent) => {
+  const res = await fetch(`${baseURL}${path}`, {
+    method: "POST",
+    credentials: "include",
+    headers: { "Content-Type": "application/json", Accept: "text/event-stream" },
+    body: JSON.stringify(body),
+  });
+  if (res.status === 401 || !res.body) return false;
+  if (!res.ok) {
+    const err = await res.json().catch(() => ({}));
+    throw new Error(err.detail || `Request failed (${res.status})`);
+  }
+
+  const reader = res.body.getReader();
+  const decoder = new TextDecoder();
+  let buffer = "";
+  for (;;) {
+    const { value, done } = await reader.read();
+    if (done) break;
+    buffer += decoder.decode(value, { stream: true });
+    let sep;
+    while ((sep = buffer.indexOf("\n\n")) !== -1) {
+      const raw = buffer.slice(0, sep);
+      buffer = buffer.slice(sep + 2);
+      let name = "message";
+      let data = "";
+      raw.split("\n").forEach((line) => {
+        if (line.startsWith("event:")) name = line.slice(6).trim();
+        else if (line.startsWith("data:")) data += line.slice(5).trim();
+      });
+      if (data) onEvent(name, JSON.parse(data));
+    }
+  }
+  return true;
+};
+
 export default api;
@@ -6,7 +6,10 @@
  * Behavior:
  *   - Rendered by AppHeader when chatbot_enabled=true in settings and user clicks 💬.
  *   - Maintains local message history (role: "user" | "assistant").
- *   - POST /chat/ sends current message + full conversation history to the backend.
+ *   - POST /chat/stream sends current message + full conversation history to the backend
+ *     and streams the reply (SSE): text appears as it is generated and tool calls show
+ *     as a status line. Falls back to POST /chat/ on 401 (token refresh) or when the
+ *     browser cannot stream.
  *   - Enter key (without Shift) submits; Shift+Enter inserts a newline.
  *   - Scrolls to the bottom after each new message via bottomRef.
  *
@@ -14,7 +17,7 @@
  *   onClose()  — callback to close/hide the panel (sets chatOpen=false in AppHeader).
  */
 import React, { useState, useRef, useEffect } from "react";
-import api from "../api/api";
+import api, { postEventStream } from "../api/api";
 import "./ChatPanel.css";
 
 export default function ChatPanel({ onClose }) {
@@ -23,29 +26,52 @@ export default function ChatPanel({ onClose }) {
   ]);
   const [input, setInput] = useState("");
   const [loading, setLoading] = useState(false);
+  const [toolStatus, setToolStatus] = useState(null);
   const bottomRef = useRef(null);
 
   useEffect(() => {
     bottomRef.current?.scrollIntoView({ behavior: "smooth" });
   }, [messages]);
 
+  // The reply being received is always the last message
+  const setReply = (update) =>
+    setMessages((prev) => {
+      const last = prev[prev.length - 1];
+      return [...prev.slice(0, -1), { ...last, text: update(last.text) }];
+    });
+
   const send = async () => {
     const text = input.trim();
     if (!text || loading) return;
     setInput("");
     const updatedMessages = [...messages, { role: "user", text }];
-    setMessages(updatedMessages);
+    setMessages([...updatedMessages, { role: "assistant", text: "" }]);
     setLoading(true);
     try {
       const history = updatedMessages.slice(0, -1); // all but the current message
-      const res = await api.post("/chat/", { message: text, history });
-      setMessages((prev) => [...prev, { role: "assistant", text: res.data.response }]);
+      const streamed = await postEventStream("/chat/stream", { message: text, history }, (event, data) => {
+        if (event === "text") {
+          setToolStatus(null);
+          setReply((prev) => prev + data.text);
+        } else if (event === "tool") {
+          setToolStatus(data.status === "started" ? `Checking the books (${data.name})...` : null);
+        } else if (event === "done") {
+          setReply(() => data.response);
+        } else if (event === "error") {
+          setReply(() => `Error: ${data.detail}`);
+        }
+      });
+      if (!streamed) {
+        const res = await api.post("/chat/", { message: text, history });
+        setReply(() => res.data.response);
+      }
       window.dispatchEvent(new Event("collection-changed"));
     } catch (err) {
       const detail = err?.response?.data?.detail || err?.message || "Unknown error";
-      setMessages((prev) => [...prev, { role: "assistant", text: `Error: ${detail}` }]);
+      setReply(() => `Error: ${detail}`);
     } finally {
       setLoading(false);
+      setToolStatus(null);
     }
   };
 
@@ -61,12 +87,14 @@ export default function ChatPanel({ onClose }) {
       </div>
 
       <div className="chat-messages">
-        {messages.map((m, i) => (
+        {messages.filter((m) => m.text).map((m, i) => (
           <div key={i} className={`chat-bubble ${m.role}`}>
             {m.text}
           </div>
         ))}
-        {loading && <div className="chat-bubble assistant">Here's the windup...</div>}
+        {loading && (toolStatus || !messages[messages.length - 1].text) && (
+          <div className="chat-bubble assistant">{toolStatus || "Here's the windup..."}</div>
+        )}
         <div ref={bottomRef} />
       </div>
 
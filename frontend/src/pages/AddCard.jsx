@@ -5,8 +5,8 @@
  *
  * Features:
  *   - Loads card_makes and card_grades from /settings/ to populate dropdowns
- *   - Loads player names from /cards/players for first_name / last_name autocomplete
- *     (Tab or Enter completes partial first-letter matches via handleNameKeyDown)
+ *   - first_name / last_name autocomplete from /cards/players/typeahead as you type
+ *     (Tab or Enter completes partial matches via handleNameKeyDown)
  *   - Smart Fill: if enable_smart_fill is true in settings, automatically queries
  *     GET /cards/smart-fill when first_name, last_name, brand, or year changes.
  *     Fills card_number and rookie flag from the DictionaryEntry match.
@@ -21,6 +21,7 @@ import api from "../api/api";
 import AppHeader from "../components/AppHeader";
 import { Link } from "react-router-dom";
 import { handleNameKeyDown } from "../utils/cardUtils";
+import usePlayerTypeahead from "../utils/usePlayerTypeahead";
 
 export default function AddCard() {
   const [card, setCard] = useState({
@@ -42,9 +43,9 @@ export default function AddCard() {
   const [cardGrades, setCardGrades] = useState([]);
   const [smartMessage, setSmartMessage] = useState("");
   const [enableSmartFill, setEnableSmartFill] = useState(false);
-  const [playerNames, setPlayerNames] = useState({ firstNames: [], lastNames: [] });
+  const playerNames = usePlayerTypeahead(card.first_name, card.last_name);
 
-  // Fetch settings and player name list once
+  // Fetch settings once
   useEffect(() => {
     api.get("/settings/")
       .then((res) => {
@@ -53,16 +54,6 @@ export default function AddCard() {
         setEnableSmartFill(res.data.enable_smart_fill);
       })
       .catch((err) => console.error("Error fetching settings:", err));
-
-    api.get("/cards/players")
-      .then((res) => {
-        const players = res.data.players || [];
-        setPlayerNames({
-          firstNames: [...new Set(players.map(p => p.first_name))].sort((a, b) => a.localeCompare(b)),
-          lastNames: [...new Set(players.map(p => p.last_name))].sort((a, b) => a.localeCompare(b)),
-        });
-      })
-      .catch((err) => console.error("Error fetching player names:", err));
   }, []);
 
   const handleChange = (e) => {
@@ -4,27 +4,52 @@ import { useLocation, useNavigate } from "react-router-dom";
 import api from "../api/api";
 import "./BatchLabels.css";
 
+// Above this many labels the page skips the in-browser print view (one base64
+// QR per card in a single JSON response) and downloads the server-rendered PDF.
+const PDF_SHEET_THRESHOLD = 200;
+
 export default function BatchLabels() {
   const location = useLocation();
   const navigate = useNavigate();
   const mode = location.state?.mode; // 'selection' | 'all'
   const ids = location.state?.ids || [];
+  const pdfOnly = mode === "all" || ids.length > PDF_SHEET_THRESHOLD;
 
   const [labels, setLabels] = useState([]);
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState(null);
 
+  const downloadPdf = async () => {
+    try {
+      // POST: a large selection would overflow a query string
+      const res = await api.post(
+        "/cards/labels/sheet",
+        { format: "pdf", ids: mode === "all" ? null : ids },
+        { responseType: "blob" },
+      );
+      const url = URL.createObjectURL(new Blob([res.data], { type: "application/pdf" }));
+      const a = document.createElement("a");
+      a.href = url;
+      a.download = "card_labels.pdf";
+      a.click();
+      URL.revokeObjectURL(url);
+    } catch (err) {
+      setError("Failed to generate label PDF.");
+    }
+  };
+
   useEffect(() => {
     if (!mode) {
       navigate("/list-cards");
       return;
     }
 
-    const fetch = mode === "all"
-      ? api.get("/cards/labels/all")
-      : api.post("/cards/labels/batch", { ids });
+    if (pdfOnly) {
+      downloadPdf().finally(() => setLoading(false));
+      return;
+    }
 
-    fetch
+    api.post("/cards/labels/batch", { ids })
       .then((res) => {
         setLabels(res.data);
         setLoading(false);
@@ -39,7 +64,7 @@ export default function BatchLabels() {
   if (loading) {
     return (
       <div className="batch-screen-hint">
-        <p>Generating QR codes{mode === "all" ? " for full collection" : ` for ${ids.length} card${ids.length !== 1 ? "s" : ""}`}...</p>
+        <p>{pdfOnly ? "Building label PDF" : "Generating QR codes"}{mode === "all" ? " for full collection" : ` for ${ids.length} card${ids.length !== 1 ? "s" : ""}`}...</p>
         <p style={{ color: "#999", fontSize: "0.85rem" }}>This may take a moment for large collections.</p>
         <button className="nav-btn" style={{ marginTop: "0.75rem", background: "#6c757d" }} onClick={() => navigate("/list-cards")}>
           ✕ Cancel
@@ -57,6 +82,22 @@ export default function BatchLabels() {
     );
   }
 
+  if (pdfOnly) {
+    return (
+      <div className="batch-screen-hint">
+        <p>
+          <strong>card_labels.pdf</strong> downloaded — open it and print at 100% scale.
+        </p>
+        <button className="nav-btn" style={{ marginTop: "0.5rem" }} onClick={() => navigate("/list-cards")}>
+          ← Back to Collection
+        </button>
+        <button className="nav-btn" style={{ marginTop: "0.5rem", marginLeft: "0.5rem" }} onClick={downloadPdf}>
+          ⬇ Download again
+        </button>
+      </div>
+    );
+  }
+
   return (
     <>
       <div className="batch-screen-hint">
@@ -67,6 +108,9 @@ export default function BatchLabels() {
         <button className="nav-btn" style={{ marginTop: "0.5rem" }} onClick={() => navigate("/list-cards")}>
           ← Back to Collection
         </button>
+        <button className="nav-btn" style={{ marginTop: "0.5rem", marginLeft: "0.5rem" }} onClick={downloadPdf}>
+          ⬇ Download PDF
+        </button>
       </div>
 
       <div className="batch-grid">
@@ -1,7 +1,8 @@
-import React, { useEffect, useState } from "react";
+import React, { useState } from "react";
 import { useNavigate } from "react-router-dom";
 import api from "../api/api";
 import AppHeader from "../components/AppHeader";
+import usePlayerTypeahead from "../utils/usePlayerTypeahead";
 
 export default function DictionaryAdd() {
   const navigate = useNavigate();
@@ -14,20 +15,8 @@ export default function DictionaryAdd() {
     year: "",
     card_number: "",
   });
-  const [playerNames, setPlayerNames] = useState({ firstNames: [], lastNames: [] });
   const [error, setError] = useState("");
-
-  useEffect(() => {
-    api.get("/cards/players")
-      .then(res => {
-        const players = res.data.players || [];
-        setPlayerNames({
-          firstNames: [...new Set(players.map(p => p.first_name))].sort((a, b) => a.localeCompare(b)),
-          lastNames: [...new Set(players.map(p => p.last_name))].sort((a, b) => a.localeCompare(b)),
-        });
-      })
-      .catch(err => console.error("Error fetching player names:", err));
-  }, []);
+  const playerNames = usePlayerTypeahead(entry.first_name, entry.last_name);
 
   const handleChange = (e) => {
     const { name, value } = e.target;
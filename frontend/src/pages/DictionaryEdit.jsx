@@ -2,29 +2,20 @@ import React, { useEffect, useState } from "react";
 import { useNavigate, useParams } from "react-router-dom";
 import api from "../api/api";
 import AppHeader from "../components/AppHeader";
+import usePlayerTypeahead from "../utils/usePlayerTypeahead";
 
 export default function DictionaryEdit() {
   const { id } = useParams();
   const navigate = useNavigate();
 
   const [entry, setEntry] = useState(null);
-  const [playerNames, setPlayerNames] = useState({ firstNames: [], lastNames: [] });
   const [error, setError] = useState("");
+  const playerNames = usePlayerTypeahead(entry?.first_name, entry?.last_name);
 
   useEffect(() => {
     api.get(`/dictionary/entries/${id}`)
       .then(res => setEntry(res.data))
       .catch(err => console.error("Error fetching entry:", err));
-
-    api.get("/cards/players")
-      .then(res => {
-        const players = res.data.players || [];
-        setPlayerNames({
-          firstNames: [...new Set(players.map(p => p.first_name))].sort((a, b) => a.localeCompare(b)),
-          lastNames: [...new Set(players.map(p => p.last_name))].sort((a, b) => a.localeCompare(b)),
-        });
-      })
-      .catch(err => console.error("Error fetching player names:", err));
   }, [id]);
 
   const handleChange = (e) => {
@@ -24,6 +24,7 @@ import React, { useEffect, useRef, useState } from "react";
 import { useNavigate, useLocation } from "react-router-dom";
 import api from "../api/api";
 import AppHeader from "../components/AppHeader";
+import usePlayerTypeahead from "../utils/usePlayerTypeahead";
 import CardImages from "../components/CardImages";
 import LabelPreviewModal from "../components/LabelPreviewModal";
 
@@ -145,6 +146,7 @@ export default function ListCards() {
   const [pinnedCard, setPinnedCard] = useState(null);
   const [editingCardId, setEditingCardId] = useState(null);
   const [editForm, setEditForm] = useState({});
+  const playerNames = usePlayerTypeahead(editForm.first_name, editForm.last_name);
   const [cloningCardId, setCloningCardId] = useState(null);
   const [cloningParentId, setCloningParentId] = useState(null);
   const [displaySnapshot, setDisplaySnapshot] = useState(null); // frozen ordered id list during clone session
@@ -159,7 +161,6 @@ export default function ListCards() {
   const [selectedIds, setSelectedIds] = useState(new Set());
   const [selectionMode, setSelectionMode] = useState(false);
   const [openFilterCols, setOpenFilterCols] = useState(new Set());
-  const [playerNames, setPlayerNames] = useState({ firstNames: [], lastNames: [] });
   const skipNextFetchRef = React.useRef(false);
   const defaultSortApplied = useRef(false);
   const tableSectionRef = useRef(null);
@@ -182,7 +183,8 @@ export default function ListCards() {
       });
       const imgField = side === "front" ? "front_image" : "back_image";
       const imgVal = side === "front" ? res.data.front_image : res.data.back_image;
-      setCards(prev => prev.map(c => c.id === cardId ? { ...c, [imgField]: imgVal } : c));
+      // Thumbnails are regenerated in the background — show the new upload until the next fetch
+      setCards(prev => prev.map(c => c.id === cardId ? { ...c, [imgField]: imgVal, [`${side}_thumbs`]: null } : c));
       setEditForm(prev => ({ ...prev, [imgField]: imgVal }));
       if (pinnedCard?.id === cardId) setPinnedCard(prev => ({ ...prev, [imgField]: imgVal }));
       showToast(`${side === "front" ? "Front" : "Back"} image uploaded`);
@@ -454,7 +456,7 @@ export default function ListCards() {
   };
 
   const handleDuplicate = async (card) => {
-    const { id, value, market_factor, front_image, back_image, ...fields } = card;
+    const { id, value, market_factor, front_image, back_image, front_thumbs, back_thumbs, ...fields } = card;
     try {
       const res = await api.post("/cards/", fields);
       const newCard = res.data;
@@ -561,19 +563,6 @@ export default function ListCards() {
     }
   }, [settings]);
 
-  // Load player names for smart fill autocomplete
-  useEffect(() => {
-    api.get("/cards/players")
-      .then((res) => {
-        const players = res.data.players || [];
-        setPlayerNames({
-          firstNames: [...new Set(players.map(p => p.first_name))].sort((a, b) => a.localeCompare(b)),
-          lastNames: [...new Set(players.map(p => p.last_name))].sort((a, b) => a.localeCompare(b)),
-        });
-      })
-      .catch(() => {});
-  }, []);
-
   // Smart fill for inline new-card row
   useEffect(() => {
     if (editingCardId !== "new") return;
@@ -1351,8 +1340,9 @@ export default function ListCards() {
                           </div>
                         ) : card.front_image ? (
                           <img
-                            src={card.front_image}
+                            src={card.front_thumbs?.sm.webp || card.front_image}
                             alt="Front"
+                            loading="lazy"
                             style={{ width: "50px", height: "auto", cursor: "pointer" }}
                             tabIndex={0}
                             onClick={() => setSelectedCard(card)}
@@ -1474,7 +1464,7 @@ export default function ListCards() {
           }}
         >
           <img
-            src={hoverCard.front_image}
+            src={hoverCard.front_thumbs?.md.webp || hoverCard.front_image}
             alt="Preview"
             style={{ width: 220, height: "auto", display: "block", borderRadius: 5 }}
           />
@@ -3,6 +3,7 @@ import api from "../api/api";
 import AppHeader from "../components/AppHeader";
 import { useParams, Link, useNavigate, useLocation } from "react-router-dom";
 import { handleNameKeyDown } from "../utils/cardUtils";
+import usePlayerTypeahead from "../utils/usePlayerTypeahead";
 
 export default function UpdateCard() {
   const { id } = useParams();
@@ -14,9 +15,9 @@ export default function UpdateCard() {
   const [cardMakes, setCardMakes] = useState([]);
   const [cardGrades, setCardGrades] = useState([]);
   const [smartMessage, setSmartMessage] = useState("");
-  const [playerNames, setPlayerNames] = useState({ firstNames: [], lastNames: [] });
+  const playerNames = usePlayerTypeahead(card?.first_name, card?.last_name);
 
-  // Fetch global settings + card details + player name list
+  // Fetch global settings + card details
   useEffect(() => {
     api.get("/settings/")
       .then(res => {
@@ -28,16 +29,6 @@ export default function UpdateCard() {
     api.get(`/cards/${id}`)
       .then(res => setCard(res.data))
       .catch(err => console.error("Error fetching card:", err));
-
-    api.get("/cards/players")
-      .then((res) => {
-        const players = res.data.players || [];
-        setPlayerNames({
-          firstNames: [...new Set(players.map(p => p.first_name))].sort((a, b) => a.localeCompare(b)),
-          lastNames: [...new Set(players.map(p => p.last_name))].sort((a, b) => a.localeCompare(b)),
-        });
-      })
-      .catch((err) => console.error("Error fetching player names:", err));
   }, [id]);
 
   const handleChange = (e) => {
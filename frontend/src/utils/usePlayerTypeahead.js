@@ -0,0 +1,46 @@
+// src/utils/usePlayerTypeahead.js — prefix completions for first/last name inputs
+//
+// Replaces loading every player name from /cards/players up front. As the user
+// types, each field asks GET /cards/players/typeahead for the top matches of
+// what's typed so far (debounced); the server ranks the user's own players
+// first and answers repeat prefixes from cache / 304.
+//
+// Returns { firstNames, lastNames } in rank order — the same shape the
+// handleNameKeyDown Tab/Enter completion already consumes.
+import { useEffect, useState } from "react";
+import api from "../api/api";
+
+const DEBOUNCE_MS = 150;
+
+function useNameCompletions(field, typed) {
+  const [names, setNames] = useState([]);
+
+  useEffect(() => {
+    const q = (typed || "").trim();
+    if (!q) {
+      setNames([]);
+      return undefined;
+    }
+    let cancelled = false;
+    const timer = setTimeout(() => {
+      api.get("/cards/players/typeahead", { params: { q, field, limit: 10 } })
+        .then((res) => {
+          if (!cancelled) setNames((res.data.results || []).map((r) => r[field]));
+        })
+        .catch(() => {});
+    }, DEBOUNCE_MS);
+    return () => {
+      cancelled = true;
+      clearTimeout(timer);
+    };
+  }, [field, typed]);
+
+  return names;
+}
+
+export default function usePlayerTypeahead(firstName, lastName) {
+  return {
+    firstNames: useNameCompletions("first_name", firstName),
+    lastNames: useNameCompletions("last_name", lastName),
+  };
+}
@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+utils/fake_anthropic.py
+-----------------------
+Minimal local stand-in for the Anthropic Messages API (POST /v1/messages),
+for exercising Cy chat (POST /chat/, POST /chat/stream) and
+/cards/identify-image without an API key or network access.
+
+Point the backend at it with:
+  ANTHROPIC_BASE_URL=http://localhost:8765 ANTHROPIC_API_KEY=fake uvicorn app.main:app
+
+Behaviour (deterministic):
+  - A request containing an image     → a fixed card-identification JSON reply
+  - User text containing "tool:NAME"  → a tool_use block calling NAME with {}
+                                        (NAME must be one of the request's tools)
+  - A tool_result turn                → "Done. <first line of the tool result>"
+  - Anything else                     → "You said: <text>"
+  - "stream": true                    → the same reply as Server-Sent Events, text
+                                        split into word-sized deltas
+
+Usage:
+  python3 utils/fake_anthropic.py                   # port 8765
+  python3 utils/fake_anthropic.py --port 9000 --delay 0.5
+"""
+import argparse
+import itertools
+import json
+import re
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+IDENTIFY_REPLY = {
+    "first_name": "Mickey", "last_name": "Mantle", "year": 1952,
+    "brand": "Topps", "card_number": "311", "confidence": 0.93,
+}
+
+_ids = itertools.count(1)
+DELAY = 0.0
+
+
+def _text_of(content) -> str:
+    if isinstance(content, str):
+        return content
+    return " ".join(b.get("text", "") for b in content if b.get("type") == "text")
+
+
+def _reply_blocks(body: dict) -> tuple[list, str]:
+    """Content blocks and stop_reason for a request."""
+    last = body["messages"][-1]
+    content = last["content"]
+    blocks = content if isinstance(content, list) else []
+
+    if any(b.get("type") == "image" for b in blocks):
+        return [{"type": "text", "text": json.dumps(IDENTIFY_REPLY)}], "end_turn"
+
+    results = [b for b in blocks if b.get("type") == "tool_result"]
+    if results:
+        first = str(results[0].get("content", "")).splitlines() or [""]
+        return [{"type": "text", "text": f"Done. {first[0]}"}], "end_turn"
+
+    text = _text_of(content)
+    tools = {t["name"] for t in body.get("tools", [])}
+    m = re.search(r"tool:(\w+)", text)
+    if m and m.group(1) in tools:
+        return [
+            {"type": "text", "text": "Let me check."},
+            {"type": "tool_use", "id": f"toolu_fake{next(_ids)}", "name": m.group(1), "input": {}},
+        ], "tool_use"
+    return [{"type": "text", "text": f"You said: {text}"}], "end_turn"
+
+
+def _message(body: dict, content: list, stop_reason) -> dict:
+    return {
+        "id": f"msg_fake{next(_ids)}",
+        "type": "message",
+        "role": "assistant",
+        "model": body.get("model", "fake"),
+        "content": content,
+        "stop_reason": stop_reason,
+        "stop_sequence": None,
+        "usage": {"input_tokens": 10, "output_tokens": 10},
+    }
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, fmt, *args):
+        print(f"[fake-anthropic] {fmt % args}", flush=True)
+
+    def do_POST(self):
+        if self.path.split("?")[0] != "/v1/messages":
+            self.send_error(404)
+            return
+        body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+        if DELAY:
+            time.sleep(DELAY)
+        content, stop_reason = _reply_blocks(body)
+        if body.get("stream"):
+            self._stream(body, content, stop_reason)
+        else:
+            data = json.dumps(_message(body, content, stop_reason)).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+    def _event(self, name: str, data: dict):
+        chunk = f"event: {name}\ndata: {json.dumps(data)}\n\n".encode()
+        self.wfile.write(f"{len(chunk):x}\r\n".encode() + chunk + b"\r\n")
+        self.wfile.flush()
+
+    def _stream(self, body: dict, content: list, stop_reason: str):
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+
+        self._event("message_start", {"type": "message_start", "message": _message(body, [], None)})
+        for i, block in enumerate(content):
+            if block["type"] == "text":
+                self._event("content_block_start", {
+                    "type": "content_block_start", "index": i, "content_block": {"type": "text", "text": ""},
+                })
+                for word in re.findall(r"\S+\s*", block["text"]):
+                    self._event("content_block_delta", {
+                        "type": "content_block_delta", "index": i,
+                        "delta": {"type": "text_delta", "text": word},
+                    })
+            else:
+                self._event("content_block_start", {
+                    "type": "content_block_start", "index": i,
+                    "content_block": {**block, "input": {}},
+                })
+                self._event("content_block_delta", {
+                    "type": "content_block_delta", "index": i,
+                    "delta": {"type": "input_json_delta", "partial_json": json.dumps(block["input"])},
+                })
+            self._event("content_block_stop", {"type": "content_block_stop", "index": i})
+        self._event("message_delta", {
+            "type": "message_delta",
+            "delta": {"stop_reason": stop_reason, "stop_sequence": None},
+            "usage": {"output_tokens": 10},
+        })
+        self._event("message_stop", {"type": "message_stop"})
+        self.wfile.write(b"0\r\n\r\n")
+        self.wfile.flush()
+
+
+def main():
+    global DELAY
+    parser = argparse.ArgumentParser(description="Local fake Anthropic Messages API")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--delay", type=float, default=0.0, help="seconds to wait before each reply")
+    args = parser.parse_args()
+    DELAY = args.delay
+    print(f"Fake Anthropic API on http://localhost:{args.port} (ANTHROPIC_BASE_URL)", flush=True)
+    ThreadingHTTPServer(("", args.port), Handler).serve_forever()
+
+
+if __name__ == "__main__":
+    main()
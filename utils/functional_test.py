@@ -4,9 +4,11 @@ utils/functional_test.py
 --------------------------
 CardStoard Full Functional Test Suite
 
-Covers 44 tests across all inventory types and auth flows:
+Covers 46 tests across all inventory types and auth flows:
   AUTH (5)    — gating checks, login, /auth/me, logout
   CARDS (12)  — full CRUD + image upload (front+back) + duplicate-count + validate-csv + export + count
+  VALUATION (2) — revalue-all (SQL) parity with per-card /value (Python) across every
+                  grade × rookie × autograph combination
   BALLS (5)   — full CRUD
   WAX (5)     — full CRUD (wax boxes)
   PACKS (5)   — full CRUD (wax packs)
@@ -214,6 +216,7 @@ class TestRunner:
         self.suite_auth_open()
         self.suite_auth_login()
         self.suite_cards()
+        self.suite_valuation()
         self.suite_balls()
         self.suite_wax()
         self.suite_packs()
@@ -239,6 +242,11 @@ class TestRunner:
                     self.api(method, f"{prefix}{item_id}")
                 except Exception:
                     pass
+        for card_id in self.ids.get("valuation_card_ids", []):
+            try:
+                self.api("DELETE", f"/cards/{card_id}")
+            except Exception:
+                pass
 
     # ── Reporting ─────────────────────────────────────────────────────────────
 
@@ -486,6 +494,71 @@ class TestRunner:
         else:
             self.record("CARDS", "Delete card", False, "skipped (create failed)")
 
+    def suite_valuation(self):
+        """Parity: revalue-all (set-based SQL) must match per-card /value (Python card_value)."""
+        # Book sets chosen to hit the rounding edges of pick_avg_book():
+        # exact binary half-cent ties (1.125), near-ties just below/above .005,
+        # a single book value, and all five populated.
+        book_sets = [
+            {"book_high": 1.25, "book_low": 1.00},
+            {"book_high": 1.01, "book_low": 1.00},
+            {"book_high": 1198.17, "book_low": 2105.0},
+            {"book_mid": 2.675},
+            {"book_high": 500.0, "book_high_mid": 350.0, "book_mid": 250.0,
+             "book_low_mid": 150.0, "book_low": 75.5},
+        ]
+        grades = [3.0, 1.5, 1.0, 0.8, 0.4, 0.2]
+
+        created = []
+        self.ids["valuation_card_ids"] = created
+        i = 0
+        for grade in grades:
+            for rookie in (False, True):
+                for auto in (False, True):
+                    books = book_sets[i % len(book_sets)]
+                    i += 1
+                    status, body = self.api("POST", "/cards/", json_body={
+                        "first_name": "Parity", "last_name": f"Check{i}",
+                        "year": 1975, "brand": "Topps", "card_number": str(900 + i),
+                        "grade": grade, "rookie": rookie,
+                        "card_attributes": {"autograph": True} if auto else {},
+                        **books,
+                    })
+                    if status in (200, 201) and isinstance(body, dict) and body.get("id"):
+                        created.append(body["id"])
+
+        expected = {}
+        for card_id in created:
+            status, body = self.api("POST", f"/cards/{card_id}/value")
+            if status == 200 and isinstance(body, dict):
+                expected[card_id] = body.get("value")
+
+        ok = len(created) == 24 and len(expected) == len(created)
+        self.record(
+            "VALUATION", "Per-card values (Python)", ok,
+            f"{len(expected)} valued" if ok else f"{len(created)} created, {len(expected)} valued",
+        )
+
+        status, body = self.api("POST", "/cards/revalue-all")
+        mismatches = []
+        if status == 200:
+            for card_id, value in expected.items():
+                s2, card = self.api("GET", f"/cards/{card_id}")
+                if s2 != 200 or card.get("value") != value:
+                    mismatches.append(card_id)
+        ok = status == 200 and bool(expected) and not mismatches
+        self.record(
+            "VALUATION", "revalue-all parity (SQL)", ok,
+            f"{len(expected)} match" if ok
+            else f"HTTP {status}" if status != 200
+            else f"{len(mismatches)} differ: {mismatches[:3]}",
+        )
+
+        for card_id in list(created):
+            s3, _ = self.api("DELETE", f"/cards/{card_id}")
+            if s3 == 200:
+                created.remove(card_id)
+
     def suite_balls(self):
         """Full CRUD for AutoBalls."""
         status, body = self.api("POST", "/balls/", json_body={